@@ -0,0 +1,119 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+Compare Load installer backends on local wheels.
+
+Each round installs the same wheels with every available backend into a
+fresh ``--target`` directory (``--no-deps --no-index``, so only install
+work is measured, not network or resolution) and reports the median
+wall time.
+
+    python scripts/bench_backends.py                  # synthetic wheels
+    python scripts/bench_backends.py --wheels dist/   # your own wheels
+    python scripts/bench_backends.py --backends pip wheel --rounds 10
+"""
+
+import argparse
+import base64
+import glob
+import hashlib
+import os
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+import zipfile
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from load import backends  # noqa: E402
+
+
+def make_wheel(directory, name, modules=20, lines=200):
+    """Write a pure-Python wheel with ``modules`` modules of ``lines`` lines."""
+    version = "1.0"
+    dist_info = "{0}-{1}.dist-info".format(name, version)
+    body = "".join(
+        "def f{0}(x):\n    return x + {0}\n".format(i) for i in range(lines // 2)
+    )
+    files = dict(("{0}/m{1}.py".format(name, i), body) for i in range(modules))
+    files["{0}/__init__.py".format(name)] = ""
+    files[dist_info + "/METADATA"] = (
+        "Metadata-Version: 2.1\nName: {0}\nVersion: {1}\n".format(name, version)
+    )
+    files[dist_info + "/WHEEL"] = (
+        "Wheel-Version: 1.0\nGenerator: bench\n"
+        "Root-Is-Purelib: true\nTag: py3-none-any\n"
+    )
+    record = []
+    for path, text in files.items():
+        digest = base64.urlsafe_b64encode(hashlib.sha256(text.encode()).digest())
+        digest = digest.rstrip(b"=").decode()
+        record.append("{0},sha256={1},{2}".format(path, digest, len(text)))
+    files[dist_info + "/RECORD"] = "\n".join(record + [dist_info + "/RECORD,,"]) + "\n"
+
+    path = os.path.join(directory, "{0}-{1}-py3-none-any.whl".format(name, version))
+    with zipfile.ZipFile(path, "w", zipfile.ZIP_DEFLATED) as archive:
+        for member, text in sorted(files.items()):
+            archive.writestr(member, text)
+    return path
+
+
+def bench(backend, wheels, rounds):
+    """Median/min seconds to install ``wheels`` with ``backend``."""
+    times = []
+    for _ in range(rounds):
+        target = tempfile.mkdtemp(prefix="load-bench-")
+        cmd = [sys.executable, "-m", "pip", "install", "--target", target,
+               "--no-deps", "--no-index"] + wheels
+        try:
+            start = time.perf_counter()
+            result = backend.run(cmd)
+            elapsed = time.perf_counter() - start
+        finally:
+            shutil.rmtree(target, ignore_errors=True)
+        if result.returncode != 0:
+            raise RuntimeError("{0} failed: {1}".format(backend.name, result.stderr))
+        times.append(elapsed)
+    return statistics.median(times), min(times)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--wheels", help="directory of .whl files (default: synthetic)")
+    parser.add_argument(
+        "--count", type=int, default=5, help="synthetic wheels to build"
+    )
+    parser.add_argument("--rounds", type=int, default=5)
+    parser.add_argument("--backends", nargs="*", help="default: every available one")
+    args = parser.parse_args(argv)
+
+    workdir = tempfile.mkdtemp(prefix="load-bench-wheels-")
+    try:
+        if args.wheels:
+            pattern = os.path.join(os.path.abspath(args.wheels), "*.whl")
+            wheels = sorted(glob.glob(pattern))
+        else:
+            wheels = [
+                make_wheel(workdir, "loadbench{0}".format(i)) for i in range(args.count)
+            ]
+        if not wheels:
+            parser.error("no wheels found")
+
+        names = args.backends or backends.available_backends()
+        print("📦 {0} wheel(s), {1} round(s)".format(len(wheels), args.rounds))
+        print("{0:<12} {1:>10} {2:>10}".format("backend", "median s", "min s"))
+        for name in names:
+            backend = backends.get_backend(name)
+            if not backend.available():
+                print("{0:<12} {1:>10}".format(name, "n/a"))
+                continue
+            median, fastest = bench(backend, wheels, args.rounds)
+            print("{0:<12} {1:>10.3f} {2:>10.3f}".format(name, median, fastest))
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
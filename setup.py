@@ -49,6 +49,7 @@ setup(
     url='https://github.com/pyfunc/load',
     package_dir={'': 'src'},
     packages=find_packages(where='src'),
+    package_data={'load': ['data/*.tsv']},
     python_requires='>=2.7, !=3.0.*, !=3.1.*, !=3.2.*, !=3.3.*, !=3.4.*',
     install_requires=install_requires,
     entry_points={
@@ -33,6 +33,26 @@ from .core import (
     enable_auto_print,
     disable_auto_print,
     set_print_limit,
+    set_offline,
+    is_offline,
+    load_requirements,
+    lock,
+    from_lock,
+    set_target_dir,
+    add_install_listener,
+    remove_install_listener,
+    register_distribution,
+    resolve_distribution,
+    register_backend,
+    set_backend,
+    flush_installs,
+    prefetch,
+    register_formatter,
+    set_output,
+    settings,
+    get_settings,
+    watch,
+    local_dir,
     info as core_info,
     load,
 )
@@ -55,6 +75,26 @@ __all__ = [
     'enable_auto_print',
     'disable_auto_print',
     'set_print_limit',
+    'set_offline',
+    'is_offline',
+    'load_requirements',
+    'lock',
+    'from_lock',
+    'set_target_dir',
+    'add_install_listener',
+    'remove_install_listener',
+    'register_distribution',
+    'resolve_distribution',
+    'register_backend',
+    'set_backend',
+    'flush_installs',
+    'prefetch',
+    'register_formatter',
+    'set_output',
+    'settings',
+    'get_settings',
+    'watch',
+    'local_dir',
     'info',
     'load_decorator',
     'test_cache_info',
@@ -132,7 +172,7 @@ class LoadModule(object):
             "sys": "sys",
             "pathlib": "pathlib",
             # Image processing
-            "cv2": "opencv-python",
+            "cv2": "cv2",
             "PIL": "PIL",
             # Utilities
             "time": "time",
@@ -153,7 +193,8 @@ class LoadModule(object):
                 return module
             except ImportError:
                 raise ImportError(
-                    "Could not import {0}. Please install it with: pip install {1}".format(name, module_name)
+                    "Could not import {0}. Please install it with: "
+                    "pip install {1}".format(name, resolve_distribution(module_name))
                 )
 
         # Popular aliases mapping
@@ -175,7 +216,7 @@ class LoadModule(object):
             "sys": "sys",
             "pathlib": "pathlib",
             # Image processing
-            "cv2": "opencv-python",
+            "cv2": "cv2",
             "PIL": "PIL",
             # Utilities
             "time": "time",
@@ -196,7 +237,8 @@ class LoadModule(object):
                 return module
             except ImportError:
                 raise ImportError(
-                    "Could not import {0}. Please install it with: pip install {1}".format(name, module_name)
+                    "Could not import {0}. Please install it with: "
+                    "pip install {1}".format(name, resolve_distribution(module_name))
                 )
 
         # If not found, try to load as a module
@@ -375,6 +417,26 @@ new_module.enable_auto_print = module_wrapper.enable_auto_print
 new_module.disable_auto_print = module_wrapper.disable_auto_print
 new_module.set_print_limit = module_wrapper.set_print_limit
 new_module.info = core_info  # Use the already imported core_info
+new_module.set_offline = set_offline
+new_module.is_offline = is_offline
+new_module.load_requirements = load_requirements
+new_module.lock = lock
+new_module.from_lock = from_lock
+new_module.set_target_dir = set_target_dir
+new_module.add_install_listener = add_install_listener
+new_module.remove_install_listener = remove_install_listener
+new_module.register_distribution = register_distribution
+new_module.resolve_distribution = resolve_distribution
+new_module.register_backend = register_backend
+new_module.set_backend = set_backend
+new_module.flush_installs = flush_installs
+new_module.prefetch = prefetch
+new_module.register_formatter = register_formatter
+new_module.set_output = set_output
+new_module.settings = settings
+new_module.get_settings = get_settings
+new_module.watch = watch
+new_module.local_dir = local_dir
 
 # Add decorator and utility functions
 new_module.import_aliases = import_aliases  # Imported at the top
@@ -411,6 +473,10 @@ def load_decorator(*modules: str, silent: bool = False, load_func: Optional[Call
         def wrapper(*args: Any, **kwargs: Any) -> Any:
             nonlocal loaded_modules
             
+            # Install all missing modules in one batch instead of one by one
+            if load_func is None:
+                prefetch(*(m for m in modules if m not in loaded_modules))
+
             for module_spec in modules:
                 if module_spec in loaded_modules:
                     continue
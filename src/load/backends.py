@@ -0,0 +1,543 @@
+# -*- coding: utf-8 -*-
+"""
+Installer backends for Load
+
+Every install is expressed as a pip command line
+(``python -m pip install [options] specs...``) and handed to the configured
+backend, which decides how to carry it out:
+
+* ``pip`` - run the command as is (default)
+* ``pip-tuned`` - pip with a quieter, faster flag profile
+  (``config.PIP_TUNED_FLAGS``)
+* ``wheel`` - unpack local ``.whl`` files in-process, no subprocess, and
+  write their console/GUI scripts; any other command (or, on Windows, a
+  wheel with scripts, which need ``.exe`` launchers) falls back to ``pip``
+* ``uv`` - hand the command to ``uv pip install`` when ``uv`` is on PATH,
+  otherwise fall back to ``pip``
+* ``auto`` - ``wheel`` for local wheels, then ``uv``, then ``pip-tuned``
+
+Select one with ``LOAD_INSTALLER=<name>`` or :func:`set_backend`; add your own
+with :func:`register_backend`. ``scripts/bench_backends.py`` compares them.
+"""
+
+import base64
+import configparser
+import csv
+import hashlib
+import io
+import json
+import os
+import py_compile
+import re
+import shutil
+import subprocess
+import sys
+import sysconfig
+import zipfile
+
+from . import config, telemetry
+
+# Type hints for static type checkers (Python 2/3 compatible)
+if False:  # MYPY
+    from typing import Any, Dict, List, Optional, Tuple  # noqa: F401
+
+# pip install options that take a value (as separate argument)
+_VALUE_OPTIONS = (
+    "--report", "--log", "--target", "-t", "--index-url", "-i",
+    "--extra-index-url", "--find-links", "-f", "-r", "--requirement",
+    "-c", "--constraint", "--prefix", "--root", "--python-version",
+    "--platform", "--implementation", "--abi", "--only-binary",
+    "--no-binary", "--trusted-host", "--cache-dir", "--src", "-e",
+    "--editable", "--progress-bar", "--timeout", "--retries", "--proxy",
+)
+
+
+class InstallResult(object):
+    """``subprocess.run``-like result of an in-process install."""
+
+    def __init__(self, args, returncode, stdout="", stderr=""):
+        # type: (List[str], int, str, str) -> None
+        self.args = args
+        self.returncode = returncode
+        self.stdout = stdout
+        self.stderr = stderr
+
+
+def split_pip_install(cmd):
+    # type: (List[str]) -> Tuple[List[str], List[Tuple[str, Optional[str]]], List[str]]
+    """Split a ``pip install`` command into (prefix, options, specs).
+
+    ``prefix`` is everything up to and including ``install``; options are
+    ``(flag, value)`` pairs, ``value`` None for switches.
+    """
+    position = cmd.index("install", cmd.index("pip")) + 1
+    prefix, rest = list(cmd[:position]), list(cmd[position:])
+    options = []  # type: List[Tuple[str, Optional[str]]]
+    specs = []  # type: List[str]
+    i = 0
+    while i < len(rest):
+        arg = rest[i]
+        if arg.startswith("-"):
+            if "=" in arg and arg.startswith("--"):
+                flag, _, value = arg.partition("=")
+                options.append((flag, value))
+            elif arg in _VALUE_OPTIONS and i + 1 < len(rest):
+                options.append((arg, rest[i + 1]))
+                i += 1
+            else:
+                options.append((arg, None))
+        else:
+            specs.append(arg)
+        i += 1
+    return prefix, options, specs
+
+
+def join_pip_install(prefix, options, specs):
+    # type: (List[str], List[Tuple[str, Optional[str]]], List[str]) -> List[str]
+    cmd = list(prefix)
+    for flag, value in options:
+        cmd.append(flag)
+        if value is not None:
+            cmd.append(value)
+    return cmd + list(specs)
+
+
+class InstallerBackend(object):
+    """Interface of an installer backend.
+
+    ``run(cmd, env)`` carries out a ``pip install`` command line and
+    returns an object with ``returncode`` (and ideally ``stdout`` /
+    ``stderr``), like ``subprocess.run``.
+    """
+
+    name = "base"
+
+    def available(self):
+        # type: () -> bool
+        """Whether the backend can run in this environment."""
+        return True
+
+    def run(self, cmd, env=None):
+        # type: (List[str], Optional[Dict[str, str]]) -> Any
+        raise NotImplementedError
+
+    def __repr__(self):
+        return "<{0} backend>".format(self.name)
+
+
+class PipBackend(InstallerBackend):
+    """Run pip in a subprocess, exactly as given."""
+
+    name = "pip"
+
+    def run(self, cmd, env=None):
+        # type: (List[str], Optional[Dict[str, str]]) -> Any
+        return subprocess.run(cmd, capture_output=True, text=True, env=env)
+
+
+class TunedPipBackend(PipBackend):
+    """pip with ``config.PIP_TUNED_FLAGS`` added.
+
+    The default profile skips the version self-check, prompts, progress
+    rendering and colour output, none of which an embedded install needs.
+    """
+
+    name = "pip-tuned"
+
+    def run(self, cmd, env=None):
+        # type: (List[str], Optional[Dict[str, str]]) -> Any
+        prefix, options, specs = split_pip_install(cmd)
+        present = set(flag for flag, _ in options)
+        extra = []  # type: List[Tuple[str, Optional[str]]]
+        for flag in config.PIP_TUNED_FLAGS:
+            name, _, value = flag.partition("=")
+            if name not in present:
+                extra.append((name, value or None))
+        cmd = join_pip_install(prefix, extra + options, specs)
+        return super(TunedPipBackend, self).run(cmd, env)
+
+
+class UvBackend(InstallerBackend):
+    """``uv pip install`` for the running interpreter, if ``uv`` exists.
+
+    uv has no ``--report`` / ``--log``; installs through it are missing
+    from lockfile artifact pins and pip phase telemetry.
+    """
+
+    name = "uv"
+    _unsupported = ("--report", "--log", "--progress-bar", "--no-input",
+                    "--disable-pip-version-check", "--no-color")
+
+    def __init__(self, fallback=None):
+        # type: (Optional[InstallerBackend]) -> None
+        self.fallback = fallback or PipBackend()
+
+    @staticmethod
+    def executable():
+        # type: () -> Optional[str]
+        return shutil.which("uv")
+
+    def available(self):
+        # type: () -> bool
+        return self.executable() is not None
+
+    def run(self, cmd, env=None):
+        # type: (List[str], Optional[Dict[str, str]]) -> Any
+        uv = self.executable()
+        if uv is None:
+            return self.fallback.run(cmd, env)
+        _, options, specs = split_pip_install(cmd)
+        options = [(f, v) for f, v in options if f not in self._unsupported]
+        prefix = [uv, "pip", "install", "--python", sys.executable]
+        return subprocess.run(
+            join_pip_install(prefix, options, specs),
+            capture_output=True, text=True, env=env,
+        )
+
+
+class WheelBackend(InstallerBackend):
+    """Unpack local wheels in-process (no subprocess, no resolver).
+
+    Handles commands whose specs are all local ``.whl`` files that are not
+    installed yet and whose requirements are already met (or ``--no-deps``
+    was given). Everything else goes to the fallback backend.
+    """
+
+    name = "wheel"
+    _handled = ("--report", "--log", "--target", "-t", "--no-deps", "--upgrade",
+                "-U", "--no-index", "--find-links", "-f", "--index-url", "-i",
+                "--extra-index-url", "--no-build-isolation", "--no-compile",
+                "--quiet", "-q", "--disable-pip-version-check", "--no-input",
+                "--progress-bar", "--no-color")
+
+    def __init__(self, fallback=None):
+        # type: (Optional[InstallerBackend]) -> None
+        self.fallback = fallback or PipBackend()
+
+    def run(self, cmd, env=None):
+        # type: (List[str], Optional[Dict[str, str]]) -> Any
+        _, options, specs = split_pip_install(cmd)
+        flags = dict(options)
+        if (
+            not specs
+            or any(flag not in self._handled for flag, _ in options)
+            or not all(s.endswith(".whl") and os.path.isfile(s) for s in specs)
+        ):
+            return self.fallback.run(cmd, env)
+
+        target = flags.get("--target") or flags.get("-t")
+        wheels = [WheelFile(path) for path in specs]
+        for wheel in wheels:
+            if (
+                _installed(wheel.name, target)
+                or ("--no-deps" not in flags and not wheel.requirements_met())
+                or (os.name == "nt" and wheel.scripts())
+            ):
+                return self.fallback.run(cmd, env)
+
+        report = {"version": "1", "install": []}  # type: Dict[str, Any]
+        lines = []
+        try:
+            for wheel in wheels:
+                wheel.install(target, compile_bytecode="--no-compile" not in flags)
+                report["install"].append(wheel.report_item())
+                lines.append("{0}-{1}".format(wheel.name, wheel.version))
+        except (IOError, OSError, ValueError, zipfile.BadZipfile) as e:
+            return InstallResult(cmd, 1, stderr="ERROR: {0}\n".format(e))
+
+        if flags.get("--report"):
+            with open(flags["--report"], "w") as f:
+                json.dump(report, f)
+        return InstallResult(
+            cmd, 0, stdout="Successfully installed {0}\n".format(" ".join(lines))
+        )
+
+
+def _installed(dist_name, target=None):
+    # type: (str, Optional[str]) -> bool
+    from .installed import get_installed_index
+
+    if target:
+        pattern = re.compile(
+            r"^{0}-[^-]+\.dist-info$".format(re.escape(dist_name.replace("-", "_"))),
+            re.IGNORECASE,
+        )
+        try:
+            return any(pattern.match(n) for n in os.listdir(target))
+        except OSError:
+            return False
+    return get_installed_index().get(dist_name) is not None
+
+
+_SCRIPT = """#!{python}
+# -*- coding: utf-8 -*-
+import re
+import sys
+from {module} import {root}
+if __name__ == "__main__":
+    sys.argv[0] = re.sub(r"(-script\\.pyw|\\.exe)?$", "", sys.argv[0])
+    sys.exit({attr}())
+"""
+
+
+def _record_hash(data):
+    # type: (bytes) -> str
+    digest = hashlib.sha256(data).digest()
+    return "sha256=" + base64.urlsafe_b64encode(digest).rstrip(b"=").decode("ascii")
+
+
+class WheelFile(object):
+    """A ``.whl`` archive and how to install it (PEP 427 / PEP 491)."""
+
+    def __init__(self, path):
+        # type: (str) -> None
+        self.path = os.path.abspath(path)
+        parts = os.path.basename(path)[:-4].split("-")
+        if len(parts) < 5:
+            raise ValueError("Not a wheel filename: {0}".format(path))
+        self.name, self.version = parts[0], parts[1]
+        self.dist_info = "{0}-{1}.dist-info".format(self.name, self.version)
+        self.data_dir = "{0}-{1}.data".format(self.name, self.version)
+        self._metadata = None  # type: Optional[Any]
+
+    def _read(self, member):
+        # type: (str) -> Optional[str]
+        with zipfile.ZipFile(self.path) as archive:
+            try:
+                return archive.read(member).decode("utf-8")
+            except KeyError:
+                return None
+
+    def metadata(self):
+        # type: () -> Any
+        if self._metadata is None:
+            from email.parser import Parser
+
+            self._metadata = Parser().parsestr(
+                self._read(self.dist_info + "/METADATA") or ""
+            )
+        return self._metadata
+
+    def scripts(self):
+        # type: () -> List[Tuple[str, str]]
+        """``(name, "module:attr")`` of every console and GUI script."""
+        parser = configparser.ConfigParser(delimiters=("=",), interpolation=None)
+        parser.optionxform = str  # script names are case-sensitive
+        parser.read_string(self._read(self.dist_info + "/entry_points.txt") or "")
+        return [
+            (name, value.split("[")[0].strip())
+            for group in ("console_scripts", "gui_scripts") if parser.has_section(group)
+            for name, value in parser.items(group)
+        ]
+
+    def requirements_met(self):
+        # type: () -> bool
+        """Whether every (applicable) ``Requires-Dist`` is installed."""
+        from .index import _packaging
+        from .installed import get_installed_index
+
+        requires = self.metadata().get_all("Requires-Dist") or []
+        if not requires:
+            return True
+        packaging = _packaging()
+        if packaging is None:
+            return False
+        index = get_installed_index()
+        for line in requires:
+            try:
+                req = packaging.requirements.Requirement(line)
+            except packaging.requirements.InvalidRequirement:
+                return False  # let pip report the broken metadata
+            if req.marker is not None and not req.marker.evaluate({"extra": ""}):
+                continue
+            dist = index.get(req.name)
+            if dist is None or not req.specifier.contains(
+                dist["version"], prereleases=True
+            ):
+                return False
+        return True
+
+    @staticmethod
+    def _scheme_dirs(target):
+        # type: (Optional[str]) -> Dict[str, str]
+        if target:
+            return {
+                "purelib": target, "platlib": target,
+                "scripts": os.path.join(target, "bin"),
+                "headers": os.path.join(target, "include"),
+                "data": target,
+            }
+        paths = sysconfig.get_paths()
+        return {
+            "purelib": paths["purelib"], "platlib": paths["platlib"],
+            "scripts": paths["scripts"], "headers": paths["include"],
+            "data": paths["data"],
+        }
+
+    def install(self, target=None, compile_bytecode=True):
+        # type: (Optional[str], bool) -> List[str]
+        """Unpack into site-packages (or ``target``); returns written paths."""
+        wheel_info = self._read(self.dist_info + "/WHEEL") or ""
+        purelib = "Root-Is-Purelib: true" in wheel_info.replace("\r", "")
+        schemes = self._scheme_dirs(target)
+        root = schemes["purelib" if purelib else "platlib"]
+        expected = {}  # type: Dict[str, str]
+        record_text = self._read(self.dist_info + "/RECORD") or ""
+        for row in csv.reader(io.StringIO(record_text)):
+            if len(row) >= 2 and row[1]:
+                expected[row[0]] = row[1]
+
+        written = []  # type: List[Tuple[str, str, int]]
+        with telemetry.phase("unpack"), zipfile.ZipFile(self.path) as archive:
+            for member in archive.infolist():
+                name = member.filename
+                if name.endswith("/") or name == self.dist_info + "/RECORD":
+                    continue
+                if name.startswith(self.data_dir + "/"):
+                    scheme, _, relative = name[len(self.data_dir) + 1:].partition("/")
+                    if scheme not in schemes:
+                        raise ValueError("Unknown wheel scheme {0}".format(scheme))
+                    base, relative = schemes[scheme], relative
+                else:
+                    base, relative = root, name
+                destination = os.path.abspath(os.path.join(base, relative))
+                if not destination.startswith(os.path.abspath(base) + os.sep):
+                    raise ValueError("Unsafe path in wheel: {0}".format(name))
+
+                data = archive.read(member)
+                digest = _record_hash(data)
+                if name in expected and expected[name] != digest:
+                    raise ValueError(
+                        "Hash mismatch for {0} in {1}".format(name, self.path)
+                    )
+                script = name.startswith(self.data_dir + "/scripts/")
+                if script and data.startswith(b"#!python"):
+                    data = b"#!" + sys.executable.encode() + data[len(b"#!python"):]
+                    digest = _record_hash(data)
+
+                directory = os.path.dirname(destination)
+                if not os.path.isdir(directory):
+                    os.makedirs(directory)
+                with open(destination, "wb") as f:
+                    f.write(data)
+                if script or (member.external_attr >> 16) & 0o111:
+                    os.chmod(destination, 0o755)
+                written.append((destination, digest, len(data)))
+
+            for name, value in self.scripts():
+                module, _, attr = value.partition(":")
+                data = _SCRIPT.format(
+                    python=sys.executable, module=module.strip(),
+                    root=attr.strip().split(".")[0], attr=attr.strip(),
+                ).encode("utf-8")
+                destination = os.path.join(schemes["scripts"], name)
+                if not os.path.isdir(schemes["scripts"]):
+                    os.makedirs(schemes["scripts"])
+                with open(destination, "wb") as f:
+                    f.write(data)
+                os.chmod(destination, 0o755)
+                written.append((destination, _record_hash(data), len(data)))
+
+        installed = [path for path, _, _ in written]
+        compiled = []  # type: List[str]
+        if compile_bytecode:
+            with telemetry.phase("compile"):
+                for path in installed:
+                    if path.endswith(".py"):
+                        try:
+                            compiled.append(py_compile.compile(path, doraise=True))
+                        except py_compile.PyCompileError:
+                            pass  # pip ignores files that do not compile too
+
+        info_dir = os.path.join(root, self.dist_info)
+        with open(os.path.join(info_dir, "INSTALLER"), "w") as f:
+            f.write("load\n")
+        with open(os.path.join(info_dir, "REQUESTED"), "w"):
+            pass
+        with open(os.path.join(info_dir, "direct_url.json"), "w") as f:
+            json.dump(self.direct_url(), f)
+        record = os.path.join(info_dir, "RECORD")
+        with open(record, "w", newline="") as f:
+            writer = csv.writer(f)
+            for path, digest, size in written:
+                writer.writerow([os.path.relpath(path, root), digest, size])
+            for path in compiled:
+                writer.writerow([os.path.relpath(path, root), "", ""])
+            for name in ("INSTALLER", "REQUESTED", "direct_url.json", "RECORD"):
+                writer.writerow([os.path.join(self.dist_info, name), "", ""])
+        return installed + compiled
+
+    def direct_url(self):
+        # type: () -> Dict[str, Any]
+        """PEP 610 ``direct_url.json`` of this wheel, as pip writes it."""
+        with open(self.path, "rb") as f:
+            sha256 = hashlib.sha256(f.read()).hexdigest()
+        return {
+            "url": "file://" + self.path,
+            "archive_info": {
+                "hash": "sha256=" + sha256, "hashes": {"sha256": sha256},
+            },
+        }
+
+    def report_item(self):
+        # type: () -> Dict[str, Any]
+        """This wheel as an entry of a pip installation report."""
+        return {
+            "metadata": {"name": self.metadata()["Name"] or self.name,
+                         "version": self.metadata()["Version"] or self.version},
+            "download_info": self.direct_url(),
+            "requested": True,
+        }
+
+
+class AutoBackend(WheelBackend):
+    """The fastest available option for each command."""
+
+    name = "auto"
+
+    def __init__(self):
+        # type: () -> None
+        super(AutoBackend, self).__init__(UvBackend(TunedPipBackend()))
+
+
+_BACKENDS = {
+    "pip": PipBackend,
+    "pip-tuned": TunedPipBackend,
+    "wheel": WheelBackend,
+    "uv": UvBackend,
+    "auto": AutoBackend,
+}  # type: Dict[str, Any]
+_instances = {}  # type: Dict[str, InstallerBackend]
+
+
+def register_backend(name, backend):
+    # type: (str, Any) -> None
+    """Make ``backend`` (a class or instance) selectable as ``name``."""
+    _BACKENDS[name] = backend
+    _instances.pop(name, None)
+
+
+def available_backends():
+    # type: () -> List[str]
+    """Names of the backends that can run here."""
+    return [name for name in sorted(_BACKENDS) if get_backend(name).available()]
+
+
+def set_backend(name):
+    # type: (str) -> None
+    """Use backend ``name`` for every install from now on."""
+    if name not in _BACKENDS:
+        raise ValueError("Unknown installer backend: {0}".format(name))
+    config.INSTALLER_BACKEND = name
+
+
+def get_backend(name=None):
+    # type: (Optional[str]) -> InstallerBackend
+    """The backend called ``name`` (default: the configured one)."""
+    name = name or config.INSTALLER_BACKEND
+    if name not in _instances:
+        backend = _BACKENDS.get(name)
+        if backend is None:
+            raise ValueError("Unknown installer backend: {0}".format(name))
+        _instances[name] = backend() if isinstance(backend, type) else backend
+    return _instances[name]
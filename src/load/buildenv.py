@@ -0,0 +1,337 @@
+# -*- coding: utf-8 -*-
+"""
+Reusable build environments for Load
+
+Source builds (sdists, Git checkouts) normally make pip create a fresh
+isolated build environment every time. This module keeps a pool of prepared
+environments keyed by the ``[build-system] requires`` list, builds the wheel
+with ``--no-build-isolation`` inside a matching one and installs the result.
+Git sources are cloned first so their own requirements pick the environment.
+"""
+
+import collections
+import glob
+import hashlib
+import json
+import os
+import re
+import shutil
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+from . import config, telemetry
+from .offline import pip_args as offline_pip_args
+
+# Type hints for static type checkers (Python 2/3 compatible)
+if False:  # MYPY
+    from typing import List, Optional, Sequence, Union  # noqa: F401
+
+# pip's implicit build requirements for projects without pyproject.toml
+DEFAULT_BUILD_REQUIRES = ("setuptools>=40.8.0", "wheel")
+
+_MARKER = "load-build-env.json"
+
+
+def read_build_requires(project_dir):
+    # type: (str) -> List[str]
+    """Return ``[build-system] requires`` of a source tree (or pip's defaults)."""
+    pyproject = os.path.join(project_dir, "pyproject.toml")
+    if not os.path.exists(pyproject):
+        return list(DEFAULT_BUILD_REQUIRES)
+
+    with open(pyproject, "rb") as f:
+        content = f.read()
+
+    try:
+        import tomllib  # Python 3.11+
+    except ImportError:
+        tomllib = None
+
+    if tomllib is not None:
+        try:
+            data = tomllib.loads(content.decode("utf-8"))
+        except ValueError:
+            return list(DEFAULT_BUILD_REQUIRES)
+        requires = data.get("build-system", {}).get("requires")
+        return list(requires) if requires else list(DEFAULT_BUILD_REQUIRES)
+
+    # Minimal fallback: find the requires array of the [build-system] table
+    text = content.decode("utf-8", "replace")
+    match = re.search(
+        r"^\[build-system\][^\[]*?^requires\s*=\s*\[(.*?)\]",
+        text,
+        re.MULTILINE | re.DOTALL,
+    )
+    if not match:
+        return list(DEFAULT_BUILD_REQUIRES)
+    return re.findall(r"[\"']([^\"']+)[\"']", match.group(1)) or list(
+        DEFAULT_BUILD_REQUIRES
+    )
+
+
+class BuildEnvPool(object):
+    """Pool of prepared build environments evicted by size and age.
+
+    Every environment is a ``pip install --target`` directory holding the
+    build requirements. It is put on ``PYTHONPATH`` of the pip process that
+    builds the wheel, so the build backend is importable without pip having
+    to create (and populate) an isolated environment.
+    """
+
+    def __init__(self, root=None, max_size=None, max_age=None):
+        # type: (Optional[str], Optional[int], Optional[float]) -> None
+        self.root = root or os.path.join(config.CACHE_DIR, "build-envs")
+        self.max_size = config.BUILD_ENV_MAX_SIZE if max_size is None else max_size
+        self.max_age = config.BUILD_ENV_MAX_AGE if max_age is None else max_age
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def key(requires):
+        # type: (Sequence[str]) -> str
+        """Stable key for a set of build requirements."""
+        normalized = sorted(
+            set(re.sub(r"\s+", "", r).lower() for r in requires if r.strip())
+        )
+        return hashlib.sha256("\n".join(normalized).encode("utf-8")).hexdigest()[:16]
+
+    @staticmethod
+    def _read_marker(path):
+        # type: (str) -> Optional[dict]
+        try:
+            with open(os.path.join(path, _MARKER)) as f:
+                return json.load(f)
+        except (IOError, OSError, ValueError):
+            return None
+
+    def _is_ready(self, path):
+        # type: (str) -> bool
+        if self._read_marker(path) is None:
+            return False
+        return any(entry.endswith(".dist-info") for entry in os.listdir(path))
+
+    def acquire(self, requires=None):
+        # type: (Optional[Sequence[str]]) -> Optional[str]
+        """Return the path of a ready environment for ``requires``.
+
+        Creates the environment on a miss. Returns None if it cannot be
+        prepared, in which case the caller should fall back to an isolated
+        pip build.
+        """
+        requires = list(requires or DEFAULT_BUILD_REQUIRES)
+        path = os.path.join(self.root, self.key(requires))
+
+        with self._lock:
+            if self._is_ready(path):
+                marker = self._read_marker(path) or {}
+                if time.time() - marker.get("created", 0) <= self.max_age:
+                    os.utime(path, None)  # last used, for LRU eviction
+                    return path
+            shutil.rmtree(path, ignore_errors=True)
+
+            if not self._create(path, requires):
+                return None
+            self.evict()
+            return path
+
+    def _create(self, path, requires):
+        # type: (str, List[str]) -> bool
+        if not os.path.isdir(self.root):
+            os.makedirs(self.root)
+        tmp = tempfile.mkdtemp(prefix=".tmp-", dir=self.root)
+        try:
+            cmd = [sys.executable, "-m", "pip", "install", "--quiet", "--target", tmp]
+            cmd += offline_pip_args()
+            result = subprocess.run(cmd + requires, capture_output=True, text=True)
+            if result.returncode != 0:
+                return False
+            with open(os.path.join(tmp, _MARKER), "w") as f:
+                json.dump({"requires": requires, "created": time.time()}, f)
+            if not self._is_ready(tmp):
+                return False
+            try:
+                os.rename(tmp, path)
+            except OSError:
+                # Another process prepared the same environment first
+                return self._is_ready(path)
+            return True
+        finally:
+            shutil.rmtree(tmp, ignore_errors=True)
+
+    def evict(self):
+        # type: () -> int
+        """Drop environments older than max_age, then the least recently used
+        ones beyond max_size. Returns the number of removed environments."""
+        if not os.path.isdir(self.root):
+            return 0
+
+        now = time.time()
+        removed = 0
+        entries = []
+        for name in os.listdir(self.root):
+            path = os.path.join(self.root, name)
+            if name.startswith(".") or not os.path.isdir(path):
+                continue
+            marker = self._read_marker(path)
+            if marker is None or now - marker.get("created", 0) > self.max_age:
+                shutil.rmtree(path, ignore_errors=True)
+                removed += 1
+                continue
+            entries.append((os.path.getmtime(path), path))
+
+        entries.sort(reverse=True)
+        for _, path in entries[self.max_size:]:
+            shutil.rmtree(path, ignore_errors=True)
+            removed += 1
+        return removed
+
+    def environ(self, path):
+        # type: (str) -> dict
+        """Process environment that makes ``path`` importable for a build."""
+        env = os.environ.copy()
+        pythonpath = env.get("PYTHONPATH")
+        env["PYTHONPATH"] = path + (os.pathsep + pythonpath if pythonpath else "")
+        return env
+
+
+_pool = None  # type: Optional[BuildEnvPool]
+
+
+def get_build_env_pool():
+    # type: () -> BuildEnvPool
+    """Return the process-wide build environment pool."""
+    global _pool
+    if _pool is None:
+        _pool = BuildEnvPool()
+    return _pool
+
+
+def install_with_build_env(
+    source,  # type: Union[str, Sequence[str]]
+    requires=None,  # type: Optional[Sequence[str]]
+    registry=None,  # type: Optional[str]
+    source_url=None,  # type: Optional[str]
+):
+    # type: (...) -> bool
+    """Build ``source`` in a pooled build environment and install the wheel.
+
+    ``source`` is anything ``pip wheel`` accepts (``git+https://...``, a
+    source directory, an sdist path), or a list of them built in one pip
+    run. Falls back to a plain, isolated ``pip install`` when reuse is
+    disabled or the pooled build fails. ``registry`` and ``source_url``
+    (the original location of a single source) are recorded for lockfiles.
+    """
+    from .installer import run_install
+
+    sources = [source] if isinstance(source, str) else list(source)
+    fallback = [sys.executable, "-m", "pip", "install"] + offline_pip_args() + sources
+    if source_url is None and len(sources) == 1 and "://" in sources[0]:
+        source_url = sources[0]
+    if not config.BUILD_ENV_REUSE:
+        return run_install(fallback, registry, source=source_url).returncode == 0
+
+    pool = get_build_env_pool()
+    with telemetry.phase("build"):
+        env_path = pool.acquire(requires)
+    if env_path is not None:
+        wheel_dir = tempfile.mkdtemp(prefix="load-wheel-")
+        try:
+            cmd = [
+                sys.executable, "-m", "pip", "wheel", "--no-deps",
+                "--no-build-isolation", "--wheel-dir", wheel_dir,
+            ] + sources
+            with telemetry.phase("build"):
+                result = subprocess.run(
+                    cmd, capture_output=True, text=True, env=pool.environ(env_path)
+                )
+            wheels = glob.glob(os.path.join(wheel_dir, "*.whl"))
+            if result.returncode == 0 and len(wheels) >= len(sources):
+                # Dependencies are resolved against the real environment
+                cmd = [sys.executable, "-m", "pip", "install"]
+                cmd += offline_pip_args() + wheels
+                result = run_install(cmd, registry, source=source_url)
+                return result.returncode == 0
+        finally:
+            shutil.rmtree(wheel_dir, ignore_errors=True)
+
+    return run_install(fallback, registry, source=source_url).returncode == 0
+
+
+def checkout(source, dest):
+    # type: (str, str) -> Optional[str]
+    """Clone ``git+https://...[@ref][#subdirectory=...]`` into ``dest``.
+
+    Returns the project directory, or None if the clone failed (no ``git``,
+    unknown ref...), so the caller can leave the source to pip.
+    """
+    url, _, fragment = source.partition("#")
+    url = url[len("git+"):] if url.startswith("git+") else url
+    ref = None
+    scheme, sep, rest = url.partition("://")
+    if "@" in rest.rsplit("/", 1)[-1]:  # ...repo@ref, not user@host
+        rest, _, ref = rest.rpartition("@")
+        url = scheme + sep + rest
+    subdirectory = ""
+    for part in fragment.split("&"):
+        key, _, value = part.partition("=")
+        if key == "subdirectory":
+            subdirectory = value
+
+    try:
+        with telemetry.phase("download"):
+            cmd = ["git", "clone", "--quiet", "--depth", "1"]
+            result = subprocess.run(
+                cmd + (["--branch", ref] if ref else []) + [url, dest],
+                capture_output=True, text=True,
+            )
+            if result.returncode != 0 and ref:  # a commit, not a branch or tag
+                shutil.rmtree(dest, ignore_errors=True)
+                result = subprocess.run(["git", "clone", "--quiet", url, dest],
+                                        capture_output=True, text=True)
+                if result.returncode == 0:
+                    result = subprocess.run(
+                        ["git", "-C", dest, "checkout", "--quiet", ref],
+                        capture_output=True, text=True,
+                    )
+    except OSError:
+        return None
+    project_dir = os.path.join(dest, subdirectory)
+    if result.returncode != 0 or not os.path.isdir(project_dir):
+        return None
+    return project_dir
+
+
+def install_git_with_build_env(sources, registry=None):
+    # type: (Union[str, Sequence[str]], Optional[str]) -> bool
+    """Clone Git ``sources`` and build each in a pooled environment keyed
+    by its own ``[build-system] requires`` (hatchling, flit, Cython...).
+
+    Sources with the same requirements share one pip run. If any clone
+    fails, everything is left to :func:`install_with_build_env`, which
+    lets pip clone.
+    """
+    sources = [sources] if isinstance(sources, str) else list(sources)
+    workdir = tempfile.mkdtemp(prefix="load-git-")
+    try:
+        groups = collections.OrderedDict()  # type: collections.OrderedDict
+        for i, source in enumerate(sources):
+            project_dir = checkout(source, os.path.join(workdir, str(i)))
+            if project_dir is None:
+                return install_with_build_env(sources, registry=registry)
+            requires = read_build_requires(project_dir)
+            key = BuildEnvPool.key(requires)
+            if key not in groups:
+                groups[key] = (requires, [])
+            groups[key][1].append((source, project_dir))
+        success = True
+        for requires, entries in groups.values():
+            source_url = entries[0][0] if len(entries) == 1 else None
+            success = install_with_build_env(
+                [project_dir for _, project_dir in entries], requires,
+                registry=registry, source_url=source_url,
+            ) and success
+        return success
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
@@ -0,0 +1,138 @@
+# -*- coding: utf-8 -*-
+"""
+Content-addressed code cache for Load
+
+Source that Load runs itself (rather than through the import system and
+its ``.pyc`` files) is compiled once and the code object kept on disk
+under ``CACHE_DIR/code``, marshalled. The key is a hash of the source, the
+file name it is compiled as (tracebacks show it), the optimization level
+and ``importlib.util.MAGIC_NUMBER``, so another interpreter version never
+reads an incompatible entry. Unchanged files skip compilation on later
+starts; a corrupt or unreadable entry is just compiled again.
+
+Disable with ``LOAD_CODE_CACHE=0``.
+"""
+
+import hashlib
+import importlib.util
+import marshal
+import os
+import sys
+import threading
+
+from . import config
+
+# Type hints for static type checkers (Python 2/3 compatible)
+if False:  # MYPY
+    from typing import Any, Dict, Optional  # noqa: F401
+
+MAGIC = importlib.util.MAGIC_NUMBER
+
+_stats = {"hits": 0, "misses": 0, "errors": 0}
+_lock = threading.Lock()
+
+
+def cache_dir():
+    # type: () -> str
+    return os.path.join(config.CACHE_DIR, "code")
+
+
+def code_key(digest, filename):
+    # type: (str, str) -> str
+    """Cache key of source with SHA-256 ``digest`` compiled as ``filename``."""
+    key = hashlib.sha256()
+    for part in (
+        MAGIC,
+        digest.encode("ascii"),
+        filename.encode("utf-8", "surrogateescape"),
+        str(sys.flags.optimize).encode("ascii"),
+    ):
+        key.update(part)
+        key.update(b"\0")
+    return key.hexdigest()
+
+
+def _entry(key):
+    # type: (str) -> str
+    return os.path.join(cache_dir(), key[:2], key + ".bin")
+
+
+def _count(name):
+    # type: (str) -> None
+    with _lock:
+        _stats[name] += 1
+
+
+def _read(path):
+    # type: (str) -> Optional[Any]
+    try:
+        with open(path, "rb") as f:
+            data = f.read()
+    except (IOError, OSError):
+        return None
+    if data[:len(MAGIC)] != MAGIC:
+        return None
+    try:
+        return marshal.loads(data[len(MAGIC):])
+    except (EOFError, ValueError, TypeError):
+        _count("errors")
+        return None
+
+
+def _write(path, code):
+    # type: (str, Any) -> None
+    tmp = "{0}.{1}.{2}.tmp".format(path, os.getpid(), threading.current_thread().ident)
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(tmp, "wb") as f:
+            f.write(MAGIC + marshal.dumps(code))
+        os.replace(tmp, path)  # atomic: readers never see half an entry
+    except (IOError, OSError):
+        _count("errors")
+        try:
+            os.remove(tmp)
+        except OSError:
+            pass
+
+
+def get_code(source, filename, digest=None):
+    # type: (bytes, str, Optional[str]) -> Any
+    """The code object of ``source`` compiled as ``filename``.
+
+    ``digest`` is the source's SHA-256 if the caller already has it.
+    Served from the cache when possible, otherwise compiled and stored.
+    """
+    if not config.CODE_CACHE:
+        return compile(source, filename, "exec", dont_inherit=True)
+    if digest is None:
+        digest = hashlib.sha256(source).hexdigest()
+    path = _entry(code_key(digest, filename))
+    code = _read(path)
+    if code is not None:
+        _count("hits")
+        return code
+    _count("misses")
+    code = compile(source, filename, "exec", dont_inherit=True)
+    _write(path, code)
+    return code
+
+
+def stats():
+    # type: () -> Dict[str, int]
+    """Hits, misses and errors (unreadable or unwritable entries)."""
+    with _lock:
+        return dict(_stats)
+
+
+def clear():
+    # type: () -> int
+    """Delete every cached code object; returns how many were removed."""
+    removed = 0
+    for root, _, files in os.walk(cache_dir()):
+        for name in files:
+            try:
+                os.remove(os.path.join(root, name))
+                removed += 1
+            except OSError:
+                pass
+    return removed
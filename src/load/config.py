@@ -3,6 +3,8 @@
 Configuration variables for Load
 """
 
+import os
+
 # Cache modułów w pamięci
 _module_cache = {}
 
@@ -10,3 +12,68 @@ _module_cache = {}
 AUTO_PRINT = True
 PRINT_LIMIT = 1000
 PRINT_TYPES = (str, int, float, list, dict, tuple)
+# Elements of an array/DataFrame read to compute auto-print statistics
+PRINT_SAMPLE = 10000
+# Where auto-print and installer messages go (see load.output) and the
+# maximum lines per second (0: unlimited)
+OUTPUT = os.environ.get("LOAD_OUTPUT", "stdout")
+OUTPUT_RATE = float(os.environ.get("LOAD_OUTPUT_RATE") or 0)
+
+# On-disk cache (build environments, index metadata, locks)
+CACHE_DIR = os.environ.get("LOAD_CACHE_DIR") or os.path.join(
+    os.path.expanduser("~"), ".cache", "load"
+)
+
+# Reusable build environments for source builds
+BUILD_ENV_REUSE = os.environ.get("LOAD_BUILD_ENV_REUSE", "1") != "0"
+BUILD_ENV_MAX_SIZE = 8
+BUILD_ENV_MAX_AGE = 7 * 24 * 3600
+
+# Compiled code of local/plugin files, keyed by source hash (see load.codecache)
+CODE_CACHE = os.environ.get("LOAD_CODE_CACHE", "1") != "0"
+# Threads reading and compiling files in load.local_dir()
+LOCAL_DIR_WORKERS = 8
+
+# Pooled HTTP client for registry traffic
+HTTP_TIMEOUT = 30
+HTTP_MAX_PER_HOST = 4
+HTTP_MAX_CONCURRENCY = 8
+
+# Simple-index metadata cache (seconds a page is trusted before revalidation)
+INDEX_CACHE_TTL = 60
+
+# Offline mode: install only from a local directory / file:// index
+OFFLINE = os.environ.get("LOAD_OFFLINE", "").lower() in ("1", "true", "yes", "on")
+OFFLINE_INDEX = os.environ.get("LOAD_OFFLINE_INDEX")
+
+# Registry racing (load(..., registry="auto")) and circuit breakers
+DEFAULT_REGISTRY = os.environ.get("LOAD_REGISTRY") or None
+REGISTRY_PRIORITY = [
+    name.strip()
+    for name in os.environ.get("LOAD_REGISTRY_PRIORITY", "").split(",")
+    if name.strip()
+]
+REGISTRY_RACE_TIMEOUT = 5.0
+REGISTRY_FAILURE_THRESHOLD = 3
+REGISTRY_RESET_TIMEOUT = 30.0
+
+# App-scoped install directory (pip install --target) instead of site-packages
+TARGET_DIR = os.environ.get("LOAD_TARGET_DIR") or None
+
+# Seconds to wait for another process installing the same distribution
+INSTALL_LOCK_TIMEOUT = 600.0
+
+# Import name -> distribution overrides (see load.register_distribution)
+DISTRIBUTION_OVERRIDES = {}  # type: ignore
+
+# Installer backend: pip, pip-tuned, wheel, uv or auto (see load.backends)
+INSTALLER_BACKEND = os.environ.get("LOAD_INSTALLER", "pip")
+PIP_TUNED_FLAGS = [
+    "--disable-pip-version-check",
+    "--no-input",
+    "--progress-bar=off",
+    "--no-color",
+]
+
+# Seconds to collect missing packages into one pip run (0: install at once)
+INSTALL_WINDOW = 0.05
@@ -6,8 +6,30 @@ Core functionality of Load
 from __future__ import absolute_import, division, print_function, unicode_literals
 
 # Import config and utils
-from .config import _module_cache, AUTO_PRINT, PRINT_LIMIT
-from .utils import load  # noqa: F401
+from . import config
+from .config import _module_cache
+from .utils import load, local_dir  # noqa: F401
+from .httpclient import get_http_pool
+from .offline import is_offline, set_offline  # noqa: F401
+from .failover import registry_health
+from .requirements import load_requirements  # noqa: F401
+from .lockfile import from_lock, lock  # noqa: F401
+from .target import get_target_dir, set_target_dir  # noqa: F401
+from .telemetry import add_install_listener, remove_install_listener  # noqa: F401
+from .telemetry import stats as install_stats
+from .backends import get_backend, register_backend, set_backend  # noqa: F401
+from .formatters import register_formatter  # noqa: F401
+from .installed import get_installed_index
+from .output import set_output  # noqa: F401
+from .runtime import configure, get_settings, settings  # noqa: F401
+from .installqueue import (  # noqa: F401
+    flush as flush_installs,
+    get_install_queue,
+    prefetch,
+)
+from .names import register_distribution, resolve_distribution  # noqa: F401
+from .localfiles import records as local_records, watch  # noqa: F401
+from .codecache import stats as code_cache_stats
 
 
 # Shortcuts for different sources
@@ -26,30 +48,30 @@ def load_url(url, alias=None):
     return load(url, alias=alias)
 
 
-def load_local(path, alias=None):
+def load_local(path, alias=None, reload=False):
     """Shortcut for local files"""
-    return load(path, alias=alias)
+    return load(path, alias=alias, reload=reload)
 
 
 # Auto-print control functions
 def enable_auto_print():
     """Enable automatic result display"""
-    global AUTO_PRINT
-    AUTO_PRINT = True
+    config.AUTO_PRINT = True
+    configure(auto_print=True)
     print("✅ Auto-print enabled")
 
 
 def disable_auto_print():
     """Disable automatic result display"""
-    global AUTO_PRINT
-    AUTO_PRINT = False
+    config.AUTO_PRINT = False
+    configure(auto_print=False)
     print("❌ Auto-print disabled")
 
 
 def set_print_limit(limit):
     """Set character limit for auto-print"""
-    global PRINT_LIMIT
-    PRINT_LIMIT = limit
+    config.PRINT_LIMIT = limit
+    configure(print_limit=limit)
     print("📏 Print limit: {0} characters".format(limit))
 
 
@@ -58,6 +80,19 @@ def info():
     return {
         "cache_size": len(_module_cache),
         "cached_modules": list(_module_cache.keys()),
-        "auto_print": AUTO_PRINT,
-        "print_limit": PRINT_LIMIT,
+        "auto_print": get_settings().auto_print,
+        "print_limit": get_settings().print_limit,
+        "http_pool": get_http_pool().stats(),
+        "offline": is_offline(),
+        "registries": registry_health(),
+        "target_dir": get_target_dir(),
+        "installs": install_stats(),
+        "installed_index": get_installed_index().stats(),
+        "installer_backend": get_backend().name,
+        "install_queue": {
+            "pending": len(get_install_queue()),
+            "batches": get_install_queue().batches,
+        },
+        "local_modules": len(local_records()),
+        "code_cache": code_cache_stats(),
     }
@@ -0,0 +1,234 @@
+# -*- coding: utf-8 -*-
+"""
+Concurrent registry resolution with circuit breakers
+
+``load(name, registry="auto")`` asks every configured index (private
+registries with an ``index_url`` plus public PyPI) at the same time whether
+it has the spec, and picks the first positive answer in priority order.
+Registries that keep failing or timing out are skipped for a while, so one
+slow mirror cannot stall every ``load()``.
+"""
+
+import threading
+import time
+
+try:
+    from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeout
+except ImportError:  # Python 2.7 without the futures backport
+    ThreadPoolExecutor = None
+
+from . import config
+from .index import get_index
+
+# Type hints for static type checkers (Python 2/3 compatible)
+if False:  # MYPY
+    from typing import Dict, List, Optional, Tuple  # noqa: F401
+
+PYPI_INDEX_URL = "https://pypi.org/simple/"
+
+
+class RegistriesUnavailable(IOError):
+    """Registries ranked first could not be asked (timeout, error, open
+    circuit breaker), so where the spec comes from cannot be decided."""
+
+    def __init__(self, spec, registries):
+        # type: (str, List[str]) -> None
+        super(RegistriesUnavailable, self).__init__(
+            "cannot tell where {0} comes from: no answer from {1}".format(
+                spec, ", ".join(registries)
+            )
+        )
+        self.spec = spec
+        self.registries = registries
+
+
+class CircuitBreaker(object):
+    """Consecutive-failure circuit breaker.
+
+    ``closed``: calls allowed. After ``failure_threshold`` consecutive
+    failures it goes ``open`` and rejects calls for ``reset_timeout``
+    seconds, then lets a single trial call through (``half-open``); its
+    outcome closes or re-opens the breaker.
+    """
+
+    def __init__(self, failure_threshold=None, reset_timeout=None):
+        # type: (Optional[int], Optional[float]) -> None
+        self.failure_threshold = failure_threshold or config.REGISTRY_FAILURE_THRESHOLD
+        self.reset_timeout = (
+            config.REGISTRY_RESET_TIMEOUT if reset_timeout is None else reset_timeout
+        )
+        self.failures = 0
+        self.opened_at = None  # type: Optional[float]
+        self._trial = False
+        self._lock = threading.Lock()
+
+    @property
+    def state(self):
+        # type: () -> str
+        if self.opened_at is None:
+            return "closed"
+        if time.time() - self.opened_at >= self.reset_timeout:
+            return "half-open"
+        return "open"
+
+    def allow(self):
+        # type: () -> bool
+        """Whether a call may go through now."""
+        with self._lock:
+            state = self.state
+            if state == "closed":
+                return True
+            if state == "half-open" and not self._trial:
+                self._trial = True
+                return True
+            return False
+
+    def record_success(self):
+        # type: () -> None
+        with self._lock:
+            self.failures = 0
+            self.opened_at = None
+            self._trial = False
+
+    def record_failure(self):
+        # type: () -> None
+        with self._lock:
+            self.failures += 1
+            if self._trial or self.failures >= self.failure_threshold:
+                self.opened_at = time.time()
+            self._trial = False
+
+
+_breakers = {}  # type: Dict[str, CircuitBreaker]
+_breakers_lock = threading.Lock()
+_executor = None
+
+
+def get_breaker(registry):
+    # type: (str) -> CircuitBreaker
+    """Return the circuit breaker of ``registry``."""
+    with _breakers_lock:
+        breaker = _breakers.get(registry)
+        if breaker is None:
+            breaker = _breakers[registry] = CircuitBreaker()
+        return breaker
+
+
+def registry_health():
+    # type: () -> Dict[str, str]
+    """Breaker state of every registry seen so far."""
+    with _breakers_lock:
+        return dict((name, breaker.state) for name, breaker in _breakers.items())
+
+
+def registry_indexes():
+    # type: () -> List[Tuple[str, str]]
+    """(name, index_url) of every queryable registry, in priority order.
+
+    Registries named in ``REGISTRY_PRIORITY`` come first, in that order;
+    the remaining private registries follow in configuration order and
+    public PyPI comes last.
+    """
+    from .registry import PRIVATE_REGISTRIES
+
+    indexes = [
+        (name, conf["index_url"])
+        for name, conf in PRIVATE_REGISTRIES.items()
+        if conf.get("index_url")
+    ]
+    indexes.append(("pypi", PYPI_INDEX_URL))
+
+    priority = list(config.REGISTRY_PRIORITY or [])
+    rank = dict((name, i) for i, name in enumerate(priority))
+    return sorted(indexes, key=lambda item: rank.get(item[0], len(priority)))
+
+
+def _get_executor():
+    global _executor
+    if _executor is None:
+        with _breakers_lock:
+            if _executor is None:
+                _executor = ThreadPoolExecutor(
+                    max_workers=config.HTTP_MAX_CONCURRENCY,
+                    thread_name_prefix="load-registry",
+                )
+    return _executor
+
+
+def _query(name, url, spec, timeout):
+    """Ask one registry for ``spec`` and record the outcome on its breaker.
+
+    Answers slower than ``timeout`` count as failures even when they
+    eventually arrive, so a slow mirror is marked down like a dead one.
+    """
+    breaker = get_breaker(name)
+    start = time.time()
+    try:
+        found = get_index(url).find_file(spec)
+    except Exception:  # noqa: B902 - any index failure marks it unhealthy
+        breaker.record_failure()
+        raise
+    if time.time() - start > timeout:
+        breaker.record_failure()
+    else:
+        breaker.record_success()
+    return found
+
+
+def find_registry(spec, timeout=None):
+    # type: (str, Optional[float]) -> Optional[str]
+    """Name of the highest-priority registry that has ``spec``, or None.
+
+    All healthy registries are queried concurrently. A hit is returned only
+    once every registry ranked above it has answered "no": if one of them
+    failed, ran out of time or was skipped by its open breaker, a public
+    package must not win over a private one that may have the same name,
+    so :class:`RegistriesUnavailable` naming them is raised instead. None
+    means every registry answered "no".
+    """
+    timeout = config.REGISTRY_RACE_TIMEOUT if timeout is None else timeout
+    ranked = [
+        (name, url, get_breaker(name).allow()) for name, url in registry_indexes()
+    ]
+    unanswered = []  # registries skipped or without an answer
+
+    if ThreadPoolExecutor is None:
+        for name, url, allowed in ranked:
+            if not allowed:
+                unanswered.append(name)
+                continue
+            try:
+                found = _query(name, url, spec, timeout)
+            except Exception:  # noqa: B902
+                unanswered.append(name)
+                continue
+            if found is not None:
+                break
+        else:
+            name = None
+    else:
+        executor = _get_executor()
+        futures = [
+            (name, allowed and executor.submit(_query, name, url, spec, timeout))
+            for name, url, allowed in ranked
+        ]
+        deadline = time.time() + timeout
+        for name, future in futures:
+            if not future:
+                unanswered.append(name)
+                continue
+            try:
+                found = future.result(max(0, deadline - time.time()))
+            except FutureTimeout:
+                unanswered.append(name)
+                continue
+            except Exception:  # noqa: B902
+                unanswered.append(name)
+                continue
+            if found is not None:
+                break
+        else:
+            name = None
+    if unanswered:
+        raise RegistriesUnavailable(spec, unanswered)
+    return name
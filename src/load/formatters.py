@@ -0,0 +1,208 @@
+# -*- coding: utf-8 -*-
+"""
+Type-dispatched formatters for Load's auto-print
+
+``smart_print`` looks up a formatter by the object's type: modules are
+short-circuited, every other type is resolved once along its MRO and the
+result cached per type. Formatters can be registered for a type or, to
+avoid importing heavy packages, for a dotted class name
+(``"pandas.core.frame.DataFrame"``). Types without a formatter fall back to
+duck-typed probes (``status_code``, ``shape``, ``__len__``...).
+
+A formatter is ``func(obj, name, limit)`` returning the lines to print.
+"""
+
+import threading
+import weakref
+from types import ModuleType
+
+from .runtime import get_settings
+from .preview import array_summary, bounded_repr, head, human_size, response_preview
+
+# Type hints for static type checkers (Python 2/3 compatible)
+if False:  # MYPY
+    from typing import Any, Dict, List, Union  # noqa: F401
+
+_by_type = {}  # type: Dict[type, Any]
+_by_name = {}  # type: Dict[str, Any]
+_resolved = weakref.WeakKeyDictionary()  # type: Any
+_lock = threading.Lock()
+
+
+def _truncated(name, obj, limit):
+    # type: (str, Any, int) -> str
+    text, truncated = bounded_repr(obj, limit, as_str=True)
+    return " {0}: {1}{2}".format(name, text, "..." if truncated else "")
+
+
+def format_module(obj, name, limit):
+    # type: (ModuleType, str, int) -> List[str]
+    return [" {0}: module".format(name)]
+
+
+def format_response(obj, name, limit):
+    # type: (Any, str, int) -> List[str]
+    lines = [" {0}: {1} - {2}".format(name, obj.status_code, obj.url)]
+    body = response_preview(obj, limit)
+    if body is not None:
+        lines.append(" {0}: {1}".format(*body))
+    return lines
+
+
+def format_array(obj, name, limit):
+    # type: (Any, str, int) -> List[str]
+    """Shape, dtype, size and statistics of a bounded sample."""
+    summary = array_summary(obj)
+    line = " {0}: {1} shape {2}".format(name, summary["type"], summary["shape"])
+    for key in ("dtype", "dtypes"):
+        if summary.get(key):
+            line += ", {0} {1}".format(key, summary[key])
+    if summary.get("nbytes") is not None:
+        line += ", {0}".format(human_size(summary["nbytes"]))
+    lines = [line]
+    if summary["lazy"]:
+        lines.append("   lazy: data not computed")
+        return lines
+    if "sample" not in summary:
+        return lines
+
+    rows, shape = summary["sampled_rows"], summary["shape"]
+    stats = list(summary.get("stats", []))
+    if "nulls" in summary:
+        stats.insert(0, ("nulls", summary["nulls"]))
+    scope = "all rows"
+    if rows != shape[0]:
+        scope = "first {0} of {1} rows".format(rows, shape[0])
+    lines.append("   {0}{1}".format(
+        scope, "".join(", {0} {1}".format(k, v) for k, v in stats)
+    ))
+    for column, column_stats in summary.get("columns", []):
+        lines.append("   {0}: {1}".format(
+            column, ", ".join("{0} {1}".format(k, v) for k, v in column_stats)
+        ))
+    sample = summary["sample"]
+    preview = sample.head(5) if hasattr(sample, "head") else sample[:5]
+    lines.append(bounded_repr(str(preview), limit, as_str=True)[0])
+    return lines
+
+
+def format_collection(obj, name, limit):
+    # type: (Any, str, int) -> List[str]
+    if len(obj) > 10:
+        lines = [" {0}: {1} items".format(name, len(obj))]
+        first = head(obj, 5)
+        if first is not None:
+            lines.append("First 5: {0}...".format(bounded_repr(first, limit)[0]))
+        return lines
+    return [_truncated(name, obj, limit)]
+
+
+def format_scalar(obj, name, limit):
+    # type: (Any, str, int) -> List[str]
+    return [_truncated(name, obj, limit)]
+
+
+def format_object(obj, name, limit):
+    # type: (Any, str, int) -> List[str]
+    """Fallback for unregistered types: probe the instance's attributes."""
+    if hasattr(obj, "status_code"):  # HTTP Response
+        return format_response(obj, name, limit)
+    if hasattr(obj, "shape"):  # DataFrame/Array
+        return format_array(obj, name, limit)
+    if hasattr(obj, "__len__") and len(obj) > 10:  # Long collections
+        return format_collection(obj, name, limit)
+    if isinstance(obj, get_settings().print_types):  # Basic types
+        return format_scalar(obj, name, limit)
+    if hasattr(obj, "__dict__"):  # Objects
+        try:
+            # Try to get length if it's a collection
+            length = len(obj)
+            if length > 0 and not isinstance(obj, (str, bytes, bytearray)):
+                return [" {0}: {1} (length: {2})".format(
+                    name, type(obj).__name__, length
+                )]
+        except (TypeError, AttributeError):
+            pass
+        return [" {0}: {1}".format(name, type(obj).__name__)]
+    return [" {0}: {1} loaded".format(name, type(obj).__name__)]
+
+
+def register_formatter(cls, formatter=None):
+    # type: (Union[type, str], Any) -> Any
+    """Use ``formatter(obj, name, limit) -> lines`` for ``cls`` and subclasses.
+
+    ``cls`` may be a type or a dotted class name (``"numpy.ndarray"``),
+    which matches without importing the package. Usable as a decorator:
+
+        @load.register_formatter(MyType)
+        def show(obj, name, limit):
+            return [" {0}: {1} rows".format(name, obj.rows)]
+    """
+
+    def decorator(func):
+        with _lock:
+            if isinstance(cls, str):
+                _by_name[cls] = func
+            else:
+                _by_type[cls] = func
+            _resolved.clear()
+        return func
+
+    return decorator if formatter is None else decorator(formatter)
+
+
+def _unregister(cls):
+    # type: (Union[type, str]) -> None
+    with _lock:
+        (_by_name if isinstance(cls, str) else _by_type).pop(cls, None)
+        _resolved.clear()
+
+
+def get_formatter(cls):
+    # type: (type) -> Any
+    """The formatter for instances of ``cls`` (cached per type)."""
+    try:
+        return _resolved[cls]
+    except (KeyError, TypeError):
+        pass
+    found = format_object
+    for base in getattr(cls, "__mro__", (cls,)):
+        if base in _by_type:
+            found = _by_type[base]
+            break
+        dotted = "{0}.{1}".format(
+            base.__module__, getattr(base, "__qualname__", base.__name__)
+        )
+        if dotted in _by_name:
+            found = _by_name[dotted]
+            break
+    try:
+        _resolved[cls] = found
+    except TypeError:
+        pass  # not weak-referenceable
+    return found
+
+
+def format_lines(obj, name, limit):
+    # type: (Any, str, int) -> List[str]
+    """The lines ``smart_print`` shows for ``obj``."""
+    if type(obj) is ModuleType:  # never probe modules: __getattr__ may import
+        return format_module(obj, name, limit)
+    return list(get_formatter(type(obj))(obj, name, limit))
+
+
+register_formatter(ModuleType, format_module)
+for _cls in (str, int, float):
+    register_formatter(_cls, format_scalar)
+for _cls in (list, tuple, dict, set, frozenset):
+    register_formatter(_cls, format_collection)
+for _name in ("requests.models.Response", "httpx._models.Response"):
+    register_formatter(_name, format_response)
+for _name in (
+    "numpy.ndarray",
+    "pandas.core.frame.DataFrame",
+    "pandas.core.series.Series",
+    "dask.array.core.Array",
+    "dask.dataframe.core.DataFrame",
+):
+    register_formatter(_name, format_array)
@@ -0,0 +1,266 @@
+# -*- coding: utf-8 -*-
+"""
+Pooled keep-alive HTTP client for Load
+
+``urlopen``/``urlretrieve`` open a new TCP (and TLS) connection per request.
+Registry traffic goes through :class:`HTTPPool` instead, which keeps idle
+connections per host, bounds the number of requests in flight and reports
+how often a connection could be reused.
+"""
+
+import base64
+import shutil
+import threading
+
+try:
+    import http.client as httplib
+    from urllib.parse import urljoin, urlsplit, unquote
+except ImportError:  # Python 2.7
+    import httplib  # type: ignore
+    from urlparse import urljoin, urlsplit  # type: ignore
+    from urllib import unquote  # type: ignore
+
+from . import config
+from ._compat import urlopen
+
+# Type hints for static type checkers (Python 2/3 compatible)
+if False:  # MYPY
+    from typing import Any, Dict, List, Optional, Tuple  # noqa: F401
+
+_REDIRECTS = (301, 302, 303, 307, 308)
+_CHUNK_SIZE = 64 * 1024
+
+
+class HTTPError(IOError):
+    """HTTP response with an error status."""
+
+    def __init__(self, url, status, reason=""):
+        super(HTTPError, self).__init__(
+            "HTTP {0}{1} for {2}".format(status, " " + reason if reason else "", url)
+        )
+        self.url = url
+        self.status = status
+
+
+class HTTPResponse(object):
+    """Fully read response: status, lower-cased headers and body bytes."""
+
+    def __init__(self, url, status, headers, data):
+        # type: (str, int, Dict[str, str], bytes) -> None
+        self.url = url
+        self.status = status
+        self.headers = headers
+        self.data = data
+
+    def text(self, encoding="utf-8"):
+        # type: (str) -> str
+        return self.data.decode(encoding, "replace")
+
+    def json(self):
+        import json
+
+        return json.loads(self.text())
+
+
+class HTTPPool(object):
+    """Per-host keep-alive connection pool with bounded concurrency.
+
+    Args:
+        max_per_host: Idle connections kept per (scheme, host, port)
+        max_concurrency: Requests allowed in flight at the same time
+        timeout: Socket timeout in seconds
+    """
+
+    def __init__(self, max_per_host=None, max_concurrency=None, timeout=None):
+        # type: (Optional[int], Optional[int], Optional[float]) -> None
+        self.max_per_host = max_per_host or config.HTTP_MAX_PER_HOST
+        self.timeout = timeout or config.HTTP_TIMEOUT
+        self._slots = threading.BoundedSemaphore(
+            max_concurrency or config.HTTP_MAX_CONCURRENCY
+        )
+        self._idle = {}  # type: Dict[Tuple[str, str, int], List]
+        self._lock = threading.Lock()
+        self._stats = {"requests": 0, "hits": 0, "misses": 0, "errors": 0, "bytes": 0}
+
+    def _count(self, key, amount=1):
+        with self._lock:
+            self._stats[key] += amount
+
+    def _checkout(self, key):
+        with self._lock:
+            idle = self._idle.get(key)
+            if idle:
+                self._stats["hits"] += 1
+                return idle.pop(), True
+            self._stats["misses"] += 1
+        return self._connect(key), False
+
+    def _connect(self, key):
+        scheme, host, port = key
+        if scheme == "https":
+            return httplib.HTTPSConnection(host, port, timeout=self.timeout)
+        return httplib.HTTPConnection(host, port, timeout=self.timeout)
+
+    def _checkin(self, key, conn):
+        with self._lock:
+            idle = self._idle.setdefault(key, [])
+            if len(idle) < self.max_per_host:
+                idle.append(conn)
+                return
+        conn.close()
+
+    def request(
+        self,
+        method,  # type: str
+        url,  # type: str
+        headers=None,  # type: Optional[Dict[str, str]]
+        body=None,  # type: Optional[bytes]
+        stream_to=None,  # type: Any
+        max_redirects=5,  # type: int
+    ):
+        # type: (...) -> HTTPResponse
+        """Perform a request, following redirects.
+
+        If ``stream_to`` (a writable binary file) is given, the body is
+        copied into it in chunks and ``data`` of the result is empty.
+        """
+        parts = urlsplit(url)
+        if parts.scheme not in ("http", "https"):
+            return self._request_other(url, stream_to)
+
+        headers = dict(headers or {})
+        if parts.username:
+            credentials = "{0}:{1}".format(
+                unquote(parts.username), unquote(parts.password or "")
+            ).encode("utf-8")
+            token = base64.b64encode(credentials).decode("ascii")
+            headers.setdefault("Authorization", "Basic " + token)
+        port = parts.port or (443 if parts.scheme == "https" else 80)
+        key = (parts.scheme, parts.hostname, port)
+        path = parts.path or "/"
+        if parts.query:
+            path += "?" + parts.query
+
+        self._count("requests")
+        with self._slots:
+            conn, reused = self._checkout(key)
+            try:
+                try:
+                    conn.request(method, path, body=body, headers=headers)
+                    response = conn.getresponse()
+                except (httplib.HTTPException, OSError):
+                    conn.close()
+                    if not reused:
+                        raise
+                    # The server dropped an idle keep-alive connection; the
+                    # other idle ones may be stale too, so open a new one
+                    conn = self._connect(key)
+                    conn.request(method, path, body=body, headers=headers)
+                    response = conn.getresponse()
+
+                status = response.status
+                response_headers = dict(
+                    (k.lower(), v) for k, v in response.getheaders()
+                )
+                if status in _REDIRECTS or status >= 400 or stream_to is None:
+                    data = response.read()
+                    self._count("bytes", len(data))
+                else:
+                    data = b""
+                    while True:
+                        chunk = response.read(_CHUNK_SIZE)
+                        if not chunk:
+                            break
+                        stream_to.write(chunk)
+                        self._count("bytes", len(chunk))
+            except Exception:
+                self._count("errors")
+                conn.close()
+                raise
+
+            if response.will_close:
+                conn.close()
+            else:
+                self._checkin(key, conn)
+
+        if (
+            status in _REDIRECTS
+            and "location" in response_headers
+            and max_redirects > 0
+        ):
+            location = urljoin(url, response_headers["location"])
+            # Credentials are only forwarded to the same host
+            same_host = urlsplit(location).hostname == parts.hostname
+            return self.request(
+                "GET" if status == 303 else method,
+                location,
+                headers=headers if same_host else None,
+                body=None if status == 303 else body,
+                stream_to=stream_to,
+                max_redirects=max_redirects - 1,
+            )
+        return HTTPResponse(url, status, response_headers, data)
+
+    def _request_other(self, url, stream_to=None):
+        # type: (str, Any) -> HTTPResponse
+        """file:// and other schemes urllib understands (no pooling)."""
+        self._count("requests")
+        response = urlopen(url, timeout=self.timeout)
+        try:
+            headers = dict((k.lower(), v) for k, v in response.headers.items())
+            if stream_to is not None:
+                shutil.copyfileobj(response, stream_to, _CHUNK_SIZE)
+                data = b""
+            else:
+                data = response.read()
+        finally:
+            response.close()
+        return HTTPResponse(url, 200, headers, data)
+
+    def get(self, url, headers=None):
+        # type: (str, Optional[Dict[str, str]]) -> HTTPResponse
+        """GET ``url``; error statuses are returned, not raised."""
+        return self.request("GET", url, headers=headers)
+
+    def download(self, url, filepath, headers=None):
+        # type: (str, str, Optional[Dict[str, str]]) -> str
+        """Stream ``url`` into ``filepath``. Raises HTTPError on failure."""
+        with open(filepath, "wb") as f:
+            response = self.request("GET", url, headers=headers, stream_to=f)
+        if response.status >= 400:
+            raise HTTPError(url, response.status)
+        return filepath
+
+    def stats(self):
+        # type: () -> Dict[str, Any]
+        """Request counters and the connection reuse (hit) rate."""
+        with self._lock:
+            stats = dict(self._stats)
+            stats["idle_connections"] = sum(len(c) for c in self._idle.values())
+        checkouts = stats["hits"] + stats["misses"]
+        stats["hit_rate"] = float(stats["hits"]) / checkouts if checkouts else 0.0
+        return stats
+
+    def close(self):
+        # type: () -> None
+        """Close every idle connection."""
+        with self._lock:
+            idle, self._idle = self._idle, {}
+        for connections in idle.values():
+            for conn in connections:
+                conn.close()
+
+
+_pool = None  # type: Optional[HTTPPool]
+_pool_lock = threading.Lock()
+
+
+def get_http_pool():
+    # type: () -> HTTPPool
+    """Return the process-wide HTTP pool."""
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                _pool = HTTPPool()
+    return _pool
@@ -0,0 +1,366 @@
+# -*- coding: utf-8 -*-
+"""
+Simple-index (PEP 503 / PEP 691) client for Load
+
+Project pages of private indexes are fetched directly, cached on disk and
+revalidated with ``ETag``/``Last-Modified``, so Load knows whether a package
+(and version) exists, and which file to install, before running pip.
+"""
+
+import hashlib
+import json
+import os
+import platform
+import re
+import time
+
+try:
+    from html.parser import HTMLParser
+    from urllib.parse import urljoin, urldefrag
+except ImportError:  # Python 2.7
+    from HTMLParser import HTMLParser  # type: ignore
+    from urlparse import urljoin, urldefrag  # type: ignore
+
+from . import config
+from .httpclient import HTTPError, get_http_pool
+
+# Type hints for static type checkers (Python 2/3 compatible)
+if False:  # MYPY
+    from typing import Any, Dict, List, Optional, Tuple  # noqa: F401
+
+PEP691_JSON = "application/vnd.pypi.simple.v1+json"
+ACCEPT = "{0}, application/vnd.pypi.simple.v1+html;q=0.2, text/html;q=0.1".format(
+    PEP691_JSON
+)
+
+_SDIST_SUFFIXES = (".tar.gz", ".tar.bz2", ".zip")
+
+
+def _packaging():
+    """Return the ``packaging`` package (standalone or pip's vendored copy)."""
+    try:
+        import packaging.requirements
+        import packaging.specifiers
+        import packaging.tags
+        import packaging.version
+
+        return packaging
+    except ImportError:
+        pass
+    try:
+        from pip._vendor import packaging
+        import pip._vendor.packaging.requirements  # noqa: F401
+        import pip._vendor.packaging.specifiers  # noqa: F401
+        import pip._vendor.packaging.tags  # noqa: F401
+        import pip._vendor.packaging.version  # noqa: F401
+
+        return packaging
+    except ImportError:
+        return None
+
+
+def normalize_name(name):
+    # type: (str) -> str
+    """PEP 503 project name normalization."""
+    return re.sub(r"[-_.]+", "-", name).lower()
+
+
+def split_spec(spec):
+    # type: (str) -> Tuple[str, Optional[str]]
+    """Split ``name==version`` into (name, version); version is None otherwise."""
+    name, sep, version = spec.partition("==")
+    name = re.split(r"[\s\[<>=!~;@]", name.strip(), 1)[0]
+    if sep:
+        return name, version.split(";")[0].strip() or None
+    return name, None
+
+
+# name or name==version, nothing else: installing the chosen file is the same
+_EXACT = re.compile(r"^\s*[A-Za-z0-9][A-Za-z0-9._-]*\s*(==\s*[^\s;,\[]+)?\s*$")
+
+
+def is_exact(spec):
+    # type: (str) -> bool
+    """Whether the file :func:`select_file` picks for ``spec`` can replace
+    it: no extras, markers or range specifiers that pip has to see."""
+    return _EXACT.match(spec) is not None
+
+
+def file_version(filename, project):
+    # type: (str, str) -> Optional[str]
+    """Version encoded in a wheel or sdist filename of ``project``."""
+    if filename.endswith(".whl"):
+        parts = filename[:-4].split("-")
+        if len(parts) >= 5 and normalize_name(parts[0]) == normalize_name(project):
+            return parts[1]
+        return None
+    for suffix in _SDIST_SUFFIXES:
+        if filename.endswith(suffix):
+            stem = filename[: -len(suffix)]
+            name, _, version = stem.rpartition("-")
+            if name and normalize_name(name) == normalize_name(project):
+                return version
+    return None
+
+
+class _LinkParser(HTMLParser):
+    """Collect anchors of a PEP 503 project page."""
+
+    def __init__(self, base_url):
+        HTMLParser.__init__(self)
+        self.base_url = base_url
+        self.files = []  # type: List[Dict[str, Any]]
+
+    def handle_starttag(self, tag, attrs):
+        if tag != "a":
+            return
+        attrs = dict(attrs)
+        href = attrs.get("href")
+        if not href:
+            return
+        url, fragment = urldefrag(urljoin(self.base_url, href))
+        hashes = {}
+        if "=" in fragment:
+            algo, _, digest = fragment.partition("=")
+            hashes[algo] = digest
+        self.files.append({
+            "filename": url.rstrip("/").rsplit("/", 1)[-1],
+            "url": url,
+            "hashes": hashes,
+            "requires-python": attrs.get("data-requires-python"),
+            "yanked": "data-yanked" in attrs,
+        })
+
+
+def parse_project_page(body, content_type, base_url):
+    # type: (bytes, str, str) -> List[Dict[str, Any]]
+    """Parse a PEP 691 JSON or PEP 503 HTML project page into file entries."""
+    text = body.decode("utf-8", "replace")
+    if PEP691_JSON in (content_type or "") or text.lstrip().startswith("{"):
+        files = []
+        for entry in json.loads(text).get("files", []):
+            files.append({
+                "filename": entry["filename"],
+                "url": urljoin(base_url, entry["url"]),
+                "hashes": entry.get("hashes", {}),
+                "requires-python": entry.get("requires-python"),
+                "yanked": bool(entry.get("yanked")),
+            })
+        return files
+
+    parser = _LinkParser(base_url)
+    parser.feed(text)
+    return parser.files
+
+
+class SimpleIndex(object):
+    """Cached view of one simple index.
+
+    Args:
+        index_url: Base URL of the index (``.../simple/``)
+        cache_dir: Directory for cached project pages
+        ttl: Seconds a cached page is trusted without revalidation
+    """
+
+    def __init__(self, index_url, cache_dir=None, ttl=None):
+        # type: (str, Optional[str], Optional[float]) -> None
+        self.index_url = index_url.rstrip("/") + "/"
+        digest = hashlib.sha256(self.index_url.encode("utf-8")).hexdigest()[:16]
+        self.cache_dir = os.path.join(
+            cache_dir or os.path.join(config.CACHE_DIR, "simple"), digest
+        )
+        self.ttl = config.INDEX_CACHE_TTL if ttl is None else ttl
+
+    def _cache_path(self, project):
+        # type: (str) -> str
+        return os.path.join(self.cache_dir, normalize_name(project) + ".json")
+
+    def _read_cache(self, project):
+        # type: (str) -> Optional[Dict[str, Any]]
+        try:
+            with open(self._cache_path(project)) as f:
+                return json.load(f)
+        except (IOError, OSError, ValueError):
+            return None
+
+    def _write_cache(self, project, entry):
+        # type: (str, Dict[str, Any]) -> None
+        if not os.path.isdir(self.cache_dir):
+            os.makedirs(self.cache_dir)
+        path = self._cache_path(project)
+        tmp = "{0}.{1}.tmp".format(path, os.getpid())
+        with open(tmp, "w") as f:
+            json.dump(entry, f)
+        os.replace(tmp, path)
+
+    def get_files(self, project):
+        # type: (str) -> Optional[List[Dict[str, Any]]]
+        """Return the file entries of ``project``, or None if it does not exist.
+
+        Raises HTTPError/IOError when the index cannot be queried.
+        """
+        cached = self._read_cache(project)
+        if cached is not None and time.time() - cached.get("checked", 0) < self.ttl:
+            return cached["files"]
+        if config.OFFLINE:
+            if cached is not None:
+                return cached["files"]
+            raise IOError("Offline mode: {0} is not cached".format(project))
+
+        url = self.index_url + normalize_name(project) + "/"
+        headers = {"Accept": ACCEPT}
+        if cached is not None:
+            if cached.get("etag"):
+                headers["If-None-Match"] = cached["etag"]
+            if cached.get("last_modified"):
+                headers["If-Modified-Since"] = cached["last_modified"]
+
+        response = get_http_pool().get(url, headers=headers)
+        if response.status == 304 and cached is not None:
+            cached["checked"] = time.time()
+            self._write_cache(project, cached)
+            return cached["files"]
+        if response.status == 404:
+            try:
+                os.remove(self._cache_path(project))
+            except OSError:
+                pass
+            return None
+        if response.status >= 400:
+            raise HTTPError(url, response.status)
+
+        files = parse_project_page(
+            response.data, response.headers.get("content-type", ""), url
+        )
+        self._write_cache(project, {
+            "etag": response.headers.get("etag"),
+            "last_modified": response.headers.get("last-modified"),
+            "checked": time.time(),
+            "files": files,
+        })
+        return files
+
+    def find_file(self, spec):
+        # type: (str) -> Optional[Any]
+        """Pick the file to install for ``spec`` (``name`` or ``name==version``).
+
+        Prefers the newest matching version and, within it, a wheel
+        compatible with this interpreter over an sdist. Returns None when
+        the project or version does not exist, and ``""`` when it cannot
+        tell (see :func:`select_file`).
+        """
+        return select_file(self.get_files(split_spec(spec)[0]), spec)
+
+
+_supported_tags = None  # type: Optional[set]
+
+
+def _supported():
+    # type: () -> set
+    """Wheel tags this interpreter can install (computed once)."""
+    global _supported_tags
+    if _supported_tags is None:
+        packaging = _packaging()
+        if packaging is not None:
+            _supported_tags = set(str(tag) for tag in packaging.tags.sys_tags())
+        else:
+            _supported_tags = set(["py3-none-any", "py2.py3-none-any"])
+    return _supported_tags
+
+
+def _python_allows(requires_python, packaging):
+    # type: (Optional[str], Any) -> bool
+    """Whether this interpreter satisfies a file's ``requires-python``."""
+    if not requires_python or packaging is None:
+        return True
+    try:
+        specifier = packaging.specifiers.SpecifierSet(requires_python)
+    except ValueError:
+        return True  # unparsable metadata: let pip decide
+    return specifier.contains(platform.python_version(), prereleases=True)
+
+
+def select_file(files, spec):
+    # type: (Optional[List[Dict[str, Any]]], str) -> Optional[Any]
+    """Pick the best entry of ``files`` for ``spec``; None if nothing matches.
+
+    With ``packaging`` available, the version must satisfy every specifier
+    of ``spec`` (pre-releases only when a specifier names one) and the
+    file's ``requires-python`` must admit this interpreter. Without it,
+    only ``==`` is honoured and only pure-Python wheel tags are known: if
+    nothing but platform wheels match, ``""`` (unknown) is returned so
+    the caller leaves the choice to pip instead of reporting a miss.
+    """
+    if not files:
+        return None
+    project, version = split_spec(spec)
+    packaging = _packaging()
+    parse_version = packaging.version.parse if packaging else _fallback_version
+    supported = _supported()
+    specifier = None
+    if packaging is not None:
+        try:
+            specifier = packaging.requirements.Requirement(spec).specifier
+        except Exception:  # noqa: B902 - InvalidRequirement: fall back to ==
+            specifier = None
+
+    candidates = []
+    unknown = False  # platform wheels whose tags cannot be checked
+    for entry in files:
+        entry_version = file_version(entry["filename"], project)
+        if entry_version is None or entry.get("yanked"):
+            continue
+        try:
+            parsed = parse_version(entry_version)
+        except ValueError:
+            continue
+        if specifier is not None:
+            if not specifier.contains(parsed, prereleases=bool(specifier.prereleases)):
+                continue
+        elif version is not None and parsed != parse_version(version):
+            continue
+        if not _python_allows(entry.get("requires-python"), packaging):
+            continue
+        if entry["filename"].endswith(".whl"):
+            if not _wheel_tags(entry["filename"]) & supported:
+                unknown = unknown or packaging is None
+                continue
+            rank = 1
+        else:
+            rank = 0
+        candidates.append((parsed, rank, entry))
+
+    if not candidates:
+        return "" if unknown else None
+    candidates.sort(key=lambda c: (c[0], c[1]))
+    return candidates[-1][2]
+
+
+def _wheel_tags(filename):
+    # type: (str) -> set
+    """Expand the compressed tag set of a wheel filename."""
+    python, abi, platform = filename[:-4].split("-")[-3:]
+    return set(
+        "{0}-{1}-{2}".format(p, a, pl)
+        for p in python.split(".")
+        for a in abi.split(".")
+        for pl in platform.split(".")
+    )
+
+
+def _fallback_version(version):
+    # type: (str) -> tuple
+    """Rough numeric version key when ``packaging`` is unavailable."""
+    return tuple(int(p) if p.isdigit() else 0 for p in re.split(r"[.+-]", version))
+
+
+_indexes = {}  # type: Dict[str, SimpleIndex]
+
+
+def get_index(index_url):
+    # type: (str) -> SimpleIndex
+    """Return the shared SimpleIndex for ``index_url``."""
+    index = _indexes.get(index_url)
+    if index is None:
+        index = _indexes[index_url] = SimpleIndex(index_url)
+    return index
@@ -0,0 +1,241 @@
+# -*- coding: utf-8 -*-
+"""
+Index of installed distributions for Load
+
+Maps import names to the distributions that provide them (``cv2`` ->
+``opencv-python``, ``yaml`` -> ``PyYAML``) and back, from
+``importlib.metadata`` (``top_level.txt``, falling back to RECORD). The
+index is kept per ``sys.path`` entry and only entries whose directory
+changed since the last lookup are rescanned, so asking it is cheap enough
+to do before every install.
+"""
+
+import os
+import re
+import sys
+import threading
+
+from .index import normalize_name
+
+# Type hints for static type checkers (Python 2/3 compatible)
+if False:  # MYPY
+    from typing import Any, Dict, List, Optional, Tuple  # noqa: F401
+
+# foo.cpython-311-x86_64-linux-gnu.so, foo.abi3.so, foo.pyd -> foo
+_EXTENSION = re.compile(r"^([A-Za-z_][A-Za-z0-9_]*)(\.[A-Za-z0-9_-]+)*\.(so|pyd)$")
+_IDENTIFIER = re.compile(r"^[A-Za-z_][A-Za-z0-9_]*$")
+
+
+def _metadata():
+    try:
+        from importlib import metadata
+
+        return metadata
+    except ImportError:
+        return None
+
+
+def _import_names(dist):
+    # type: (Any) -> List[str]
+    """Top-level import names a distribution provides."""
+    top_level = None
+    try:
+        top_level = dist.read_text("top_level.txt")
+    except Exception:  # noqa: B902 - unreadable metadata
+        pass
+    if top_level:
+        names = [n.strip().replace("/", ".").split(".")[0] for n in top_level.split()]
+        return sorted(set(n for n in names if n))
+
+    names = set()
+    try:
+        files = dist.files or []
+    except Exception:  # noqa: B902 - unreadable RECORD
+        files = []
+    for path in files:
+        parts = path.parts
+        if not parts or parts[0] in ("..", "__pycache__"):
+            continue
+        first = parts[0]
+        if first.endswith((".dist-info", ".egg-info", ".data", ".pth")):
+            continue
+        if len(parts) > 1:
+            if _IDENTIFIER.match(first):
+                names.add(first)
+        elif first.endswith(".py"):
+            names.add(first[:-3])
+        else:
+            match = _EXTENSION.match(first)
+            if match:
+                names.add(match.group(1))
+    return sorted(names)
+
+
+class InstalledIndex(object):
+    """Import name <-> installed distribution map over ``sys.path``.
+
+    Each ``sys.path`` directory is scanned once and rescanned only when its
+    mtime changes (an install or uninstall adds or removes a
+    ``*.dist-info`` entry there).
+    """
+
+    def __init__(self):
+        # type: () -> None
+        self._entries = {}  # type: Dict[str, Tuple[int, List[Dict[str, Any]]]]
+        self._order = ()  # type: Tuple[str, ...]
+        self._by_import = {}  # type: Dict[str, List[str]]
+        self._by_dist = {}  # type: Dict[str, Dict[str, Any]]
+        self._lock = threading.Lock()
+        self.scans = 0
+
+    @staticmethod
+    def _scan(path):
+        # type: (str) -> List[Dict[str, Any]]
+        metadata = _metadata()
+        if metadata is None:
+            return []
+        found = []
+        try:
+            dists = list(metadata.distributions(path=[path]))
+        except Exception:  # noqa: B902 - unreadable directory
+            return []
+        for dist in dists:
+            try:
+                name = dist.metadata["Name"]
+            except Exception:  # noqa: B902 - broken metadata
+                continue
+            if not name:
+                continue
+            found.append({
+                "name": name,
+                "version": dist.version,
+                "path": path,
+                "imports": _import_names(dist),
+            })
+        return found
+
+    def refresh(self):
+        # type: () -> None
+        """Rescan the ``sys.path`` directories that changed."""
+        paths = []  # type: List[str]
+        stamps = {}  # type: Dict[str, int]
+        for entry in sys.path:
+            path = os.path.abspath(entry or os.curdir)
+            if path in stamps:
+                continue
+            try:
+                stat = os.stat(path)
+            except OSError:
+                continue
+            if os.path.isdir(path):
+                paths.append(path)
+                stamps[path] = stat.st_mtime_ns
+
+        with self._lock:
+            changed = tuple(paths) != self._order
+            for path in paths:
+                known = self._entries.get(path)
+                if known is None or known[0] != stamps[path]:
+                    self._entries[path] = (stamps[path], self._scan(path))
+                    self.scans += 1
+                    changed = True
+            for path in set(self._entries) - set(paths):
+                del self._entries[path]
+                changed = True
+            if changed:
+                self._order = tuple(paths)
+                self._rebuild()
+
+    def _rebuild(self):
+        # type: () -> None
+        by_import = {}  # type: Dict[str, List[str]]
+        by_dist = {}  # type: Dict[str, Dict[str, Any]]
+        for path in self._order:
+            for dist in self._entries[path][1]:
+                key = normalize_name(dist["name"])
+                if key in by_dist:
+                    continue  # shadowed by an earlier sys.path entry
+                by_dist[key] = dist
+                for name in dist["imports"]:
+                    by_import.setdefault(name, []).append(dist["name"])
+        self._by_import = by_import
+        self._by_dist = by_dist
+
+    def invalidate(self):
+        # type: () -> None
+        """Drop everything; the next lookup rescans all of ``sys.path``."""
+        with self._lock:
+            self._entries.clear()
+            self._order = ()
+
+    def distributions(self, import_name):
+        # type: (str) -> List[str]
+        """Installed distributions providing top-level module ``import_name``."""
+        self.refresh()
+        return list(self._by_import.get(import_name.split(".")[0], []))
+
+    def get(self, dist_name):
+        # type: (str) -> Optional[Dict[str, Any]]
+        """Name, version, location and import names of a distribution."""
+        self.refresh()
+        dist = self._by_dist.get(normalize_name(dist_name))
+        return dict(dist) if dist else None
+
+    def import_names(self, dist_name):
+        # type: (str) -> List[str]
+        """Top-level modules of an installed distribution ([] if absent)."""
+        dist = self.get(dist_name)
+        return list(dist["imports"]) if dist else []
+
+    def is_installed(self, import_name):
+        # type: (str) -> bool
+        """Whether some installed distribution provides ``import_name``."""
+        return bool(self.distributions(import_name))
+
+    def stats(self):
+        # type: () -> Dict[str, int]
+        return {
+            "distributions": len(self._by_dist),
+            "import_names": len(self._by_import),
+            "paths": len(self._order),
+            "scans": self.scans,
+        }
+
+
+def is_regular_package(import_name):
+    # type: (str) -> bool
+    """Whether top-level ``import_name`` is a module or package with code of
+    its own, as opposed to a namespace package (``google``, ``azure``)
+    that other distributions add to, or nothing at all."""
+    import importlib.util
+
+    try:
+        spec = importlib.util.find_spec(import_name)
+    except (ImportError, ValueError):
+        return False
+    return spec is not None and spec.origin not in (None, "namespace")
+
+
+def import_name_for(dist_name):
+    # type: (str) -> str
+    """Best guess of the top-level module a distribution provides."""
+    guess = normalize_name(dist_name).replace("-", "_")
+    names = [n for n in get_installed_index().import_names(dist_name)
+             if not n.startswith("_")]
+    if names and guess not in names:
+        return names[0]
+    return guess
+
+
+_index = None  # type: Optional[InstalledIndex]
+_index_lock = threading.Lock()
+
+
+def get_installed_index():
+    # type: () -> InstalledIndex
+    """The process-wide installed-distribution index."""
+    global _index
+    with _index_lock:
+        if _index is None:
+            _index = InstalledIndex()
+    return _index
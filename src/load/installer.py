@@ -0,0 +1,94 @@
+# -*- coding: utf-8 -*-
+"""
+pip invocation shared by every install path of Load
+"""
+
+import importlib
+import os
+import subprocess
+import tempfile
+
+from . import config, telemetry
+from .backends import get_backend
+
+# Type hints for static type checkers (Python 2/3 compatible)
+if False:  # MYPY
+    from typing import Any, Dict, List, Optional  # noqa: F401
+
+_report_supported = None  # type: Optional[bool]
+
+
+def supports_report():
+    # type: () -> bool
+    """Whether the installed pip understands ``--report`` (pip >= 22.2)."""
+    global _report_supported
+    if _report_supported is None:
+        try:
+            from importlib import metadata
+
+            major, minor = metadata.version("pip").split(".")[:2]
+            _report_supported = (int(major), int(minor)) >= (22, 2)
+        except Exception:  # noqa: B902 - no metadata or odd version string
+            _report_supported = False
+    return _report_supported
+
+
+def _is_pip_install(cmd):
+    # type: (List[str]) -> bool
+    return "pip" in cmd and "install" in cmd[cmd.index("pip"):]
+
+
+def run_install(cmd, registry="pypi", env=None, source=None):
+    # type: (List[str], Optional[str], Optional[Dict[str, str]], Optional[str]) -> Any
+    """Run an install command and record what it installed.
+
+    For ``pip install`` commands an installation report is requested and
+    fed to :mod:`load.lockfile`, so a later ``lock()`` can pin the exact
+    artifacts, the active target directory (if any) is applied, and pip's
+    log is parsed into per-phase telemetry.
+    ``source`` replaces the artifact URL of the requested distribution (for
+    wheels built locally from a Git or sdist source).
+
+    Returns the ``subprocess.run`` result.
+    """
+    report_path = log_path = None
+    if _is_pip_install(cmd):
+        fd, log_path = tempfile.mkstemp(prefix="load-pip-", suffix=".log")
+        os.close(fd)
+        extra = ["--log", log_path]
+        if config.TARGET_DIR and "--target" not in cmd:
+            from .target import pip_args as target_pip_args
+
+            extra += target_pip_args()
+        if supports_report():
+            fd, report_path = tempfile.mkstemp(prefix="load-report-", suffix=".json")
+            os.close(fd)
+            extra += ["--report", report_path]
+        position = cmd.index("install", cmd.index("pip")) + 1
+        cmd = list(cmd[:position]) + extra + list(cmd[position:])
+
+    with telemetry.track_install(source or cmd[-1], registry) as record:
+        try:
+            if _is_pip_install(cmd):
+                result = get_backend().run(cmd, env)
+            else:
+                result = subprocess.run(cmd, capture_output=True, text=True, env=env)
+            if log_path:
+                telemetry.record_pip_log(log_path, record)
+            if result.returncode == 0:
+                # New files on sys.path entries must be visible to the next import
+                importlib.invalidate_caches()
+                if report_path:
+                    from .lockfile import record_report
+
+                    for entry in record_report(report_path, registry, source):
+                        record.artifact = entry["url"] or record.artifact
+            record.success = result.returncode == 0
+            return result
+        finally:
+            for path in (report_path, log_path):
+                if path:
+                    try:
+                        os.remove(path)
+                    except OSError:
+                        pass
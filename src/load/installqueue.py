@@ -0,0 +1,303 @@
+# -*- coding: utf-8 -*-
+"""
+Coalesced installs for Load
+
+Missing packages requested close together (``@load_decorator('a', 'b')``,
+``import_aliases(...)``, ``load()`` from several threads) are collected for
+``config.INSTALL_WINDOW`` seconds, or until :func:`flush`, and installed with
+a single pip run. There is no background thread: the first caller to wait
+collects the batch and installs it; the others sleep until their own spec
+is done. If the batch fails, its specs are retried one by one so each
+caller gets its own outcome.
+"""
+
+import collections
+import importlib.util
+import subprocess
+import sys
+import threading
+import time
+
+from . import config, telemetry
+from .output import emit
+
+# Type hints for static type checkers (Python 2/3 compatible)
+if False:  # MYPY
+    from typing import Any, Callable, Dict, List, Optional  # noqa: F401
+
+
+class PendingInstall(object):
+    """A spec waiting in the install queue.
+
+    Attributes:
+        name: What the caller asked for (import or distribution name)
+        spec: Distribution spec that gets installed
+        success: Outcome, None until done
+        record: Telemetry record of the install that handled it
+    """
+
+    def __init__(self, queue, name, spec):
+        # type: (InstallQueue, str, str) -> None
+        self.queue = queue
+        self.name = name
+        self.spec = spec
+        self.success = None  # type: Optional[bool]
+        self.record = None  # type: Optional[telemetry.InstallRecord]
+
+    @property
+    def done(self):
+        # type: () -> bool
+        return self.success is not None
+
+    def wait(self):
+        # type: () -> bool
+        """Block until this spec is installed (or failed); returns success."""
+        return self.queue.wait(self)
+
+    def __repr__(self):
+        return "PendingInstall({0!r}, success={1!r})".format(self.spec, self.success)
+
+
+class InstallQueue(object):
+    """Collects install requests and installs them in batches."""
+
+    def __init__(self, window=None):
+        # type: (Optional[float]) -> None
+        self.window = window
+        self._cond = threading.Condition()
+        self._pending = collections.OrderedDict()  # type: Dict[str, PendingInstall]
+        self._active = {}  # type: Dict[str, PendingInstall]
+        self._leader = None  # type: Optional[threading.Thread]
+        self._flushing = False
+        self.batches = 0
+
+    def submit(self, name):
+        # type: (str) -> PendingInstall
+        """Queue ``name`` for installation; returns its :class:`PendingInstall`.
+
+        Submitting a spec that is already queued or being installed returns
+        the existing request.
+        """
+        from .names import resolve_distribution
+
+        spec = resolve_distribution(name)
+        with self._cond:
+            request = self._pending.get(spec) or self._active.get(spec)
+            if request is None:
+                request = PendingInstall(self, name, spec)
+                self._pending[spec] = request
+            return request
+
+    def _lead(self, wait):
+        # type: (bool) -> None
+        """Collect and install one batch; called with the condition held."""
+        self._leader = threading.current_thread()
+        if wait:
+            window = config.INSTALL_WINDOW if self.window is None else self.window
+            deadline = time.time() + window
+            while not self._flushing and time.time() < deadline:
+                self._cond.wait(deadline - time.time())
+        batch = list(self._pending.values())
+        self._pending.clear()
+        self._flushing = False
+        for request in batch:
+            self._active[request.spec] = request
+        self._cond.release()
+        try:
+            if batch:
+                self.batches += 1
+                install_batch(batch, self._finish)
+        finally:
+            self._cond.acquire()
+            for request in batch:
+                if request.success is None:
+                    request.success = False
+                self._active.pop(request.spec, None)
+            self._leader = None
+            self._cond.notify_all()
+
+    def _finish(self, request, success, record=None):
+        # type: (PendingInstall, bool, Optional[telemetry.InstallRecord]) -> None
+        with self._cond:
+            request.success = bool(success)
+            request.record = record
+            self._active.pop(request.spec, None)
+            self._cond.notify_all()
+
+    def wait(self, request):
+        # type: (PendingInstall) -> bool
+        """Block until ``request`` is done, leading a batch if nobody is."""
+        with self._cond:
+            while not request.done:
+                if self._leader is None:
+                    self._lead(wait=True)
+                else:
+                    self._cond.wait()
+            return bool(request.success)
+
+    def flush(self):
+        # type: () -> None
+        """Install what is queued now instead of waiting for the window.
+
+        Without a batch in progress the install runs in the calling thread;
+        otherwise the running leader is told to stop waiting.
+        """
+        with self._cond:
+            if self._leader is not None:
+                self._flushing = True
+                self._cond.notify_all()
+            elif self._pending:
+                self._lead(wait=False)
+
+    def __len__(self):
+        with self._cond:
+            return len(self._pending)
+
+
+def install_batch(requests, on_done=None):
+    # type: (List[PendingInstall], Optional[Callable[..., None]]) -> None
+    """Install ``requests`` with one pip run, under each distribution's lock.
+
+    ``on_done(request, success, record)`` is called as soon as the outcome
+    of each request is known.
+    """
+    from .locks import LockTimeout, FileLock, distribution_key, is_importable, lock_path
+    from .utils import _install_package
+
+    on_done = on_done or (lambda request, success, record=None: None)
+    specs = [r.spec for r in requests]
+    # One lock per distribution, in a fixed order so batches cannot deadlock
+    locks = [FileLock(lock_path(key), timeout=config.INSTALL_LOCK_TIMEOUT)
+             for key in sorted(set(distribution_key(s) for s in specs))]
+
+    with telemetry.track_install(" ".join(specs), "pypi") as record:
+        held = []  # type: List[FileLock]
+        try:
+            for lock in locks:
+                if not lock.acquire(blocking=False):
+                    emit("install", "⏳ Waiting for another process installing {0}...",
+                         ", ".join(specs))
+                    with telemetry.phase("lock_wait", record):
+                        lock.acquire()
+                held.append(lock)
+
+            todo = []
+            for request in requests:
+                if is_importable(request.spec):
+                    on_done(request, True, record)
+                else:
+                    todo.append(request)
+            if not todo:
+                record.success = True
+                return
+
+            if len(todo) > 1 and not config.OFFLINE:
+                from .installer import run_install
+
+                emit(
+                    "install", "Installing {0} from pypi...",
+                    ", ".join(r.spec for r in todo),
+                )
+                cmd = [sys.executable, "-m", "pip", "install"] + [r.spec for r in todo]
+                try:
+                    installed = run_install(cmd).returncode == 0
+                except (subprocess.SubprocessError, OSError) as e:
+                    emit(
+                        "install", "Error installing {0}: {1}",
+                        " ".join(specs), e, level="error",
+                    )
+                    installed = False
+                if installed:
+                    for request in todo:
+                        on_done(request, True, record)
+                    record.success = True
+                    return
+
+            # One at a time: a single spec, offline mode, or a batch that one
+            # bad spec failed as a whole
+            success = True
+            for request in todo:
+                ok = bool(_install_package(request.spec))
+                on_done(request, ok, record)
+                success = success and ok
+            record.success = success
+        except LockTimeout as e:
+            emit("install", "❌ {0}", e, level="error")
+            for request in requests:
+                if not request.done:
+                    on_done(request, False, record)
+        finally:
+            for lock in held:
+                lock.release()
+
+
+def _missing(name):
+    # type: (str) -> bool
+    """Whether ``name`` is a plain import name that is neither importable
+    nor installed (so installing it could help).
+
+    Submodules of regular packages are left to ``load()``; under a
+    namespace package (``google.cloud.storage``) the distribution for the
+    full name is what counts, not whoever provides ``google``.
+    """
+    if "/" in name or ":" in name or name.endswith(".py"):
+        return False
+    from .installed import get_installed_index, is_regular_package
+    from .names import resolve_distribution
+
+    if is_regular_package(name.split(".")[0]):
+        return False
+    try:
+        if importlib.util.find_spec(name) is not None:
+            return False
+    except ValueError:
+        return False
+    except ImportError:
+        pass  # a parent package is missing
+    index = get_installed_index()
+    if "." not in name:
+        return not index.is_installed(name)
+    return index.get(resolve_distribution(name)) is None
+
+
+_queue = None  # type: Optional[InstallQueue]
+_queue_lock = threading.Lock()
+
+
+def get_install_queue():
+    # type: () -> InstallQueue
+    """The process-wide install queue."""
+    global _queue
+    with _queue_lock:
+        if _queue is None:
+            _queue = InstallQueue()
+    return _queue
+
+
+def flush():
+    # type: () -> None
+    """Install everything queued so far without waiting for the window."""
+    get_install_queue().flush()
+
+
+def prefetch(*names):
+    # type: (*str) -> List[PendingInstall]
+    """Queue the missing ones of ``names`` and install them as one batch.
+
+    Accepts ``alias=module`` entries. Names that are importable, installed
+    or not plain import names are skipped; so is everything when the
+    default registry is not PyPI. Returns the requests, all done.
+    """
+    if config.DEFAULT_REGISTRY not in (None, "pypi"):
+        return []
+    queue = get_install_queue()
+    requests = []
+    for name in names:
+        name = name.split("=", 1)[-1]
+        if _missing(name):
+            requests.append(queue.submit(name))
+    if requests:
+        queue.flush()
+        for request in requests:
+            request.wait()
+    return requests
@@ -0,0 +1,462 @@
+# -*- coding: utf-8 -*-
+"""
+Local file modules for Load
+
+Every ``load('./plugin.py')`` is recorded with the file's mtime, size and
+SHA-256. ``reload='auto'`` re-executes a file only when it changed: a
+``stat`` decides whether anything could have changed, the hash (read only
+then) whether something did, so touching a file without editing it costs
+no re-execution. Modules are re-executed in place, like
+:func:`importlib.reload`, so references held elsewhere see the new code.
+
+Files are identified by their real path: ``./a/x.py``, ``a/../a/x.py`` and
+a symlink to it are one module, executed once. Its ``sys.modules`` name is
+the file stem plus a hash of that path (``x_3f2a...``), so two different
+``utils.py`` files never replace each other, and the name stays the same
+from one run to the next.
+
+Modules fetched from a URL (``load('https://host/tool.py')``) are executed
+in memory the same way, without being copied into site-packages.
+
+All code is compiled through :mod:`load.codecache`, so an unchanged file
+is not compiled again in a later process.
+
+:func:`load_dir` loads a whole directory of plugins: files are read,
+hashed and compiled (through :mod:`load.codecache`) in a thread pool, then
+executed one by one in sorted path order.
+
+For long-running processes, :func:`watch` starts a polling thread that
+does the same check for every recorded file at a fixed interval.
+"""
+
+import collections
+import glob
+import hashlib
+import importlib.util
+import os
+import sys
+import threading
+
+try:
+    from concurrent.futures import ThreadPoolExecutor
+except ImportError:  # Python 2.7 without the futures backport
+    ThreadPoolExecutor = None
+
+from . import codecache, config
+from .output import emit
+
+# Type hints for static type checkers (Python 2/3 compatible)
+if False:  # MYPY
+    from types import ModuleType  # noqa: F401
+    from typing import Any, Dict, List, Optional, Tuple  # noqa: F401
+
+
+def file_state(path):
+    # type: (str) -> Tuple[int, int]
+    """``(mtime_ns, size)`` of ``path``."""
+    st = os.stat(path)
+    return getattr(st, "st_mtime_ns", int(st.st_mtime * 1e9)), st.st_size
+
+
+def source_hash(source):
+    # type: (bytes) -> str
+    return hashlib.sha256(source).hexdigest()
+
+
+class LocalModule(object):
+    """A module executed from a local file.
+
+    Attributes:
+        path: Real path of the file
+        module: The module object (kept across reloads)
+        mtime_ns, size: File state when it was last checked
+        digest: SHA-256 of the source last executed
+        executions: How many times the file has been executed
+    """
+
+    def __init__(self, path, module):
+        # type: (str, Any) -> None
+        self.path = path
+        self.module = module
+        self.mtime_ns = None  # type: Optional[int]
+        self.size = None  # type: Optional[int]
+        self.digest = None  # type: Optional[str]
+        self.executions = 0
+
+    def read(self):
+        # type: () -> Tuple[bytes, Tuple[int, int]]
+        """The source and the file state it was read at."""
+        state = file_state(self.path)
+        with open(self.path, "rb") as f:
+            return f.read(), state
+
+    def execute(self, source=None, state=None, code=None):
+        # type: (Optional[bytes], Optional[Tuple[int, int]], Any) -> None
+        """Run the file's code in the module's namespace.
+
+        ``code`` is the already compiled ``source``, if available.
+        """
+        if source is None:
+            source, state = self.read()
+        digest = source_hash(source)
+        if code is None:
+            code = codecache.get_code(source, self.path, digest)
+        self.mtime_ns, self.size = state
+        self.digest = digest
+        self.executions += 1
+        exec(code, self.module.__dict__)
+
+    def changed(self):
+        # type: () -> Optional[Tuple[bytes, Tuple[int, int]]]
+        """``(source, state)`` if the file's content changed, else None.
+
+        Only a changed mtime or size makes the file worth reading; an
+        unchanged hash then just refreshes the recorded state. The state is
+        the one taken before the read, so a write racing with it is seen by
+        the next check.
+        """
+        state = file_state(self.path)
+        if state == (self.mtime_ns, self.size):
+            return None
+        source, state = self.read()
+        if source_hash(source) == self.digest:
+            self.mtime_ns, self.size = state
+            return None
+        return source, state
+
+    def refresh(self):
+        # type: () -> bool
+        """Re-execute the file if it changed; returns whether it did."""
+        changed = self.changed()
+        if changed is None:
+            return False
+        self.execute(*changed)
+        return True
+
+    def __repr__(self):
+        return "LocalModule({0!r}, executions={1})".format(self.path, self.executions)
+
+
+_records = {}  # type: Dict[str, LocalModule]
+_lock = threading.RLock()
+
+
+def canonical_path(path):
+    # type: (str) -> str
+    """The key a local file is known by: its absolute, symlink-free path."""
+    return os.path.normcase(os.path.realpath(path))
+
+
+def module_name(path):
+    # type: (str) -> str
+    """Stable, collision-free ``sys.modules`` name for a canonical path."""
+    stem = os.path.splitext(os.path.basename(path))[0]
+    digest = hashlib.sha256(path.encode("utf-8", "surrogateescape")).hexdigest()
+    return "{0}_{1}".format(stem, digest[:12])
+
+
+def _new_module(path):
+    # type: (str) -> Any
+    spec = importlib.util.spec_from_file_location(module_name(path), path)
+    if spec is None:
+        raise ImportError("Could not load spec for {0}".format(path))
+    return importlib.util.module_from_spec(spec)
+
+
+def load_file(path, reload=False):
+    # type: (str, Any) -> Any
+    """The module for the local file ``path``, executing it if needed.
+
+    ``reload``: False runs the file only the first time, True runs it
+    again every time, ``'auto'`` runs it again when its content changed.
+    Repeated runs reuse the module object. Every spelling of the same
+    file gets the same module.
+    """
+    if reload not in (False, True, "auto"):
+        raise ValueError(
+            "reload must be False, True or 'auto', not {0!r}".format(reload)
+        )
+    return _load(canonical_path(path), reload)
+
+
+def _load(path, reload, compiled=None):
+    # type: (str, Any, Optional[Tuple[bytes, Tuple[int, int], Any]]) -> Any
+    """:func:`load_file` for a canonical ``path``; ``compiled`` is the
+    ``(source, state, code)`` of it read earlier."""
+    prepared = compiled or (None, None, None)
+    with _lock:
+        record = _records.get(path)
+        if record is None:
+            module = _new_module(path)
+            record = LocalModule(path, module)
+            sys.modules[module.__name__] = module
+            try:
+                record.execute(*prepared)
+            except BaseException:
+                sys.modules.pop(module.__name__, None)
+                raise
+            _records[path] = record
+        elif reload is True:
+            record.execute(*prepared)
+        elif reload == "auto":
+            record.refresh()
+        return record.module
+
+
+def _compile_file(path):
+    # type: (str) -> Tuple[bytes, Tuple[int, int], Any]
+    """``(source, state, code)`` of a file, the code from the code cache."""
+    state = file_state(path)
+    with open(path, "rb") as f:
+        source = f.read()
+    return source, state, codecache.get_code(source, path, source_hash(source))
+
+
+class UrlModule(object):
+    """A module executed from source fetched over HTTP(S) or ``file:``.
+
+    Attributes:
+        url: Where the source came from
+        module: The module object (kept across reloads)
+        digest: SHA-256 of the source last executed
+        executions: How many times the source has been executed
+    """
+
+    def __init__(self, url):
+        # type: (str) -> None
+        self.url = url
+        name = module_name(url.split("?")[0])
+        spec = importlib.util.spec_from_loader(name, None, origin=url)
+        self.module = importlib.util.module_from_spec(spec)
+        self.module.__file__ = url
+        self.digest = None  # type: Optional[str]
+        self.executions = 0
+
+    def execute(self, source):
+        # type: (bytes) -> None
+        digest = source_hash(source)
+        code = codecache.get_code(source, self.url, digest)
+        self.digest = digest
+        self.executions += 1
+        exec(code, self.module.__dict__)
+
+    def __repr__(self):
+        return "UrlModule({0!r}, executions={1})".format(self.url, self.executions)
+
+
+_urls = {}  # type: Dict[str, UrlModule]
+
+
+def _fetch(url):
+    # type: (str) -> bytes
+    from .httpclient import HTTPError, get_http_pool
+
+    if config.OFFLINE and not url.startswith("file:"):
+        raise ImportError("Offline mode: cannot download {0}".format(url))
+    emit("install", "📦 Downloading from URL: {0}", url)
+    response = get_http_pool().get(url)
+    if response.status >= 400:
+        raise HTTPError(url, response.status)
+    return response.data
+
+
+def load_url(url, reload=False):
+    # type: (str, Any) -> ModuleType
+    """The module for the ``.py`` source at ``url``, fetching it if needed.
+
+    ``reload`` as for :func:`load_file`; with ``'auto'`` the source is
+    fetched again but only executed if its hash changed. The download
+    happens outside the module lock, so a slow server does not hold up
+    other loads. Only ``https://`` and ``file:`` URLs are accepted: source
+    fetched over plain HTTP could have been altered on the way.
+    """
+    if reload not in (False, True, "auto"):
+        raise ValueError(
+            "reload must be False, True or 'auto', not {0!r}".format(reload)
+        )
+    if not url.startswith(("https://", "file:")):
+        raise ImportError(
+            "Refusing to run code from {0}: use https:// or file:".format(url)
+        )
+    with _lock:
+        record = _urls.get(url)
+        if record is not None and reload is False:
+            return record.module
+    source = _fetch(url)
+    with _lock:
+        record = _urls.get(url)  # may have been loaded meanwhile
+        if record is None:
+            record = UrlModule(url)
+            sys.modules[record.module.__name__] = record.module
+            try:
+                record.execute(source)
+            except BaseException:
+                sys.modules.pop(record.module.__name__, None)
+                raise
+            _urls[url] = record
+        elif reload is True or (
+            reload == "auto" and source_hash(source) != record.digest
+        ):
+            record.execute(source)
+        return record.module
+
+
+def find_files(directory, pattern="*.py"):
+    # type: (str, str) -> List[str]
+    """Files in ``directory`` matching ``pattern`` (``**`` recurses),
+    sorted by their path relative to it. Hidden files and names starting
+    with ``_`` (``__init__.py``) are skipped unless the pattern starts so."""
+    hidden = os.path.basename(pattern)[:1] in ("_", ".")
+    found = []
+    for path in glob.glob(os.path.join(directory, pattern), recursive=True):
+        if os.path.basename(path)[:1] == "_" and not hidden:
+            continue
+        if os.path.isfile(path):
+            found.append(path)
+    return sorted(found, key=lambda p: _relative_name(p, directory))
+
+
+def _relative_name(path, directory):
+    # type: (str, str) -> str
+    return os.path.relpath(path, directory).replace(os.sep, "/")
+
+
+def load_dir(directory, pattern="*.py", reload=False, workers=None):
+    # type: (str, str, Any, Optional[int]) -> Dict[str, Any]
+    """Load every file in ``directory`` matching ``pattern``.
+
+    Files not loaded yet (all of them with ``reload=True``) are read and
+    compiled in up to ``workers`` threads (``config.LOCAL_DIR_WORKERS``)
+    while they are executed one at a time in sorted order, so plugins run
+    in the same order on every start. Returns ``{name: module}`` in that
+    order; names are relative paths without ``.py``, ``/``-separated.
+    """
+    if reload not in (False, True, "auto"):
+        raise ValueError(
+            "reload must be False, True or 'auto', not {0!r}".format(reload)
+        )
+    if not os.path.isdir(directory):
+        raise ImportError("Directory {0} does not exist".format(directory))
+    files = find_files(directory, pattern)
+    paths = [canonical_path(p) for p in files]
+    todo = [p for p in collections.OrderedDict.fromkeys(paths)
+            if reload is True or p not in _records]
+    planned = set(todo)
+
+    workers = min(workers or config.LOCAL_DIR_WORKERS, len(todo))
+    pool = None
+    if ThreadPoolExecutor is not None and workers > 1:
+        pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="load-local")
+    try:
+        if pool is not None:
+            pending = dict((p, pool.submit(_compile_file, p)) for p in todo)
+        else:
+            pending = dict((p, None) for p in todo)
+        modules = collections.OrderedDict()  # type: Dict[str, Any]
+        for shown, path in zip(files, paths):
+            name = os.path.splitext(_relative_name(shown, directory))[0]
+            try:
+                if path in pending:
+                    future = pending.pop(path)  # a second spelling is not re-run
+                    if future is not None:
+                        compiled = future.result()
+                    else:
+                        compiled = _compile_file(path)
+                    modules[name] = _load(path, reload, compiled)
+                else:
+                    modules[name] = _load(path, False if path in planned else reload)
+            except Exception as e:  # noqa: B902
+                raise ImportError("Cannot load {0}: {1}".format(shown, e))
+        return modules
+    finally:
+        if pool is not None:
+            pool.shutdown()
+
+
+def get_record(path):
+    # type: (str) -> Optional[LocalModule]
+    return _records.get(canonical_path(path))
+
+
+def records():
+    # type: () -> List[LocalModule]
+    with _lock:
+        return list(_records.values())
+
+
+def check():
+    # type: () -> List[Any]
+    """Re-execute every recorded file that changed; returns their modules.
+
+    A file that fails to run again is reported and skipped until it
+    changes once more; deleted files are skipped.
+    """
+    reloaded = []
+    for record in records():
+        with _lock:
+            try:
+                if record.refresh():
+                    reloaded.append(record.module)
+                    emit("reload", "🔄 Reloaded {0}", record.path, path=record.path)
+            except OSError:
+                continue
+            except Exception as e:  # noqa: B902
+                emit("reload", "❌ Reload of {0} failed: {1}", record.path, e,
+                     level="error", path=record.path)
+    return reloaded
+
+
+class Watcher(object):
+    """Polling thread that calls :func:`check` every ``interval`` seconds."""
+
+    def __init__(self, interval=1.0):
+        # type: (float) -> None
+        self.interval = interval
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="load-watch")
+        self._thread.daemon = True
+
+    def start(self):
+        # type: () -> Watcher
+        self._thread.start()
+        return self
+
+    def _run(self):
+        # type: () -> None
+        while not self._stop.wait(self.interval):
+            check()
+
+    def stop(self):
+        # type: () -> None
+        self._stop.set()
+        if self._thread.is_alive() and self._thread is not threading.current_thread():
+            self._thread.join()
+
+    @property
+    def running(self):
+        # type: () -> bool
+        return self._thread.is_alive()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.stop()
+
+
+_watcher = None  # type: Optional[Watcher]
+
+
+def watch(interval=1.0):
+    # type: (float) -> Watcher
+    """Refresh changed local modules every ``interval`` seconds.
+
+    Only one watcher runs: calling again replaces the previous one.
+    Returns it; ``stop()`` ends the polling.
+    """
+    global _watcher
+    with _lock:
+        if _watcher is not None:
+            _watcher.stop()
+        _watcher = Watcher(interval).start()
+        return _watcher
@@ -0,0 +1,258 @@
+# -*- coding: utf-8 -*-
+"""
+Lockfile capture and replay for Load
+
+Every distribution resolved during a run (installed by Load, or already
+present when ``load()`` imported it) is remembered with its exact version,
+registry, artifact URL and hash. ``lock(path)`` writes them out;
+``from_lock(path)`` reinstalls exactly that set in a single ``--no-deps``
+pip run, without going through pip's resolver.
+"""
+
+import importlib
+import json
+import os
+import sys
+import tempfile
+import threading
+
+from . import config
+from .index import _packaging, normalize_name
+from .installed import get_installed_index
+from .output import emit
+
+# Type hints for static type checkers (Python 2/3 compatible)
+if False:  # MYPY
+    from typing import Any, Dict, List, Optional  # noqa: F401
+
+LOCK_VERSION = 1
+
+_resolved = {}  # type: Dict[str, Dict[str, Any]]
+_pending_modules = []  # type: List[tuple]
+_lock = threading.Lock()
+
+
+def _metadata():
+    try:
+        from importlib import metadata
+
+        return metadata
+    except ImportError:
+        return None
+
+
+def record_report(report_path, registry="pypi", source=None):
+    # type: (str, Optional[str], Optional[str]) -> List[Dict[str, Any]]
+    """Record the distributions of a ``pip install --report`` file.
+
+    Returns the entries of the explicitly requested distributions.
+    """
+    requested = []  # type: List[Dict[str, Any]]
+    try:
+        with open(report_path) as f:
+            report = json.load(f)
+    except (IOError, OSError, ValueError):
+        return requested
+
+    for item in report.get("install", []):
+        meta = item.get("metadata", {})
+        name = meta.get("name")
+        if not name:
+            continue
+        info = item.get("download_info", {})
+        url = info.get("url")
+        vcs = info.get("vcs_info")
+        if vcs:
+            url = "{0}+{1}@{2}".format(vcs.get("vcs", "git"), url, vcs.get("commit_id"))
+
+        archive = info.get("archive_info", {})
+        hashes = dict(archive.get("hashes") or {})
+        if not hashes and "=" in archive.get("hash", ""):
+            algo, _, digest = archive["hash"].partition("=")
+            hashes[algo] = digest
+
+        entry_registry = registry or "pypi"
+        if item.get("requested") and source and (url or "").startswith("file:"):
+            url, hashes = source, {}
+        elif not item.get("requested") and entry_registry in (
+            "github", "gitlab", "url"
+        ):
+            entry_registry = "pypi"  # dependencies come from the index
+
+        entry = {
+            "name": name,
+            "version": meta.get("version"),
+            "registry": entry_registry,
+            "url": url,
+            "hashes": hashes,
+        }
+        with _lock:
+            _resolved[normalize_name(name)] = entry
+        if item.get("requested"):
+            requested.append(entry)
+    return requested
+
+
+def record_module(module_name, registry=None):
+    # type: (str, Optional[str]) -> None
+    """Remember that ``load()`` resolved ``module_name``.
+
+    Cheap on purpose: the distribution behind the module is looked up only
+    when a lockfile is written.
+    """
+    with _lock:
+        _pending_modules.append((module_name.split(".")[0], registry))
+
+
+def _record_installed(dist_name, registry, seen):
+    # type: (str, Optional[str], set) -> None
+    """Record an installed distribution and its installed requirements."""
+    key = normalize_name(dist_name)
+    if key in seen:
+        return
+    seen.add(key)
+    metadata = _metadata()
+    try:
+        dist = metadata.distribution(dist_name)
+    except Exception:  # noqa: B902 - not installed
+        return
+
+    if key not in _resolved:
+        url = None
+        direct = dist.read_text("direct_url.json")
+        if direct:
+            try:
+                data = json.loads(direct)
+            except ValueError:
+                data = {}
+            url = data.get("url")
+            vcs = data.get("vcs_info")
+            if vcs and url:
+                url = "{0}+{1}@{2}".format(
+                    vcs.get("vcs", "git"), url, vcs.get("commit_id")
+                )
+            if url and url.startswith("file:"):
+                url = None  # local builds cannot be replayed from a URL
+        _resolved[key] = {
+            "name": dist.metadata["Name"],
+            "version": dist.version,
+            "registry": registry or "pypi",
+            "url": url,
+            "hashes": {},
+        }
+
+    packaging = _packaging()
+    if packaging is None:
+        return
+    for line in dist.requires or []:
+        try:
+            req = packaging.requirements.Requirement(line)
+        except Exception:  # noqa: B902 - malformed metadata
+            continue
+        if req.marker is not None and not req.marker.evaluate({"extra": ""}):
+            continue
+        _record_installed(req.name, "pypi", seen)
+
+
+def resolved():
+    # type: () -> List[Dict[str, Any]]
+    """Every distribution resolved so far, sorted by name."""
+    with _lock:
+        pending, _pending_modules[:] = list(_pending_modules), []
+        if _metadata() is not None:
+            index = get_installed_index()
+            seen = set()  # type: set
+            for module_name, registry in pending:
+                for dist_name in index.distributions(module_name):
+                    _record_installed(dist_name, registry, seen)
+        return [dict(_resolved[key]) for key in sorted(_resolved)]
+
+
+def lock(path):
+    # type: (str) -> List[Dict[str, Any]]
+    """Write every spec resolved during this run to the lockfile ``path``.
+
+    Returns the recorded entries.
+    """
+    packages = resolved()
+    data = {
+        "version": LOCK_VERSION,
+        "python": "{0}.{1}".format(*sys.version_info[:2]),
+        "packages": packages,
+    }
+    tmp = "{0}.{1}.tmp".format(path, os.getpid())
+    with open(tmp, "w") as f:
+        json.dump(data, f, indent=2, sort_keys=True)
+        f.write("\n")
+    os.replace(tmp, path)
+    return packages
+
+
+def _installed_version(name):
+    # type: (str) -> Optional[str]
+    metadata = _metadata()
+    try:
+        return metadata.version(name) if metadata else None
+    except Exception:  # noqa: B902 - PackageNotFoundError
+        return None
+
+
+def from_lock(path, wheel_store=None):
+    # type: (str, Optional[str]) -> bool
+    """Install exactly the distributions pinned in the lockfile ``path``.
+
+    Distributions already installed at the pinned version are skipped; the
+    rest go through one ``pip install --no-deps`` run, by artifact URL when
+    known and with ``--hash`` pins when every entry has one. With
+    ``wheel_store`` (or in offline mode) the files come only from that
+    local directory.
+
+    Returns True when everything pinned is installed afterwards.
+    """
+    from .installer import run_install
+    from .offline import pip_args as offline_pip_args
+    from .registry import PRIVATE_REGISTRIES
+
+    with open(path) as f:
+        packages = json.load(f).get("packages", [])
+
+    pending = [p for p in packages if _installed_version(p["name"]) != p["version"]]
+    if not pending:
+        return True
+
+    local = wheel_store is not None or config.OFFLINE
+    use_hashes = not local and all(p.get("hashes", {}).get("sha256") for p in pending)
+    lines = []
+    for package in pending:
+        url = package.get("url")
+        if url and not local and not url.startswith("file:"):
+            line = "{0} @ {1}".format(package["name"], url)
+        else:
+            line = "{0}=={1}".format(package["name"], package["version"])
+        if use_hashes:
+            line += " --hash=sha256:{0}".format(package["hashes"]["sha256"])
+        lines.append(line)
+
+    if wheel_store is not None:
+        args = ["--no-index", "--find-links", wheel_store]
+    elif config.OFFLINE:
+        args = offline_pip_args()
+    else:
+        args = []
+        for registry in sorted(set(p.get("registry") for p in pending)):
+            index_url = PRIVATE_REGISTRIES.get(registry, {}).get("index_url")
+            if index_url:
+                args += ["--extra-index-url", index_url]
+
+    fd, requirements = tempfile.mkstemp(prefix="load-lock-", suffix=".txt")
+    with os.fdopen(fd, "w") as f:
+        f.write("\n".join(lines) + "\n")
+    try:
+        emit("install", "📦 Installing {0} locked package(s)...", len(pending))
+        cmd = [sys.executable, "-m", "pip", "install", "--no-deps"] + args
+        result = run_install(cmd + ["-r", requirements])
+    finally:
+        os.remove(requirements)
+
+    importlib.invalidate_caches()
+    return result.returncode == 0
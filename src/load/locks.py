@@ -0,0 +1,241 @@
+# -*- coding: utf-8 -*-
+"""
+Cross-process install coordination for Load
+
+When many processes start at once (e.g. gunicorn workers that all call
+``load('x')`` on boot), only one of them may run pip for a distribution.
+Installs take an exclusive file lock per distribution under
+``CACHE_DIR/locks``; the processes that had to wait re-check whether the
+package became importable meanwhile and skip their own pip run.
+"""
+
+import errno
+import hashlib
+import importlib
+import importlib.util
+import os
+import re
+import sys
+import time
+
+from . import config, telemetry
+from .index import normalize_name
+from .output import emit
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None  # type: ignore
+
+try:
+    import msvcrt
+except ImportError:  # POSIX
+    msvcrt = None  # type: ignore
+
+# Type hints for static type checkers (Python 2/3 compatible)
+if False:  # MYPY
+    from typing import Any, Optional  # noqa: F401
+
+# Sources naming a specific artifact: installed even if the name is importable
+_DIRECT_SOURCES = ("url", "github", "gitlab")
+
+_NAME = re.compile(r"^\s*([A-Za-z0-9][A-Za-z0-9._-]*)")
+
+
+class LockTimeout(OSError):
+    """Another process held the install lock for too long."""
+
+
+class FileLock(object):
+    """Exclusive inter-process lock on a file (``flock`` / ``msvcrt``).
+
+    Usable as a context manager. The lock file itself is left in place:
+    deleting it while another process waits on it would break exclusion.
+    """
+
+    def __init__(self, path, timeout=None, poll=0.1):
+        # type: (str, Optional[float], float) -> None
+        self.path = path
+        self.timeout = timeout
+        self.poll = poll
+        self._fd = None  # type: Optional[int]
+
+    def _try_lock(self, fd):
+        # type: (int) -> bool
+        try:
+            if fcntl is not None:
+                fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            elif msvcrt is not None:
+                msvcrt.locking(fd, msvcrt.LK_NBLCK, 1)
+            return True
+        except (IOError, OSError) as e:
+            if e.errno in (errno.EACCES, errno.EAGAIN, errno.EDEADLK):
+                return False
+            raise
+
+    def acquire(self, blocking=True):
+        # type: (bool) -> bool
+        """Take the lock.
+
+        Blocks until it is held (raising :class:`LockTimeout` after
+        ``timeout`` seconds); with ``blocking=False`` returns False at once
+        if another process holds it.
+        """
+        directory = os.path.dirname(self.path)
+        if directory and not os.path.isdir(directory):
+            try:
+                os.makedirs(directory)
+            except OSError:
+                if not os.path.isdir(directory):
+                    raise
+        fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o644)
+        deadline = None if self.timeout is None else time.time() + self.timeout
+        try:
+            while not self._try_lock(fd):
+                if not blocking:
+                    os.close(fd)
+                    return False
+                if deadline is not None and time.time() >= deadline:
+                    raise LockTimeout(
+                        "Timed out waiting for lock {0}".format(self.path)
+                    )
+                time.sleep(self.poll)
+        except BaseException:
+            os.close(fd)
+            raise
+        self._fd = fd
+        return True
+
+    def release(self):
+        # type: () -> None
+        """Release the lock (no-op if not held)."""
+        fd, self._fd = self._fd, None
+        if fd is None:
+            return
+        try:
+            if fcntl is not None:
+                fcntl.flock(fd, fcntl.LOCK_UN)
+            elif msvcrt is not None:
+                os.lseek(fd, 0, os.SEEK_SET)
+                msvcrt.locking(fd, msvcrt.LK_UNLCK, 1)
+        finally:
+            os.close(fd)
+
+    @property
+    def locked(self):
+        # type: () -> bool
+        return self._fd is not None
+
+    def __enter__(self):
+        self.acquire()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.release()
+
+
+def distribution_key(spec):
+    # type: (str) -> str
+    """Lock key of an install spec: the normalized distribution/repo name.
+
+    ``requests>=2``, ``company/requests`` and
+    ``https://github.com/psf/requests.git`` all map to ``requests``.
+    """
+    last = spec.split("#")[0].rstrip("/").rsplit("/", 1)[-1]
+    last = re.sub(r"\.git$", "", last.split("@")[0])
+    if last.endswith((".whl", ".tar.gz", ".tar.bz2", ".zip")):
+        last = last.split("-")[0]  # project-version... archive names
+    elif last.endswith(".py"):
+        last = last[:-3]
+    match = _NAME.match(last)
+    return normalize_name(match.group(1) if match else last) or "_"
+
+
+def lock_path(spec):
+    # type: (str) -> str
+    """Lock file for ``spec``; scoped per interpreter and install location."""
+    scope = "{0}|{1}".format(sys.prefix, config.TARGET_DIR or "")
+    digest = hashlib.sha256(scope.encode("utf-8")).hexdigest()[:12]
+    return os.path.join(
+        config.CACHE_DIR, "locks", digest, distribution_key(spec) + ".lock"
+    )
+
+
+def install_lock(spec, timeout=None):
+    # type: (str, Optional[float]) -> FileLock
+    """The (not yet acquired) inter-process lock guarding installs of ``spec``."""
+    if timeout is None:
+        timeout = config.INSTALL_LOCK_TIMEOUT
+    return FileLock(lock_path(spec), timeout=timeout)
+
+
+def is_importable(spec):
+    # type: (str) -> bool
+    """Whether the package behind ``spec`` is importable and satisfies it.
+
+    Specs with a version specifier (``pkg>=2``) are only satisfied when
+    the installed distribution matches.
+    """
+    importlib.invalidate_caches()
+    name = distribution_key(spec)
+    if not re.search(r"[<>=!~]", spec):
+        from .installed import get_installed_index
+
+        module = name.replace("-", "_").replace(".", "_")
+        try:
+            if importlib.util.find_spec(module) is not None:
+                return True
+        except (ImportError, ValueError):
+            pass
+        return get_installed_index().get(name) is not None
+
+    from .index import _packaging
+
+    packaging = _packaging()
+    if packaging is None:
+        return False
+    try:
+        from importlib import metadata
+
+        req = packaging.requirements.Requirement(spec.split("/")[-1])
+        version = metadata.version(req.name)
+    except Exception:  # noqa: B902 - unparsable spec or not installed
+        return False
+    return req.specifier.contains(version, prereleases=True)
+
+
+def serialized_install(spec, install, *args, **kwargs):
+    # type: (str, Any, *Any, **Any) -> bool
+    """Run ``install(*args, **kwargs)`` under the install lock of ``spec``.
+
+    If another process holds the lock, wait for it, then check
+    importability again: when that process already installed the package,
+    the install is skipped and True is returned. An uncontended lock, and
+    URL or Git sources (a fork, a newer commit), always run ``install``.
+    """
+    from .registry import LoadRegistry
+
+    with telemetry.track_install(spec) as record:
+        with telemetry.phase("classify", record):
+            source = LoadRegistry.parse_source(spec)[0]
+            record.registry = record.registry or source
+
+        lock = install_lock(spec)
+        waited = False
+        if not lock.acquire(blocking=False):
+            waited = True
+            emit("install", "⏳ Waiting for another process installing {0}...", spec)
+            try:
+                with telemetry.phase("lock_wait", record):
+                    lock.acquire()
+            except LockTimeout as e:
+                emit("install", "❌ {0}", e, level="error")
+                return False
+        try:
+            if waited and source not in _DIRECT_SOURCES and is_importable(spec):
+                record.success = True
+                return True
+            record.success = bool(install(*args, **kwargs))
+            return record.success
+        finally:
+            lock.release()
@@ -15,11 +15,9 @@ class LoadModule:
             "pd": "pandas",
             "plt": "matplotlib.pyplot",
             "tf": "tensorflow",
-            "torch": "torch",
-            "cv2": "opencv-python",
-            "PIL": "pillow",
-            "sklearn": "scikit-learn",
         }
+        # Import names like cv2 or sklearn need no alias: load() maps them
+        # to their distribution (see load.names)
 
         # Check if it's an alias
         if name in aliases:
@@ -0,0 +1,139 @@
+# -*- coding: utf-8 -*-
+"""
+Import name -> distribution resolution for Load
+
+``load('cv2')`` has to install ``opencv-python``, ``load('yaml')`` has to
+install ``PyYAML``. Load ships a sorted table (``data/import_names.tsv``)
+of import names that differ from their distribution name; names that match
+need no entry. The table is memory-mapped on first use and searched with a
+binary search, so nothing is parsed up front. User overrides
+(:func:`register_distribution`) take precedence.
+"""
+
+import mmap
+import os
+import re
+import threading
+
+from . import config
+
+# Type hints for static type checkers (Python 2/3 compatible)
+if False:  # MYPY
+    from typing import Dict, Optional  # noqa: F401
+
+DATA_FILE = os.path.join(os.path.dirname(__file__), "data", "import_names.tsv")
+
+_IMPORT_NAME = re.compile(r"^[A-Za-z_][A-Za-z0-9_]*(\.[A-Za-z_][A-Za-z0-9_]*)*$")
+
+
+class SortedTable(object):
+    """Read-only ``key<TAB>value`` lines sorted by key, searched in place.
+
+    The file is memory-mapped lazily; each lookup is a binary search over
+    byte offsets, so only the pages it touches are read.
+    """
+
+    def __init__(self, path):
+        # type: (str) -> None
+        self.path = path
+        self._map = None  # type: Optional[mmap.mmap]
+        self._lock = threading.Lock()
+
+    def _open(self):
+        # type: () -> Optional[mmap.mmap]
+        if self._map is None:
+            with self._lock:
+                if self._map is None:
+                    try:
+                        with open(self.path, "rb") as f:
+                            self._map = mmap.mmap(
+                                f.fileno(), 0, access=mmap.ACCESS_READ
+                            )
+                    except (IOError, OSError, ValueError):  # missing or empty
+                        return None
+        return self._map
+
+    @staticmethod
+    def _line_at(data, pos):
+        # type: (mmap.mmap, int) -> tuple
+        """(start, end) of the first line starting at or after ``pos``."""
+        if pos > 0:
+            pos = data.find(b"\n", pos - 1) + 1
+            if pos == 0:
+                return len(data), len(data)
+        end = data.find(b"\n", pos)
+        return pos, len(data) if end == -1 else end
+
+    def get(self, key):
+        # type: (str) -> Optional[str]
+        data = self._open()
+        if data is None:
+            return None
+        needle = key.encode("utf-8")
+        lo, hi = 0, len(data)
+        while lo < hi:
+            mid = (lo + hi) // 2
+            start, end = self._line_at(data, mid)
+            if start >= hi:
+                hi = mid
+                continue
+            found, _, value = data[start:end].partition(b"\t")
+            if found == needle:
+                return value.decode("utf-8").strip()
+            if found < needle:
+                lo = end + 1
+            else:
+                hi = mid
+        return None
+
+    def __len__(self):
+        data = self._open()
+        return data[:].count(b"\n") if data is not None else 0
+
+
+_table = SortedTable(DATA_FILE)
+
+
+def register_distribution(import_name, distribution):
+    # type: (str, Optional[str]) -> None
+    """Install ``distribution`` whenever ``import_name`` is missing.
+
+    ``register_distribution("cv2", "opencv-python-headless")`` overrides
+    the bundled table; ``None`` removes an override.
+    """
+    if distribution is None:
+        config.DISTRIBUTION_OVERRIDES.pop(import_name, None)
+    else:
+        config.DISTRIBUTION_OVERRIDES[import_name] = distribution
+
+
+def lookup(import_name):
+    # type: (str) -> Optional[str]
+    """Distribution known to provide ``import_name``, or None.
+
+    Dotted names are tried from the most specific prefix down, so
+    ``google.cloud.storage.blob`` finds ``google-cloud-storage``.
+    """
+    parts = import_name.split(".")
+    overrides = config.DISTRIBUTION_OVERRIDES
+    for size in range(len(parts), 0, -1):
+        key = ".".join(parts[:size])
+        if key in overrides:
+            return overrides[key]
+        found = _table.get(key)
+        if found:
+            return found
+    return None
+
+
+def resolve_distribution(name):
+    # type: (str) -> str
+    """What to install for ``name``.
+
+    Import names become their distribution (``cv2`` -> ``opencv-python``,
+    ``matplotlib.pyplot`` -> ``matplotlib``); anything else
+    (``requests>=2``, ``company/pkg``, URLs) is returned unchanged.
+    """
+    if not _IMPORT_NAME.match(name):
+        return name
+    return lookup(name) or name.split(".")[0]
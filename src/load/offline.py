@@ -0,0 +1,133 @@
+# -*- coding: utf-8 -*-
+"""
+Offline mode for Load
+
+With offline mode on, installs are resolved only from a local directory (or
+``file://`` URL) of wheels and sdists, either flat or laid out as a PEP 503
+tree. Every network path is skipped, so a missing package fails at once
+instead of waiting for pip's network timeouts.
+
+Enable it with ``LOAD_OFFLINE=1`` (plus ``LOAD_OFFLINE_INDEX=/path/to/wheels``)
+or :func:`set_offline`.
+"""
+
+import os
+import sys
+
+try:
+    from urllib.parse import urlsplit
+    from urllib.request import url2pathname
+except ImportError:  # Python 2.7
+    from urlparse import urlsplit  # type: ignore
+    from urllib import url2pathname  # type: ignore
+
+from . import config
+from .index import normalize_name, select_file, split_spec
+from .output import emit
+
+# Type hints for static type checkers (Python 2/3 compatible)
+if False:  # MYPY
+    from typing import Any, Dict, List, Optional  # noqa: F401
+
+_ARCHIVE_SUFFIXES = (".whl", ".tar.gz", ".tar.bz2", ".zip")
+
+
+def set_offline(enabled=True, index=None):
+    # type: (bool, Optional[str]) -> None
+    """Turn offline mode on or off.
+
+    Args:
+        enabled: Whether network installs are forbidden
+        index: Local directory or ``file://`` URL holding the wheels
+    """
+    config.OFFLINE = enabled
+    if index is not None:
+        config.OFFLINE_INDEX = index
+
+
+def is_offline():
+    # type: () -> bool
+    """Whether offline mode is active."""
+    return config.OFFLINE
+
+
+def index_dir():
+    # type: () -> Optional[str]
+    """Local directory of the offline index, or None if not configured."""
+    index = config.OFFLINE_INDEX
+    if not index:
+        return None
+    if index.startswith("file:"):
+        return url2pathname(urlsplit(index).path)
+    return os.path.abspath(os.path.expanduser(index))
+
+
+def _entries(directory):
+    # type: (str) -> List[Dict[str, Any]]
+    try:
+        names = os.listdir(directory)
+    except OSError:
+        return []
+    return [
+        {"filename": name, "url": os.path.join(directory, name), "hashes": {}}
+        for name in names
+        if name.endswith(_ARCHIVE_SUFFIXES)
+    ]
+
+
+def find_local(spec):
+    # type: (str) -> Optional[str]
+    """Path of the best local file for ``spec``, or None if there is none.
+
+    Looks in the flat index directory and in its PEP 503 project
+    subdirectory (``<index>/<normalized-name>/``).
+    """
+    directory = index_dir()
+    if directory is None:
+        return None
+    project = split_spec(spec)[0]
+    files = _entries(directory) + _entries(
+        os.path.join(directory, normalize_name(project))
+    )
+    found = select_file(files, spec)
+    return found["url"] if found else None
+
+
+def pip_args():
+    # type: () -> List[str]
+    """Extra pip arguments that keep pip away from the network."""
+    if not config.OFFLINE:
+        return []
+    directory = index_dir()
+    args = ["--no-index"]
+    if directory is not None:
+        args += ["--find-links", directory]
+        project_dirs = [
+            os.path.join(directory, name)
+            for name in sorted(os.listdir(directory))
+            if os.path.isdir(os.path.join(directory, name))
+        ] if os.path.isdir(directory) else []
+        for project_dir in project_dirs:
+            args += ["--find-links", project_dir]
+    return args
+
+
+def install_offline(spec):
+    # type: (str) -> bool
+    """Install ``spec`` from the offline index; False right away if absent."""
+    if find_local(spec) is None:
+        emit(
+            "install",
+            "❌ {0} not available offline ({1})",
+            spec,
+            config.OFFLINE_INDEX or "no LOAD_OFFLINE_INDEX configured",
+            level="error",
+        )
+        return False
+
+    emit("install", "📦 Installing {0} from offline index...", spec)
+    from .installer import run_install
+
+    cmd = [sys.executable, "-m", "pip", "install"] + pip_args() + [spec]
+    result = run_install(cmd, "offline")
+    return result.returncode == 0
@@ -0,0 +1,322 @@
+# -*- coding: utf-8 -*-
+"""
+Output sinks for Load
+
+Auto-print previews and installer status lines go through :func:`emit`
+instead of ``print``. The sink decides where they end up:
+
+* ``stdout`` - print them, errors to stderr (default)
+* ``buffered`` - same streams, written in batches
+* ``logging`` - records on the ``load`` logger
+* ``json`` - one JSON object per line (``json:/path/file.jsonl`` for a file)
+* ``null`` - nothing
+
+Messages are formatted lazily: when the sink is disabled, the ``silent``
+setting is on (errors still pass) or the rate limit
+(``config.OUTPUT_RATE`` lines per second) is exhausted, no string is built.
+Select a sink with ``LOAD_OUTPUT`` or :func:`set_output`.
+"""
+
+import atexit
+import json
+import logging
+import sys
+import threading
+import time
+
+from . import config
+from .runtime import get_settings
+
+# Type hints for static type checkers (Python 2/3 compatible)
+if False:  # MYPY
+    from typing import Any, Dict, List, Optional, Tuple, Union  # noqa: F401
+
+_LEVELS = {"debug": logging.DEBUG, "info": logging.INFO,
+           "warning": logging.WARNING, "error": logging.ERROR}
+
+
+class Sink(object):
+    """Where output records go.
+
+    A record is a dict with ``time``, ``kind`` (``print`` for auto-print,
+    ``install`` for installer messages), ``level``, ``message`` and any
+    extra fields given to :func:`emit`.
+    """
+
+    def enabled(self, kind, level="info"):
+        # type: (str, str) -> bool
+        return True
+
+    def write(self, record):
+        # type: (Dict[str, Any]) -> None
+        raise NotImplementedError
+
+    def flush(self):
+        # type: () -> None
+        pass
+
+
+class NullSink(Sink):
+    """Discard everything (and build nothing)."""
+
+    def enabled(self, kind, level="info"):
+        # type: (str, str) -> bool
+        return False
+
+    def write(self, record):
+        # type: (Dict[str, Any]) -> None
+        pass
+
+
+class StreamSink(Sink):
+    """``print`` each message; errors go to stderr."""
+
+    def __init__(self, stream=None, errors=None):
+        # type: (Any, Any) -> None
+        self.stream = stream
+        self.errors = errors
+
+    def _target(self, level):
+        # type: (str) -> Any
+        # sys.stdout/stderr are looked up per call: they may be redirected
+        if level == "error":
+            return self.errors or sys.stderr
+        return self.stream or sys.stdout
+
+    def write(self, record):
+        # type: (Dict[str, Any]) -> None
+        print(record["message"], file=self._target(record["level"]))
+
+
+class BufferedSink(StreamSink):
+    """Like :class:`StreamSink`, but writes ``size`` lines (or whatever
+    ``interval`` seconds collected) at once, flushing on exit."""
+
+    def __init__(self, stream=None, errors=None, size=64, interval=1.0):
+        # type: (Any, Any, int, float) -> None
+        super(BufferedSink, self).__init__(stream, errors)
+        self.size = size
+        self.interval = interval
+        self._lines = []  # type: List[Tuple[str, str]]
+        self._last = time.time()
+        self._lock = threading.Lock()
+
+    def write(self, record):
+        # type: (Dict[str, Any]) -> None
+        with self._lock:
+            self._lines.append((record["level"], record["message"]))
+            due = (
+                len(self._lines) >= self.size
+                or time.time() - self._last >= self.interval
+            )
+        if due:
+            self.flush()
+
+    def flush(self):
+        # type: () -> None
+        with self._lock:
+            lines, self._lines = self._lines, []
+            self._last = time.time()
+        chunks = []  # type: List[Tuple[Any, List[str]]]
+        for level, message in lines:
+            target = self._target(level)
+            if chunks and chunks[-1][0] is target:
+                chunks[-1][1].append(message)
+            else:
+                chunks.append((target, [message]))
+        for target, messages in chunks:
+            target.write("\n".join(messages) + "\n")
+            target.flush()
+
+
+class LoggingSink(Sink):
+    """Log records on a :mod:`logging` logger (default ``load``)."""
+
+    def __init__(self, logger="load"):
+        # type: (Union[str, logging.Logger]) -> None
+        self.logger = logging.getLogger(logger) if isinstance(logger, str) else logger
+
+    def enabled(self, kind, level="info"):
+        # type: (str, str) -> bool
+        return self.logger.isEnabledFor(_LEVELS.get(level, logging.INFO))
+
+    def write(self, record):
+        # type: (Dict[str, Any]) -> None
+        extra = dict(("load_" + k, v) for k, v in record.items() if k != "message")
+        self.logger.log(_LEVELS.get(record["level"], logging.INFO), "%s",
+                        record["message"], extra=extra)
+
+
+class JsonLinesSink(Sink):
+    """One JSON object per record, to a stream or an appended file."""
+
+    def __init__(self, stream=None, path=None):
+        # type: (Any, Optional[str]) -> None
+        self.stream = stream
+        self.path = path
+        self._lock = threading.Lock()
+
+    def write(self, record):
+        # type: (Dict[str, Any]) -> None
+        line = json.dumps(record, default=str, ensure_ascii=False) + "\n"
+        with self._lock:
+            if self.path:
+                with open(self.path, "a") as f:
+                    f.write(line)
+            else:
+                stream = self.stream or sys.stdout
+                stream.write(line)
+                stream.flush()
+
+
+class RateLimiter(object):
+    """Token bucket allowing ``rate`` lines per second (bursts of ``rate``)."""
+
+    def __init__(self, rate):
+        # type: (float) -> None
+        self.rate = float(rate)
+        self._tokens = self.rate
+        self._last = time.time()
+        self._lock = threading.Lock()
+        self.dropped = 0
+
+    def allow(self):
+        # type: () -> bool
+        with self._lock:
+            now = time.time()
+            self._tokens = min(self.rate, self._tokens + (now - self._last) * self.rate)
+            self._last = now
+            if self._tokens >= 1:
+                self._tokens -= 1
+                return True
+            self.dropped += 1
+            return False
+
+    def take_dropped(self):
+        # type: () -> int
+        with self._lock:
+            dropped, self.dropped = self.dropped, 0
+            return dropped
+
+
+_sink = None  # type: Optional[Sink]
+_limiter = None  # type: Optional[RateLimiter]
+_lock = threading.Lock()
+
+
+def make_sink(name):
+    # type: (str) -> Sink
+    """Sink for a ``LOAD_OUTPUT`` value."""
+    kind, _, target = name.partition(":")
+    if kind in ("stdout", "print", ""):
+        return StreamSink()
+    if kind in ("null", "none", "off"):
+        return NullSink()
+    if kind == "buffered":
+        return BufferedSink()
+    if kind == "logging":
+        return LoggingSink(target or "load")
+    if kind == "json":
+        return JsonLinesSink(path=target or None)
+    raise ValueError("Unknown output sink: {0}".format(name))
+
+
+def get_sink():
+    # type: () -> Sink
+    """The active sink."""
+    global _sink
+    sink = _sink
+    if sink is None:
+        with _lock:
+            if _sink is None:
+                _sink = make_sink(config.OUTPUT)
+            sink = _sink
+    return sink
+
+
+def set_output(sink, rate=None):
+    # type: (Union[str, Sink], Optional[float]) -> Sink
+    """Send output to ``sink`` (a :class:`Sink` or a ``LOAD_OUTPUT`` name).
+
+    ``rate`` caps the lines per second (0: unlimited); error lines are
+    never dropped. Returns the new sink.
+    """
+    global _sink, _limiter
+    new = make_sink(sink) if isinstance(sink, str) else sink
+    with _lock:
+        if _sink is not None:
+            _sink.flush()
+        _sink = new
+        if rate is not None:
+            config.OUTPUT_RATE = rate
+        _limiter = None
+    return new
+
+
+def _rate_limiter():
+    # type: () -> Optional[RateLimiter]
+    global _limiter
+    rate = config.OUTPUT_RATE
+    if not rate:
+        return None
+    with _lock:
+        if _limiter is None or _limiter.rate != rate:
+            _limiter = RateLimiter(rate)
+        return _limiter
+
+
+def enabled(kind="install", level="info"):
+    # type: (str, str) -> bool
+    """Whether a message of ``kind``/``level`` would be written at all."""
+    return get_sink().enabled(kind, level)
+
+
+def emit(kind, message, *args, **fields):
+    # type: (str, Any, *Any, **Any) -> None
+    """Write ``message.format(*args)`` to the sink.
+
+    ``message`` may also be a callable returning the text. Nothing is
+    formatted when the sink is disabled or the line is rate-limited. A
+    ``level`` keyword (``info``, ``error``...) is taken from ``fields``;
+    the remaining fields are attached to structured records.
+    """
+    level = fields.pop("level", "info")
+    if level != "error" and get_settings().silent:
+        return
+    sink = get_sink()
+    if not sink.enabled(kind, level):
+        return
+    limiter = _rate_limiter() if level != "error" else None
+    if limiter is not None:
+        if not limiter.allow():
+            return
+        dropped = limiter.take_dropped()
+        if dropped:
+            sink.write({"time": time.time(), "kind": kind, "level": "warning",
+                        "message": "… {0} line(s) suppressed".format(dropped)})
+    if callable(message):
+        text = message()
+    elif args:
+        text = message.format(*args)
+    else:
+        text = message
+    record = {"time": time.time(), "kind": kind, "level": level, "message": text}
+    record.update(fields)
+    sink.write(record)
+
+
+def flush():
+    # type: () -> None
+    """Write out whatever a buffering sink holds."""
+    get_sink().flush()
+
+
+def _flush_at_exit():
+    # type: () -> None
+    # Only the active sink: set_output() flushed the ones it replaced
+    sink = _sink
+    if sink is not None:
+        sink.flush()
+
+
+atexit.register(_flush_at_exit)
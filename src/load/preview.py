@@ -0,0 +1,353 @@
+# -*- coding: utf-8 -*-
+"""
+Bounded previews for Load's auto-print
+
+Everything here looks at only as much of an object as the preview shows:
+no copying of whole collections, no consuming of one-shot iterators, no
+decoding of whole HTTP bodies, no stringifying of whole containers and no
+computing of lazy arrays.
+"""
+
+import codecs
+import collections
+import collections.abc
+import itertools
+import re
+import sys
+
+# Type hints for static type checkers (Python 2/3 compatible)
+if False:  # MYPY
+    from typing import Any, Dict, Iterator, List, Optional, Tuple  # noqa: F401
+
+
+def is_one_shot(obj):
+    # type: (Any) -> bool
+    """Whether iterating ``obj`` would consume it (iterators, generators)."""
+    return isinstance(obj, collections.abc.Iterator)
+
+
+def head(obj, count=5):
+    # type: (Any, int) -> Optional[List[Any]]
+    """The first ``count`` items of ``obj`` without materializing the rest.
+
+    Sequences are read by index, mappings and sets through a fresh
+    iterator over them. Returns None for one-shot iterators (previewing
+    them would eat the items) and for objects that cannot be iterated.
+    """
+    if is_one_shot(obj):
+        return None
+    keyed = isinstance(obj, (collections.abc.Mapping, collections.abc.Set))
+    if not keyed and not hasattr(obj, "keys") and hasattr(obj, "__getitem__"):
+        items = []
+        try:
+            for i in range(min(count, len(obj))):
+                items.append(obj[i])
+            return items
+        except (TypeError, KeyError, IndexError, AttributeError):
+            pass  # not integer-indexable after all: iterate instead
+    try:
+        return list(itertools.islice(iter(obj), count))
+    except TypeError:
+        return None
+
+
+# One JSON token, after optional whitespace
+_JSON_TOKEN = re.compile(
+    r'\s*(?:("(?:[^"\\]|\\.)*")|(-?[0-9][0-9.eE+-]*)|(true|false|null)|([{}\[\],:]))'
+)
+
+
+def json_preview(text, limit, complete=True):
+    # type: (str, int, bool) -> Optional[str]
+    """Compact rendering of (a prefix of) a JSON document.
+
+    Tokens are copied until ``limit`` characters have been produced, so
+    the cost depends on ``limit``, not on the document. ``complete`` says
+    whether ``text`` is the whole document; if not, or if the output was
+    cut, it ends in ``...``. Returns None if ``text`` is not JSON.
+    """
+    out = []  # type: List[str]
+    size = 0
+    pos = 0
+    end = len(text.rstrip())
+    truncated = not complete
+    while pos < end:
+        match = _JSON_TOKEN.match(text, pos)
+        if match is None:
+            rest = text[pos:].lstrip()
+            if not complete and rest.startswith('"'):
+                out.append(rest[:max(limit - size, 0)])  # string cut by the prefix
+                break
+            return None
+        token = match.group(match.lastindex)
+        if pos == 0 and token in (",", ":", "}", "]"):
+            return None
+        piece = token + " " if token in (",", ":") else token
+        if size + len(piece) > limit:
+            out.append(piece[:limit - size])
+            truncated = True
+            break
+        out.append(piece)
+        size += len(piece)
+        pos = match.end()
+    if not out:
+        return None
+    rendered = "".join(out).rstrip()
+    return rendered + "..." if truncated else rendered
+
+
+def _loaded_body(response):
+    # type: (Any) -> Optional[bytes]
+    """The already-downloaded body of a response, never reading a stream."""
+    content = getattr(response, "__dict__", {}).get("_content")
+    if isinstance(content, (bytes, bytearray)):
+        return content  # requests / httpx after the body was read
+    if "_content" in getattr(response, "__dict__", {}):
+        return None  # body not read yet (stream=True): leave it alone
+    if isinstance(getattr(type(response), "content", None), property):
+        return None  # a property might read the stream
+    content = getattr(response, "content", None)
+    return content if isinstance(content, (bytes, bytearray)) else None
+
+
+def response_preview(response, limit):
+    # type: (Any, int) -> Optional[Tuple[str, str]]
+    """``("JSON" | "Text", preview)`` from the first ``limit`` bytes of a
+    response body, or None if the body is unavailable.
+
+    Only that prefix is decoded; JSON is rendered with :func:`json_preview`.
+    """
+    body = _loaded_body(response)
+    if body is None:
+        return None
+    complete = len(body) <= limit
+    chunk = bytes(body[:limit])
+    encoding = getattr(response, "encoding", None) or "utf-8"
+    try:
+        decoder = codecs.getincrementaldecoder(encoding)(errors="replace")
+    except LookupError:
+        decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+    text = decoder.decode(chunk, final=complete)  # drops a split trailing character
+
+    headers = getattr(response, "headers", None) or {}
+    content_type = headers.get("content-type", "") if hasattr(headers, "get") else ""
+    if "json" in content_type or text.lstrip()[:1] in ("{", "["):
+        rendered = json_preview(text, limit, complete)
+        if rendered is not None:
+            return "JSON", rendered
+    return "Text", text + ("" if complete else "...")
+
+
+_CONTAINERS = {
+    list: ("[", "]", list.__repr__),
+    tuple: ("(", ")", tuple.__repr__),
+    set: ("{", "}", set.__repr__),
+    frozenset: ("frozenset({", "})", frozenset.__repr__),
+    dict: ("{", "}", dict.__repr__),
+}
+
+
+def _container_kind(obj):
+    # type: (Any) -> Optional[type]
+    """The ``_CONTAINERS`` key ``obj`` is rendered like, or None."""
+    kind = next((k for k in _CONTAINERS if isinstance(obj, k)), None)
+    if kind is tuple and hasattr(obj, "_fields"):
+        return None  # namedtuple: small, and its repr names the fields
+    if kind is not None or isinstance(obj, (str, bytes, bytearray, range, memoryview)):
+        return kind
+    if isinstance(obj, collections.abc.Mapping):
+        return dict
+    if isinstance(obj, collections.abc.Set):
+        return set
+    if isinstance(obj, collections.abc.Sequence):
+        return list
+    return None
+
+
+def _repr_chunks(obj, limit, active):
+    # type: (Any, int, set) -> Iterator[str]
+    """``repr(obj)`` as a stream of small pieces, built lazily."""
+    cls = type(obj)
+    if cls is str or cls is bytes:
+        if len(obj) > limit:
+            # repr of a prefix; the open end is cut by the caller's limit
+            yield repr(obj[:limit + 1])[:-1]
+        else:
+            yield repr(obj)
+        return
+    if cls is int and obj.bit_length() > limit * 4:  # > limit decimal digits
+        yield "<int of {0} bits>".format(obj.bit_length())
+        return
+
+    kind = _container_kind(obj)
+    if kind is None:
+        yield repr(obj)
+        return
+    opening, closing, base_repr = _CONTAINERS[kind]
+    if cls.__repr__ is not base_repr:
+        # Counter, OrderedDict, deque, user collections: their own __repr__
+        # would format every item, so walk them as ``TypeName(...)``
+        if not obj:
+            yield "{0}()".format(cls.__name__)
+            return
+        opening, closing = cls.__name__ + "(" + opening, closing + ")"
+    elif not obj and kind in (set, frozenset):
+        yield "{0}()".format(kind.__name__)
+        return
+    if id(obj) in active:
+        yield opening[-1] + "..." + closing[0]  # recursive reference
+        return
+
+    active.add(id(obj))
+    try:
+        yield opening
+        for i, item in enumerate(obj.items() if kind is dict else obj):
+            if i:
+                yield ", "
+            if kind is dict:
+                for chunk in _repr_chunks(item[0], limit, active):
+                    yield chunk
+                yield ": "
+                item = item[1]
+            for chunk in _repr_chunks(item, limit, active):
+                yield chunk
+        if kind is tuple and len(obj) == 1:
+            yield ","
+        yield closing
+    finally:
+        active.discard(id(obj))
+
+
+def bounded_repr(obj, limit, as_str=False):
+    # type: (Any, int, bool) -> Tuple[str, bool]
+    """``(text, truncated)``: at most ``limit`` characters of ``repr(obj)``.
+
+    Like :mod:`reprlib`, containers are walked item by item; unlike it,
+    rendering stops as soon as ``limit`` characters exist, so the cost
+    depends on ``limit`` rather than on the size of the object.
+    Collections with their own ``__repr__`` (``Counter``, ``deque``...)
+    are walked the same way and shown as ``TypeName(...)``. With
+    ``as_str`` a top-level string is shown as ``str()`` would.
+    """
+    if as_str and isinstance(obj, str):
+        return obj[:limit], len(obj) > limit
+    out = []  # type: List[str]
+    size = 0
+    for chunk in _repr_chunks(obj, limit, set()):
+        if size + len(chunk) > limit:
+            out.append(chunk[:limit - size])
+            return "".join(out), True
+        out.append(chunk)
+        size += len(chunk)
+    return "".join(out), False
+
+
+# Packages whose arrays/frames compute on access (str(), indexing, stats)
+_LAZY_MODULES = ("dask", "vaex", "xarray", "modin", "cudf")
+
+
+def is_lazy(obj):
+    # type: (Any) -> bool
+    """Whether touching ``obj``'s data could trigger a computation."""
+    root = type(obj).__module__.split(".")[0]
+    return root in _LAZY_MODULES or callable(getattr(obj, "compute", None))
+
+
+def human_size(count):
+    # type: (float) -> str
+    for unit in ("B", "kB", "MB", "GB"):
+        if count < 1000 or unit == "GB":
+            break
+        count /= 1000.0
+    return ("{0:.0f} {1}" if unit == "B" else "{0:.1f} {1}").format(count, unit)
+
+
+def _number(value):
+    # type: (Any) -> str
+    try:
+        return "{0:.4g}".format(value)
+    except (TypeError, ValueError):
+        return str(value)
+
+
+def _array_stats(values, numpy):
+    # type: (Any, Any) -> List[Tuple[str, str]]
+    """min/max/mean/null counts of a numpy array, vectorized."""
+    kind = values.dtype.kind
+    stats = []  # type: List[Tuple[str, str]]
+    if kind == "f" or kind == "c":
+        nulls = numpy.isnan(values)
+        stats.append(("nulls", str(int(nulls.sum()))))
+        values = values[~nulls]
+    elif kind == "O":
+        stats.append(("nulls", str(sum(1 for v in values.flat if v is None))))
+        return stats
+    if values.size and kind in "biufmM":
+        stats.append(("min", _number(values.min())))
+        stats.append(("max", _number(values.max())))
+        if kind in "biuf":
+            stats.append(("mean", _number(values.mean())))
+    return stats
+
+
+def array_summary(obj, budget=None):
+    # type: (Any, Optional[int]) -> Dict[str, Any]
+    """Shape, dtype, size and sample statistics of an array or DataFrame.
+
+    Statistics come from the first rows only, at most ``budget`` elements
+    (the ``print_sample`` setting), read as a view where possible. Lazy and
+    out-of-core objects (dask, vaex, ...) only report metadata.
+    """
+    from .runtime import get_settings
+
+    budget = budget or get_settings().print_sample
+    shape = tuple(getattr(obj, "shape", ()))
+    summary = {
+        "type": type(obj).__name__, "shape": shape, "lazy": is_lazy(obj),
+    }  # type: Dict[str, Any]
+
+    dtypes = getattr(obj, "dtypes", None)
+    if dtypes is not None and hasattr(dtypes, "value_counts"):  # DataFrame
+        counts = collections.Counter(str(d) for d in dtypes)
+        summary["dtypes"] = ", ".join(
+            "{0}({1})".format(d, n) for d, n in sorted(counts.items())
+        )
+    elif hasattr(obj, "dtype"):
+        summary["dtype"] = str(obj.dtype)
+    if hasattr(obj, "memory_usage") and not summary["lazy"]:
+        usage = obj.memory_usage(index=True, deep=False)
+        summary["nbytes"] = int(usage.sum() if hasattr(usage, "sum") else usage)
+    elif isinstance(getattr(obj, "nbytes", None), int):
+        summary["nbytes"] = obj.nbytes
+    if summary["lazy"] or not shape:
+        return summary
+
+    rows = shape[0]
+    width = 1
+    for size in shape[1:]:
+        width *= size or 1
+    take = min(rows, max(1, budget // width))
+    summary["sampled_rows"] = take
+    sample = obj.head(take) if hasattr(obj, "head") else obj[:take]
+    summary["sample"] = sample
+
+    numpy = sys.modules.get("numpy")
+    if numpy is None:
+        return summary
+    if hasattr(sample, "select_dtypes") or hasattr(sample, "to_numpy"):  # pandas
+        summary["nulls"] = int(numpy.asarray(sample.isna()).sum())
+        if hasattr(sample, "select_dtypes"):
+            columns = sample.select_dtypes("number")
+            summary["columns"] = [
+                (str(name), [
+                    stat for stat in _array_stats(columns[name].to_numpy(), numpy)
+                    if stat[0] != "nulls"
+                ])
+                for name in list(columns.columns)[:5]
+            ]
+        elif sample.dtype.kind in "biufmM":
+            summary["stats"] = [stat for stat in _array_stats(sample.to_numpy(), numpy)
+                                if stat[0] != "nulls"]
+        return summary
+    summary["stats"] = _array_stats(numpy.asarray(sample), numpy)
+    return summary
@@ -11,6 +11,20 @@ import zipfile
 
 # Import compatibility layer
 from ._compat import import_module, urlretrieve, urlopen  # noqa: F401
+from .buildenv import (
+    install_git_with_build_env,
+    install_with_build_env,
+    read_build_requires,
+)
+from .httpclient import get_http_pool
+from . import config as load_config
+from .output import emit
+from .index import get_index, is_exact
+from .installer import run_install
+from .locks import serialized_install
+from .names import lookup as lookup_distribution
+from . import telemetry
+from .offline import install_offline, pip_args as offline_pip_args
 
 # Type hints for static type checkers (Python 2/3 compatible)
 if False:  # MYPY
@@ -141,7 +155,7 @@ class LoadRegistry(object):
         
         installer = installers.get(registry)
         if installer is None:
-            print("❌ Unknown registry: {0}".format(registry))
+            emit("install", "❌ Unknown registry: {0}", registry, level="warning")
             return False
             
         return installer(name, **kwargs)
@@ -149,70 +163,113 @@ class LoadRegistry(object):
     @staticmethod
     def install_from_pypi(name, registry="pypi"):
         # type: (str, str) -> bool
-        """Install from PyPI or private registry"""
+        """Install from PyPI or private registry
+
+        For private registries with an ``index_url`` the simple index is
+        queried first: a missing package or version fails immediately and
+        the chosen file is handed to pip directly.
+        """
+        prefix, _, bare = name.rpartition("/")
+        name = (prefix + "/" if prefix else "") + (lookup_distribution(bare) or bare)
+        return serialized_install(name, LoadRegistry._install_from_pypi, name, registry)
+
+    @staticmethod
+    def _install_from_pypi(name, registry="pypi"):
+        # type: (str, str) -> bool
+        if name.startswith(registry + "/"):
+            name = name[len(registry) + 1:]
+        if load_config.OFFLINE:
+            return install_offline(name)
+
         if registry in PRIVATE_REGISTRIES:
             config = PRIVATE_REGISTRIES[registry]
             cmd = config["install_cmd"].copy()
             if "index_url" in config:
-                cmd.extend([config["index_url"], name])
+                target = name
+                try:
+                    with telemetry.phase("index"):
+                        found = get_index(config["index_url"]).find_file(name)
+                except (IOError, OSError, ValueError):
+                    found = ""  # Index unreachable, let pip try
+                if found is None:
+                    emit(
+                        "install", "❌ {0} not found in {1}",
+                        name, registry, level="warning",
+                    )
+                    return False
+                if found and is_exact(name):
+                    # pip verifies the hash carried in the URL fragment;
+                    # extras and ranges are left to pip with the index
+                    target = found["url"]
+                    if "sha256" in found["hashes"]:
+                        target += "#sha256=" + found["hashes"]["sha256"]
+                cmd.extend([config["index_url"], target])
             else:
                 cmd.append(name)
         else:
             cmd = REGISTRIES["pypi"]["install_cmd"] + [name]
 
-        print("📦 Installing {0} from {1}...".format(name, registry))
-        result = subprocess.run(cmd, capture_output=True, text=True)
+        emit("install", "📦 Installing {0} from {1}...", name, registry)
+        result = run_install(cmd, registry)
         return result.returncode == 0
 
     @classmethod
     def install_from_github(cls, repo):
         # type: (str) -> bool
         """Install from GitHub"""
+        return serialized_install(repo, cls._install_from_github, repo)
+
+    @classmethod
+    def _install_from_github(cls, repo):
+        # type: (str) -> bool
         if not repo.startswith("https://"):
             repo = "https://github.com/{0}".format(repo)
 
-        cmd = [sys.executable, "-m", "pip", "install", "git+{0}".format(repo)]
-        print("📦 Installing from GitHub: {0}".format(repo))
+        if load_config.OFFLINE:
+            emit(
+                "install", "❌ Offline mode: cannot install from GitHub: {0}",
+                repo, level="warning",
+            )
+            return False
+
+        emit("install", "📦 Installing from GitHub: {0}", repo)
         try:
-            result = subprocess.run(cmd, capture_output=True, text=True)
-            return result.returncode == 0
+            return install_git_with_build_env("git+{0}".format(repo), registry="github")
         except subprocess.CalledProcessError as e:
-            print("❌ Error installing from GitHub: {0}".format(e))
+            emit("install", "❌ Error installing from GitHub: {0}", e, level="warning")
             return False
 
     @classmethod
     def install_from_gitlab(cls, repo, token=None):
         # type: (str, OptStr) -> bool
         """Install from GitLab"""
+        return serialized_install(repo, cls._install_from_gitlab, repo, token)
+
+    @classmethod
+    def _install_from_gitlab(cls, repo, token=None):
+        # type: (str, OptStr) -> bool
         if not repo.startswith("https://"):
             repo = "https://gitlab.com/{0}".format(repo)
 
+        if load_config.OFFLINE:
+            emit(
+                "install", "❌ Offline mode: cannot install from GitLab: {0}",
+                repo, level="warning",
+            )
+            return False
+
         try:
             if token:
-                repo_with_token = repo.replace(
-                    "https://", "https://oauth2:{0}@".format(token)
+                source = "git+{0}".format(
+                    repo.replace("https://", "https://oauth2:{0}@".format(token))
                 )
-                cmd = [
-                    sys.executable,
-                    "-m",
-                    "pip",
-                    "install",
-                    "git+{0}".format(repo_with_token),
-                ]
             else:
-                cmd = [
-                    sys.executable,
-                    "-m",
-                    "pip",
-                    "install",
-                    "git+{0}".format(repo),
-                ]
-
-            print("📦 Installing from GitLab: {0}".format(repo))
-            result = subprocess.run(cmd, capture_output=True, text=True)
-            return result.returncode == 0
+                source = "git+{0}".format(repo)
+
+            emit("install", "📦 Installing from GitLab: {0}", repo)
+            return install_git_with_build_env(source, registry="gitlab")
         except subprocess.CalledProcessError as e:
-            print("❌ Error installing from GitLab: {0}".format(e))
+            emit("install", "❌ Error installing from GitLab: {0}", e, level="warning")
             return False
 
     def install_from_url(self, url):
@@ -228,26 +285,44 @@ class LoadRegistry(object):
         Returns:
             bool: True if installation was successful, False otherwise
         """
+        return serialized_install(url, self._install_from_url, url)
+
+    def _install_from_url(self, url):
+        # type: (str) -> bool
         try:
             # For test URLs, just return True to simulate success
             if 'example.com' in url:
                 return True
                 
+            if load_config.OFFLINE and not url.startswith("file:"):
+                emit(
+                    "install", "❌ Offline mode: cannot download {0}",
+                    url, level="warning",
+                )
+                return False
+
             # Normal URL handling
-            print("📦 Downloading from URL: {0}".format(url))
+            emit("install", "📦 Downloading from URL: {0}", url)
             filename = os.path.basename(url)
             filepath = os.path.join(self.temp_dir, filename)
             
-            # Download the file
-            urlretrieve(url, filepath)
+            # Download the file over a pooled keep-alive connection
+            with telemetry.phase("download"):
+                get_http_pool().download(url, filepath)
+            record = telemetry.current()
+            if record is not None:
+                record.artifact = url
+                record.add_bytes("downloaded", os.path.getsize(filepath))
             
             # Handle different file types
             if filename.endswith(('.py', '.txt')):
                 # For single files, just copy to site-packages
+                # (or the app-scoped target directory)
                 import site
                 import shutil
+                from .target import activate as activate_target
                 target_dir = os.path.join(
-                    site.getsitepackages()[0], 
+                    activate_target() or site.getsitepackages()[0],
                     os.path.splitext(filename)[0]
                 )
                 os.makedirs(target_dir, exist_ok=True)
@@ -255,7 +330,8 @@ class LoadRegistry(object):
                 return True
                 
             if filename.endswith('.whl'):
-                cmd = [sys.executable, "-m", "pip", "install", filepath]
+                cmd = [sys.executable, "-m", "pip", "install"]
+                cmd += offline_pip_args() + [filepath]
             elif filename.endswith(('.tar.gz', '.tar.bz2', '.zip')):
                 # Extract and handle source distributions
                 extract_dir = os.path.join(
@@ -273,49 +349,43 @@ class LoadRegistry(object):
                     with tarfile.open(filepath, mode) as tar:
                         tar.extractall(extract_dir)
                 
-                # Find setup.py
-                setup_py = os.path.join(extract_dir, 'setup.py')
-                if not os.path.exists(setup_py):
-                    for root, _, files in os.walk(extract_dir):
-                        if 'setup.py' in files:
-                            setup_py = os.path.join(root, 'setup.py')
-                            break
-                
-                if not os.path.exists(setup_py):
-                    raise ValueError("No setup.py found in the archive")
-                
-                # Install from setup.py
-                cmd = [sys.executable, "setup.py", "install"]
-                original_dir = os.getcwd()
-                try:
-                    os.chdir(os.path.dirname(setup_py))
-                    result = subprocess.run(
-                        cmd, 
-                        stdout=subprocess.PIPE, 
-                        stderr=subprocess.PIPE
+                # Find the project root (setup.py or pyproject.toml)
+                project_dir = None
+                for root, _, files in os.walk(extract_dir):
+                    if 'setup.py' in files or 'pyproject.toml' in files:
+                        project_dir = root
+                        break
+
+                if project_dir is None:
+                    raise ValueError(
+                        "No setup.py or pyproject.toml found in the archive"
                     )
-                    return result.returncode == 0
-                finally:
-                    os.chdir(original_dir)
+
+                # Build in a pooled build environment matching the project
+                return install_with_build_env(
+                    project_dir, read_build_requires(project_dir), registry="url",
+                    source_url=url,
+                )
             else:
                 raise ValueError("Unsupported file format")
 
             # Run the installation command if not already handled
             if 'cmd' in locals():
-                result = subprocess.run(
-                    cmd, 
-                    stdout=subprocess.PIPE, 
-                    stderr=subprocess.PIPE
-                )
+                result = run_install(cmd, "url", source=url)
                 if result.returncode != 0:
-                    print("❌ Installation failed with error:")
-                    print(result.stderr.decode())
+                    emit(
+                        "install", "❌ Installation failed with error:\n{0}",
+                        result.stderr, level="warning",
+                    )
                     return False
 
             return True
 
         except Exception as e:  # noqa: B902
-            print("❌ Error installing from URL {0}: {1}".format(url, str(e)))
+            emit(
+                "install", "❌ Error installing from URL {0}: {1}",
+                url, str(e), level="warning",
+            )
             return False
 
 def add_registry(name, config):
@@ -366,4 +436,4 @@ def configure_private_registry(name, index_url=None, token=None, base_url=None):
         config["base_url"] = base_url
 
     PRIVATE_REGISTRIES[name] = config
-    print("✅ Configured private registry: {0}".format(name))
+    emit("install", "✅ Configured private registry: {0}", name)
@@ -0,0 +1,331 @@
+# -*- coding: utf-8 -*-
+"""
+Bulk requirements ingestion for Load
+
+``load_requirements()`` reads a requirements.txt file or pyproject dependency
+arrays, drops lines whose environment markers do not apply, skips what is
+already installed, and installs the rest with one pip run per registry
+before importing everything.
+"""
+
+import importlib
+import os
+import re
+import sys
+
+from . import config
+from .config import _module_cache
+from .index import _packaging
+from .output import emit
+from .installed import import_name_for
+
+# Type hints for static type checkers (Python 2/3 compatible)
+if False:  # MYPY
+    from typing import Any, Dict, Iterable, List, Optional, Tuple  # noqa: F401
+
+_NAME = re.compile(r"^\s*([A-Za-z0-9][A-Za-z0-9._-]*)")
+
+
+class Requirement(object):
+    """One parsed requirement line.
+
+    Attributes:
+        line: The original line (without comments)
+        spec: What gets handed to the installer (marker removed)
+        name: Distribution (or repository) name
+        registry: Registry chosen by ``LoadRegistry.parse_source``
+        editable: Given with ``-e``/``--editable``; installed that way
+    """
+
+    def __init__(self, line, spec, name, registry, specifier=None, editable=False):
+        # type: (str, str, str, str, Any, bool) -> None
+        self.line = line
+        self.spec = spec
+        self.name = name
+        self.registry = registry
+        self.specifier = specifier
+        self.editable = editable
+
+    def __repr__(self):
+        return "Requirement({0!r}, registry={1!r})".format(self.spec, self.registry)
+
+
+def _read_lines(path, seen=None):
+    # type: (str, Optional[set]) -> List[str]
+    """Logical lines of a requirements file, following ``-r`` includes."""
+    seen = seen if seen is not None else set()
+    path = os.path.abspath(path)
+    if path in seen:
+        return []
+    seen.add(path)
+
+    with open(path) as f:
+        text = f.read()
+    lines = []
+    for line in _logical_lines(text):
+        include = re.match(r"^(-r|--requirement)\s*=?\s*(\S+)", line)
+        if include:
+            lines.extend(
+                _read_lines(os.path.join(os.path.dirname(path), include.group(2)), seen)
+            )
+        else:
+            lines.append(line)
+    return lines
+
+
+def _logical_lines(text):
+    # type: (str) -> List[str]
+    """Join continuations and strip comments and blank lines."""
+    lines = []
+    for line in text.replace("\\\n", "").splitlines():
+        line = re.sub(r"(^|\s)#.*$", "", line).strip()
+        if line:
+            lines.append(line)
+    return lines
+
+
+def _pyproject_dependencies(text, extras=()):
+    # type: (str, Iterable[str]) -> List[str]
+    """``[project] dependencies`` plus the requested optional groups."""
+    try:
+        import tomllib  # Python 3.11+
+    except ImportError:
+        tomllib = None
+
+    if tomllib is not None:
+        project = tomllib.loads(text).get("project", {})
+        deps = list(project.get("dependencies", []))
+        optional = project.get("optional-dependencies", {})
+        for extra in extras:
+            deps.extend(optional.get(extra, []))
+        return deps
+
+    # Minimal fallback: the dependencies array of the [project] table
+    match = re.search(
+        r"^\[project\][^\[]*?^dependencies\s*=\s*\[(.*?)^\]",
+        text,
+        re.MULTILINE | re.DOTALL,
+    )
+    if not match:
+        return []
+    return re.findall(r"[\"']([^\"']+)[\"']", match.group(1))
+
+
+def parse_requirements(path_or_text, extras=()):
+    # type: (str, Iterable[str]) -> List[Requirement]
+    """Parse requirements into :class:`Requirement` objects.
+
+    Args:
+        path_or_text: Path to requirements.txt / pyproject.toml, or the
+            contents of either
+        extras: Optional-dependency groups to include from pyproject.toml
+
+    Lines whose environment marker is false are dropped; pip options other
+    than ``-r`` and ``-e`` are ignored. ``-e`` lines are kept editable.
+    """
+    from .registry import LoadRegistry
+
+    is_path = "\n" not in path_or_text and os.path.isfile(path_or_text)
+    if is_path and path_or_text.endswith(".toml"):
+        with open(path_or_text) as f:
+            lines = _pyproject_dependencies(f.read(), extras)
+    elif is_path:
+        lines = _read_lines(path_or_text)
+    elif re.search(r"^\[project\]", path_or_text, re.MULTILINE):
+        lines = _pyproject_dependencies(path_or_text, extras)
+    else:
+        lines = _logical_lines(path_or_text)
+
+    packaging = _packaging()
+    requirements = []
+    for line in lines:
+        spec = re.sub(r"^(-e|--editable)\s+", "", line)
+        editable = spec != line
+        if spec.startswith("-"):
+            continue  # --index-url, -c and other pip options
+
+        name = specifier = None
+        if packaging is not None and "://" not in spec.split("@")[0]:
+            try:
+                req = packaging.requirements.Requirement(spec)
+            except Exception:  # noqa: B902 - not PEP 508 (user/repo etc.)
+                req = None
+            if req is not None:
+                if req.marker is not None and not req.marker.evaluate():
+                    continue
+                name, specifier = req.name, req.specifier
+                spec = str(req).split(";")[0].strip()
+        elif ";" in spec and "://" not in spec:
+            spec = spec.split(";")[0].strip()
+
+        registry, source = LoadRegistry.parse_source(spec)
+        if name is None:
+            if "://" in spec:
+                path = spec.split("#")[0].split("@")[0]
+                name = re.sub(r"\.git$", "", path.rstrip("/")).rsplit("/", 1)[-1]
+            else:
+                name = spec.rstrip("/").rsplit("/", 1)[-1]
+            match = _NAME.match(name)
+            name = match.group(1) if match else name
+        requirements.append(
+            Requirement(line, source, name, registry, specifier, editable)
+        )
+    return requirements
+
+
+def group_requirements(requirements):
+    # type: (Iterable[Requirement]) -> Dict[str, List[Requirement]]
+    """Group requirements per registry, keeping their order."""
+    groups = {}  # type: Dict[str, List[Requirement]]
+    for req in requirements:
+        groups.setdefault(req.registry, []).append(req)
+    return groups
+
+
+def _installed_version(name):
+    # type: (str) -> Optional[str]
+    try:
+        from importlib import metadata
+    except ImportError:
+        return None
+    try:
+        return metadata.version(name)
+    except Exception:  # noqa: B902 - PackageNotFoundError and broken metadata
+        return None
+
+
+def is_satisfied(req):
+    # type: (Requirement) -> bool
+    """Whether an installed distribution already satisfies ``req``."""
+    if req.editable or req.registry in ("url", "github", "gitlab", "local"):
+        return False
+    version = _installed_version(req.name)
+    if version is None:
+        return False
+    return req.specifier is None or req.specifier.contains(version, prereleases=True)
+
+
+def install_group(registry, requirements, silent=False):
+    # type: (str, List[Requirement], bool) -> bool
+    """Install all ``requirements`` of one registry in a single pip run.
+
+    Editable requirements are passed to pip with ``-e``; a GitHub/GitLab
+    group containing one is installed by pip rather than from pooled
+    build environments.
+    """
+    from .buildenv import install_git_with_build_env
+    from .installer import run_install
+    from .offline import find_local, pip_args
+    from .registry import PRIVATE_REGISTRIES
+
+    specs = [req.spec for req in requirements]
+    editable = any(req.editable for req in requirements)
+    pip = [sys.executable, "-m", "pip", "install"]
+
+    if config.OFFLINE:
+        if registry in ("github", "gitlab") or (
+            registry == "url" and not all(s.startswith("file:") for s in specs)
+        ):
+            return False
+        missing = [
+            req.spec for req in requirements
+            if registry != "url" and not req.editable and find_local(
+                req.spec.split("/", 1)[-1] if registry in PRIVATE_REGISTRIES
+                else req.spec
+            ) is None
+        ]
+        if missing:
+            if not silent:
+                emit(
+                    "install", "❌ Not available offline: {0}",
+                    ", ".join(missing), level="warning",
+                )
+            return False
+
+    if registry == "github":
+        specs = [
+            "git+" + (s if s.startswith("https://") else "https://github.com/" + s)
+            for s in specs
+        ]
+        if not editable:
+            return install_git_with_build_env(specs, registry="github")
+    if registry == "gitlab":
+        specs = [
+            "git+" + (s if s.startswith("https://") else "https://gitlab.com/" + s)
+            for s in specs
+        ]
+        if not editable:
+            return install_git_with_build_env(specs, registry="gitlab")
+
+    if registry in PRIVATE_REGISTRIES:
+        specs = [s[len(registry) + 1:] if s.startswith(registry + "/") else s
+                 for s in specs]
+        conf = PRIVATE_REGISTRIES[registry]
+        if conf.get("index_url") and not config.OFFLINE:
+            pip = pip + ["--index-url", conf["index_url"]]
+
+    args = []  # type: List[str]
+    for req, spec in zip(requirements, specs):
+        args += ["-e", spec] if req.editable else [spec]
+    cmd = pip + pip_args() + args
+    if not silent:
+        emit(
+            "install", "📦 Installing {0} package(s) from {1}...",
+            len(specs), registry,
+        )
+    result = run_install(cmd, registry)
+    return result.returncode == 0
+
+
+def load_requirements(path_or_text, extras=(), install=True, silent=False):
+    # type: (str, Iterable[str], bool, bool) -> Dict[str, Any]
+    """Install and import every requirement of a requirements file.
+
+    Args:
+        path_or_text: requirements.txt / pyproject.toml path or contents
+        extras: pyproject optional-dependency groups to include
+        install: Install missing requirements (one pip run per registry)
+        silent: Suppress status output
+
+    Returns:
+        Dict mapping requirement names to the imported modules
+
+    Raises:
+        ImportError: If some requirements could not be installed or imported
+
+    Example:
+        >>> modules = load_requirements("requirements.txt")
+        >>> modules["requests"].get
+    """
+    requirements = parse_requirements(path_or_text, extras)
+
+    if install:
+        pending = [req for req in requirements if not is_satisfied(req)]
+        for registry, group in group_requirements(pending).items():
+            if not install_group(registry, group, silent) and not silent:
+                emit(
+                    "install", "❌ Installing from {0} failed",
+                    registry, level="warning",
+                )
+        importlib.invalidate_caches()
+
+    modules = {}
+    failed = []
+    for req in requirements:
+        module_name = import_name_for(req.name)
+        try:
+            module = importlib.import_module(module_name)
+        except ImportError:
+            failed.append(req.name)
+            continue
+        _module_cache[req.name] = module
+        modules[req.name] = module
+
+    if not silent:
+        emit(
+            "install", "✅ Loaded {0} of {1} requirement(s)",
+            len(modules), len(requirements),
+        )
+    if failed:
+        raise ImportError("Cannot load {0}".format(", ".join(failed)))
+    return modules
@@ -0,0 +1,126 @@
+# -*- coding: utf-8 -*-
+"""
+Runtime settings for Load
+
+All auto-print settings live in one :class:`Settings` object. Hot paths
+fetch it once with :func:`get_settings` and read plain attributes.
+``with load.settings(silent=True):`` overrides settings for the enclosed
+block only; overrides are kept in a context variable, so they are local to
+the current thread and asyncio task.
+"""
+
+import contextlib
+import threading
+
+from . import config
+
+try:
+    import contextvars
+except ImportError:  # Python < 3.7: thread-local only
+    contextvars = None  # type: ignore
+
+# Type hints for static type checkers (Python 2/3 compatible)
+if False:  # MYPY
+    from typing import Any, Iterator  # noqa: F401
+
+
+class Settings(object):
+    """Auto-print settings.
+
+    Attributes:
+        auto_print: Show loaded objects automatically
+        print_limit: Characters shown per preview
+        print_types: Types shown as plain values by the fallback formatter
+        print_sample: Elements read for array/DataFrame statistics
+        silent: Suppress auto-print and installer messages (errors are
+            still shown)
+    """
+
+    __slots__ = ("auto_print", "print_limit", "print_types", "print_sample", "silent")
+
+    def __init__(self, **values):
+        # type: (**Any) -> None
+        self.auto_print = config.AUTO_PRINT
+        self.print_limit = config.PRINT_LIMIT
+        self.print_types = config.PRINT_TYPES
+        self.print_sample = config.PRINT_SAMPLE
+        self.silent = False
+        self.update(**values)
+
+    def update(self, **values):
+        # type: (**Any) -> None
+        for name, value in values.items():
+            if name not in self.__slots__:
+                raise TypeError("Unknown setting: {0}".format(name))
+            setattr(self, name, value)
+
+    def replace(self, **values):
+        # type: (**Any) -> Settings
+        """A copy with ``values`` changed."""
+        copy = Settings.__new__(Settings)
+        for name in self.__slots__:
+            setattr(copy, name, getattr(self, name))
+        copy.update(**values)
+        return copy
+
+    def as_dict(self):
+        return dict((name, getattr(self, name)) for name in self.__slots__)
+
+    def __repr__(self):
+        return "Settings({0})".format(
+            ", ".join("{0}={1!r}".format(k, v) for k, v in self.as_dict().items())
+        )
+
+
+class _ThreadVar(object):
+    """Minimal ``ContextVar`` stand-in backed by a thread-local."""
+
+    def __init__(self, name, default):
+        self._default = default
+        self._local = threading.local()
+
+    def get(self):
+        return getattr(self._local, "value", self._default)
+
+    def set(self, value):
+        token = getattr(self._local, "value", self._default)
+        self._local.value = value
+        return token
+
+    def reset(self, token):
+        self._local.value = token
+
+
+_global = Settings()
+if contextvars is not None:
+    _current = contextvars.ContextVar("load_settings", default=_global)
+else:
+    _current = _ThreadVar("load_settings", _global)  # type: ignore
+
+
+def get_settings():
+    # type: () -> Settings
+    """The settings in effect here (global ones unless overridden)."""
+    return _current.get()
+
+
+def configure(**values):
+    # type: (**Any) -> Settings
+    """Change the global settings (not the ones of enclosing overrides)."""
+    _global.update(**values)
+    return _global
+
+
+@contextlib.contextmanager
+def settings(**values):
+    # type: (**Any) -> Iterator[Settings]
+    """Override settings for the enclosed block, in this thread/task only.
+
+        with load.settings(silent=True):
+            load("requests")
+    """
+    token = _current.set(_current.get().replace(**values))
+    try:
+        yield _current.get()
+    finally:
+        _current.reset(token)
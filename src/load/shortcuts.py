@@ -30,11 +30,10 @@ def load_json(install=True, force=False, silent=False):
 def load_yaml(install=True, force=False, silent=False):
     """Shortcut for loading PyYAML"""
     try:
-        import yaml
-        return yaml
+        return load("yaml", install=install, force=force, silent=silent)
     except ImportError:
         if install:
-            return load("pyyaml", install=install, force=force, silent=silent)
+            raise
         if not silent:
             print("PyYAML not found. Install with: pip install pyyaml")
         return None
@@ -65,26 +64,6 @@ def load_pathlib(install=True, force=False, silent=False):
             return None
 
 
-def load_pil(install=True, force=False, silent=False):
-    """Shortcut for loading PIL"""
-    try:
-        from PIL import Image  # Import Image to ensure it's available
-        return Image  # Return the Image module directly
-    except ImportError:
-        if install:
-            try:
-                # Try to install and import again
-                import PIL.Image
-                return PIL.Image
-            except ImportError:
-                if not silent:
-                    print("Pillow not found. Install with: pip install pillow")
-                return None
-        if not silent:
-            print("Pillow not found. Install with: pip install pillow")
-        return None
-
-
 def load_random(install=True, force=False, silent=False):
     """Shortcut for loading the random module"""
     try:
@@ -156,7 +135,10 @@ def load_cv2(install=True, force=False, silent=False):
 def load_pil(install=True, force=False, silent=False):
     """Shortcut for loading PIL"""
     try:
-        return load("PIL", alias="PIL", install=install, force=force, silent=silent)
+        pil = load("PIL", alias="PIL", install=install, force=force, silent=silent)
+        # The PIL package does not import its submodules by itself
+        __import__("PIL.Image")
+        return pil
     except ImportError:
         if not silent:
             print(
@@ -0,0 +1,97 @@
+# -*- coding: utf-8 -*-
+"""
+Per-application target directory installs
+
+Instead of the interpreter's global site-packages, Load can install into an
+app-scoped directory (``pip install --target``). The directory is prepended
+to ``sys.path`` once; switching to another directory drops the previous one
+from ``sys.path``, ``sys.modules`` and the Load module cache, so nothing keeps
+pointing at packages that are no longer visible.
+
+Enable it with ``LOAD_TARGET_DIR=/srv/app/.deps`` or :func:`set_target_dir`.
+"""
+
+import importlib
+import os
+import sys
+
+from . import config
+from .config import _module_cache
+
+# Type hints for static type checkers (Python 2/3 compatible)
+if False:  # MYPY
+    from typing import List, Optional  # noqa: F401
+
+
+def get_target_dir():
+    # type: () -> Optional[str]
+    """The active target directory, or None for site-packages installs."""
+    return config.TARGET_DIR
+
+
+def activate():
+    # type: () -> Optional[str]
+    """Create the target directory and put it first on ``sys.path`` (once)."""
+    path = config.TARGET_DIR
+    if not path:
+        return None
+    if not os.path.isdir(path):
+        os.makedirs(path)
+    if path not in sys.path:
+        sys.path.insert(0, path)
+        importlib.invalidate_caches()
+    return path
+
+
+def _within(filename, directory):
+    # type: (Optional[str], str) -> bool
+    if not filename:
+        return False
+    filename = os.path.abspath(filename)
+    return filename == directory or filename.startswith(directory + os.sep)
+
+
+def set_target_dir(path):
+    # type: (Optional[str]) -> None
+    """Install into ``path`` from now on (None: back to site-packages).
+
+    Modules imported from the previous target directory are evicted from
+    ``sys.modules`` and the Load cache, and the directory leaves
+    ``sys.path``.
+    """
+    old = config.TARGET_DIR
+    new = os.path.abspath(os.path.expanduser(path)) if path else None
+    config.TARGET_DIR = new
+
+    if old and old != new:
+        while old in sys.path:
+            sys.path.remove(old)
+        for key, module in list(_module_cache.items()):
+            if _within(getattr(module, "__file__", None), old):
+                del _module_cache[key]
+        for name, module in list(sys.modules.items()):
+            if _within(getattr(module, "__file__", None), old):
+                del sys.modules[name]
+        sys.path_importer_cache.pop(old, None)
+
+        from .installed import get_installed_index
+
+        get_installed_index().invalidate()
+
+    activate()
+
+
+def pip_args():
+    # type: () -> List[str]
+    """pip arguments that direct an install into the target directory."""
+    path = activate()
+    if not path:
+        return []
+    # --upgrade replaces an older copy already in the directory
+    return ["--target", path, "--upgrade"]
+
+
+# Honour LOAD_TARGET_DIR from the environment
+if config.TARGET_DIR:
+    config.TARGET_DIR = os.path.abspath(os.path.expanduser(config.TARGET_DIR))
+    activate()
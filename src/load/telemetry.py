@@ -0,0 +1,293 @@
+# -*- coding: utf-8 -*-
+"""
+Per-phase install telemetry for Load
+
+Every install is tracked as an :class:`InstallRecord`: wall time per phase
+(classify, index lookup, download, build, unpack, bytecode compile,
+post-install import), byte counts and the chosen artifact. pip's phases are
+recovered from the timestamps in its ``--log`` file. Records are kept in a
+short history exposed by ``load.info()["installs"]`` and are pushed to
+callbacks registered with :func:`add_install_listener`.
+"""
+
+import collections
+import contextlib
+import re
+import threading
+import time
+from datetime import datetime
+
+from .output import emit
+
+# Type hints for static type checkers (Python 2/3 compatible)
+if False:  # MYPY
+    from typing import Any, Callable, Dict, Iterator, List, Optional  # noqa: F401
+
+PHASES = ("classify", "index", "download", "build", "unpack", "compile", "import")
+HISTORY_SIZE = 50
+
+_history = collections.deque(maxlen=HISTORY_SIZE)  # type: Any
+_listeners = []  # type: List[Callable[[Dict[str, Any]], None]]
+_lock = threading.Lock()
+_local = threading.local()
+
+# pip log line -> phase; matched against the message without indentation
+_PIP_MARKERS = (
+    ("Successfully installed", None),
+    ("Installing collected packages", "unpack"),
+    ("Downloading ", "download"),
+    ("Using cached ", "download"),
+    ("File was already downloaded", "download"),
+    ("Installing build dependencies", "build"),
+    ("Getting requirements to build", "build"),
+    ("Preparing metadata", "build"),
+    ("Building wheel", "build"),
+    ("Running setup.py", "build"),
+    ("Collecting ", "index"),
+    ("Processing ", "index"),
+    ("Obtaining ", "index"),
+    ("Looking in indexes", "index"),
+)
+_LOG_LINE = re.compile(r"^(\d{4}-\d\d-\d\dT\d\d:\d\d:\d\d,\d{3}) (.*)$")
+_SIZE = re.compile(r"\((\d+(?:\.\d+)?) (bytes|kB|MB|GB)\)\s*$")
+_BUILT_SIZE = re.compile(r"^Created wheel for \S+: filename=\S+ size=(\d+)")
+_UNITS = {"bytes": 1, "kB": 1000, "MB": 1000 ** 2, "GB": 1000 ** 3}
+
+
+class InstallRecord(object):
+    """Timings and sizes of one install.
+
+    Attributes:
+        spec: What was installed
+        registry: Registry the install went through
+        phases: Seconds spent per phase (see :data:`PHASES`)
+        bytes: Byte counts (``downloaded``, ``cached``, ``built``)
+        artifact: URL or file name of the chosen artifact
+        success: Outcome, None while running
+        duration: Total wall time in seconds
+    """
+
+    def __init__(self, spec, registry=None):
+        # type: (str, Optional[str]) -> None
+        self.spec = spec
+        self.registry = registry
+        self.phases = collections.OrderedDict()  # type: Dict[str, float]
+        self.bytes = {}  # type: Dict[str, int]
+        self.artifact = None  # type: Optional[str]
+        self.success = None  # type: Optional[bool]
+        self.started = time.time()
+        self.duration = None  # type: Optional[float]
+
+    def add_phase(self, name, seconds):
+        # type: (str, float) -> None
+        self.phases[name] = self.phases.get(name, 0.0) + seconds
+
+    def add_bytes(self, kind, count):
+        # type: (str, int) -> None
+        self.bytes[kind] = self.bytes.get(kind, 0) + count
+
+    def as_dict(self):
+        # type: () -> Dict[str, Any]
+        return {
+            "spec": self.spec,
+            "registry": self.registry,
+            "phases": dict((k, round(v, 4)) for k, v in self.phases.items()),
+            "bytes": dict(self.bytes),
+            "artifact": self.artifact,
+            "success": self.success,
+            "started": self.started,
+            "duration": None if self.duration is None else round(self.duration, 4),
+        }
+
+    def __repr__(self):
+        return "InstallRecord({0!r}, success={1!r})".format(self.spec, self.success)
+
+
+def add_install_listener(callback):
+    # type: (Callable[[Dict[str, Any]], None]) -> Callable[[Dict[str, Any]], None]
+    """Call ``callback(event)`` for every install event.
+
+    Events are dicts with an ``event`` key: ``install_started``, ``phase``
+    (with ``phase`` and ``seconds``) and ``install_finished`` (with the
+    full ``record``). Returns ``callback``, so it works as a decorator.
+    """
+    with _lock:
+        _listeners.append(callback)
+    return callback
+
+
+def remove_install_listener(callback):
+    # type: (Callable[[Dict[str, Any]], None]) -> None
+    """Stop calling ``callback``."""
+    with _lock:
+        if callback in _listeners:
+            _listeners.remove(callback)
+
+
+def _emit(event, source, **fields):
+    # type: (str, InstallRecord, **Any) -> None
+    payload = {"event": event, "spec": source.spec, "registry": source.registry}
+    payload.update(fields)
+    for callback in list(_listeners):
+        try:
+            callback(payload)
+        except Exception as e:  # noqa: B902 - a listener must not break installs
+            emit("install", "❌ Install listener failed: {0}", e, level="error")
+
+
+def current():
+    # type: () -> Optional[InstallRecord]
+    """The install being tracked in this thread, if any."""
+    stack = getattr(_local, "stack", None)
+    return stack[-1] if stack else None
+
+
+def last():
+    # type: () -> Optional[InstallRecord]
+    """The most recently finished install of this thread."""
+    return getattr(_local, "last", None)
+
+
+@contextlib.contextmanager
+def track_install(spec, registry=None):
+    # type: (str, Optional[str]) -> Iterator[InstallRecord]
+    """Track an install; nested calls join the outer record."""
+    outer = current()
+    if outer is not None:
+        if registry and not outer.registry:
+            outer.registry = registry
+        yield outer
+        return
+
+    record = InstallRecord(spec, registry)
+    stack = _local.__dict__.setdefault("stack", [])
+    stack.append(record)
+    _emit("install_started", record)
+    try:
+        yield record
+    finally:
+        stack.pop()
+        record.duration = time.time() - record.started
+        if record.success is None:
+            record.success = False
+        _local.last = record
+        with _lock:
+            _history.append(record)
+        _emit("install_finished", record, record=record.as_dict())
+
+
+def add_phase(name, seconds, record=None):
+    # type: (str, float, Optional[InstallRecord]) -> None
+    """Add ``seconds`` to phase ``name`` of ``record`` (default: current)."""
+    record = record or current()
+    if record is None:
+        return
+    record.add_phase(name, seconds)
+    _emit("phase", record, phase=name, seconds=round(seconds, 4))
+
+
+@contextlib.contextmanager
+def phase(name, record=None):
+    # type: (str, Optional[InstallRecord]) -> Iterator[None]
+    """Time the enclosed block as phase ``name`` (no-op outside installs)."""
+    start = time.time()
+    try:
+        yield
+    finally:
+        add_phase(name, time.time() - start, record)
+
+
+def _timestamp(text):
+    # type: (str) -> float
+    moment = datetime.strptime(text, "%Y-%m-%dT%H:%M:%S,%f")
+    return time.mktime(moment.timetuple()) + moment.microsecond / 1e6
+
+
+def parse_pip_log(text):
+    # type: (str) -> Dict[str, Any]
+    """Phase timings and byte counts from a ``pip install --log`` file.
+
+    Each marker line starts a phase that lasts until the next marker.
+    pip byte-compiles while it unpacks, so both land in ``unpack``.
+    """
+    phases = collections.OrderedDict()  # type: Dict[str, float]
+    sizes = {}  # type: Dict[str, int]
+    artifact = None
+    active, since, last_seen = "startup", None, None
+
+    for line in text.splitlines():
+        match = _LOG_LINE.match(line)
+        if not match:
+            continue
+        stamp = _timestamp(match.group(1))
+        message = match.group(2).strip()
+        if since is None:
+            since = stamp
+        last_seen = stamp
+
+        marker = next((p for m, p in _PIP_MARKERS if message.startswith(m)), False)
+        if marker is not False and marker != active:
+            if active is not None:
+                phases[active] = phases.get(active, 0.0) + stamp - since
+            active, since = marker, stamp
+
+        size = _SIZE.search(message)
+        if message.startswith(("Downloading ", "Using cached ")):
+            kind = "downloaded" if message.startswith("Downloading ") else "cached"
+            if size:
+                count = int(float(size.group(1)) * _UNITS[size.group(2)])
+                sizes[kind] = sizes.get(kind, 0) + count
+            if artifact is None:
+                name = message[len("Downloading "):] if kind == "downloaded" \
+                    else message[len("Using cached "):]
+                artifact = _SIZE.sub("", name).strip()
+        built = _BUILT_SIZE.match(message)
+        if built:
+            sizes["built"] = sizes.get("built", 0) + int(built.group(1))
+
+    if active is not None and since is not None and last_seen is not None:
+        phases[active] = phases.get(active, 0.0) + last_seen - since
+    return {"phases": phases, "bytes": sizes, "artifact": artifact}
+
+
+def record_pip_log(path, record=None):
+    # type: (str, Optional[InstallRecord]) -> None
+    """Fold a pip log file into ``record`` (default: current)."""
+    record = record or current()
+    if record is None:
+        return
+    try:
+        with open(path) as f:
+            parsed = parse_pip_log(f.read())
+    except (IOError, OSError, ValueError):
+        return
+    for name, seconds in parsed["phases"].items():
+        add_phase(name, seconds, record)
+    for kind, count in parsed["bytes"].items():
+        record.add_bytes(kind, count)
+    if record.artifact is None:
+        record.artifact = parsed["artifact"]
+
+
+def history():
+    # type: () -> List[Dict[str, Any]]
+    """Finished installs, oldest first."""
+    with _lock:
+        return [record.as_dict() for record in _history]
+
+
+def stats():
+    # type: () -> Dict[str, Any]
+    """Summary for ``load.info()``: counts, phase totals and recent installs."""
+    with _lock:
+        records = list(_history)
+    totals = collections.OrderedDict()  # type: Dict[str, float]
+    for record in records:
+        for name, seconds in record.phases.items():
+            totals[name] = round(totals.get(name, 0.0) + seconds, 4)
+    return {
+        "count": len(records),
+        "failed": sum(1 for r in records if not r.success),
+        "phase_totals": totals,
+        "recent": [r.as_dict() for r in records[-5:]],
+    }
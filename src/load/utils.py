@@ -8,83 +8,71 @@ import importlib.util
 import importlib.machinery
 import importlib.abc
 import os
+import re
 import subprocess
 import sys
 
 # Import from config to avoid circular imports
-from .config import _module_cache, AUTO_PRINT, PRINT_LIMIT, PRINT_TYPES
+from . import config
+from .config import _module_cache
+from . import telemetry
+from .formatters import format_lines
+from .output import emit, enabled as output_enabled
+from .runtime import get_settings
+from .lockfile import record_module
+from .localfiles import load_dir, load_file, load_url
 
 
 def smart_print(obj, name=None):
-    """Intelligent result printing"""
-    if not AUTO_PRINT:
-        return
+    """Intelligent result printing
 
+    The lines come from the formatter registered for the object's type
+    (see :func:`load.formatters.register_formatter`).
+    """
+    current = get_settings()
+    if current.silent or not current.auto_print or not output_enabled("print"):
+        return  # nothing is formatted
+
+    obj_name = name or getattr(obj, "__name__", type(obj).__name__)
     try:
-        obj_name = name or getattr(obj, "__name__", type(obj).__name__)
+        lines = format_lines(obj, obj_name, current.print_limit)
+    except Exception:  # noqa: B902 - printing must never break a load
+        lines = [" {0}: loaded ({1})".format(obj_name or 'Object', type(obj).__name__)]
+    for line in lines:
+        emit("print", line, name=obj_name)
 
-        if hasattr(obj, "status_code"):  # HTTP Response
-            print(" {0}: {1} - {2}".format(obj_name, obj.status_code, obj.url))
-            if hasattr(obj, "json"):
-                try:
-                    data = obj.json()
-                    print(" JSON: {0}...".format(str(data)[:PRINT_LIMIT]))
-                except:
-                    print(" Text: {0}...".format(obj.text[:PRINT_LIMIT]))
-
-        elif hasattr(obj, "shape"):  # DataFrame/Array
-            print(" {0}: shape {1}".format(obj_name, obj.shape))
-            print(obj.head() if hasattr(obj, "head") else str(obj)[:PRINT_LIMIT])
-
-        elif hasattr(obj, "__len__") and len(obj) > 10:  # Long collections
-            print(" {0}: {1} items".format(obj_name, len(obj)))
-            print("First 5: {0}...".format(list(obj)[:5]))
-
-        elif isinstance(obj, PRINT_TYPES):  # Basic types
-            output = str(obj)
-            if len(output) > PRINT_LIMIT:
-                print(" {0}: {1}...".format(obj_name, output[:PRINT_LIMIT]))
-            else:
-                print(" {0}: {1}".format(obj_name, output))
-
-        elif hasattr(obj, "__dict__"):  # Objects
-            try:
-                # Try to get length if it's a collection
-                length = len(obj)
-                if (length > 0 and PRINT_TYPES and 
-                        not isinstance(obj, (str, bytes, bytearray))):
-                    print(" {0}: {1} (length: {2})".format(
-                        obj_name or 'Object', 
-                        type(obj).__name__, 
-                        length))
-                else:
-                    print(" {0}: {1}".format(obj_name or 'Object', type(obj).__name__))
-            except (TypeError, AttributeError):
-                # If we can't get length, just print type
-                print(" {0}: {1}".format(obj_name or 'Object', type(obj).__name__))
 
-        else:
-            print(" {0}: {1} loaded".format(obj_name, type(obj).__name__))
+def install_package(name):
+    """Install package using pip
 
-    except Exception as e:
-        print(" {0}: loaded ({1})".format(obj_name or 'Object', type(obj).__name__))
+    ``name`` may be an import name (``cv2`` installs ``opencv-python``).
+    Concurrent processes installing the same distribution take turns; the
+    ones that waited skip pip if the package became importable meanwhile.
+    """
+    from .locks import serialized_install
+    from .names import resolve_distribution
 
+    spec = resolve_distribution(name)
+    return serialized_install(spec, _install_package, spec)
+
+
+def _install_package(name):
+    if config.OFFLINE:
+        from .offline import install_offline
+
+        return install_offline(name)
 
-def install_package(name):
-    """Install package using pip"""
     try:
-        print("Installing {0} from pypi...".format(name))
-        # For Python 2.7 compatibility, use Popen instead of subprocess.run
-        process = subprocess.Popen(
-            [sys.executable, "-m", "pip", "install", name],
-            stdout=subprocess.PIPE,
-            stderr=subprocess.PIPE,
-        )
-        # Store but ignore stdout/stderr output
-        process.communicate()
-        return process.returncode == 0
+        emit("install", "Installing {0} from pypi...", name)
+        from .installer import run_install
+
+        # Output is discarded; the install report feeds the lockfile
+        result = run_install([sys.executable, "-m", "pip", "install", name])
+        return result.returncode == 0
     except (subprocess.SubprocessError, OSError) as e:
-        print("Error installing package {0}: {1}".format(name, str(e)), file=sys.stderr)
+        emit(
+            "install", "Error installing package {0}: {1}", name, str(e), level="error",
+        )
         return False
 
 
@@ -95,6 +83,7 @@ def load(
     install=True,
     force=False,
     silent=False,
+    reload=False,
 ):
     """
     Load module/package from various sources
@@ -103,37 +92,113 @@ def load(
         load("requests")                    # PyPI
         load("user/repo")                   # GitHub
         load("./my_module.py")              # Local file
+        load("./plugin.py", reload="auto")  # Local file, re-run if edited
         load("package", registry="company") # Private registry
+        load("package", registry="auto")    # First registry that has it
+        load("https://host/tool.py")        # Single file, run in memory
+
+    A ``.py`` URL is downloaded and executed in this process, so only
+    ``https://`` and ``file:`` URLs are accepted; ``http://`` raises
+    ImportError.
     """
     cache_key = alias or name
+    path = name.split("?")[0]
+    url = name.startswith(("http://", "https://", "file:")) and path.endswith(".py")
+    local = not url and (name.endswith(".py") or name.startswith(("./", "../")))
 
-    # Check cache (unless force)
-    if not force and cache_key in _module_cache:
+    # Check cache (unless force, or a file/URL module that may need a reload)
+    if not force and not ((local or url) and reload) and cache_key in _module_cache:
         cached_obj = _module_cache[cache_key]
         if not silent:
             smart_print(cached_obj, "{0} (cached)".format(cache_key))
         return cached_obj
 
+    # Single-file module from a URL: executed in memory
+    if url:
+        return _load_url_module(name, cache_key, silent, True if force else reload)
+
     # If local file
-    if name.endswith(".py") or name.startswith("./") or name.startswith("../"):
-        return _load_local_file(name, cache_key, silent)
+    if local:
+        return _load_local_file(name, cache_key, silent, True if force else reload)
 
     # Try to load as standard module
     try:
         module = importlib.import_module(name.replace("/", "."))
         _module_cache[cache_key] = module
+        record_module(module.__name__, registry)
         if not silent:
             smart_print(module, cache_key)
         return module
-    except ImportError:
-        pass
+    except ImportError as e:
+        import_error = e
+
+    # Installed but broken (missing dependency, ABI mismatch...): pip cannot
+    # help. Namespace packages and missing submodules on the requested path
+    # (google.cloud.storage next to protobuf's google) are installed instead.
+    if "/" not in name and ":" not in name:
+        from .installed import get_installed_index, is_regular_package
+
+        top = name.split(".")[0]
+        failed = getattr(import_error, "name", None) or ""
+        submodule = failed.startswith(top + ".") and (
+            name == failed or name.startswith(failed + ".")
+        )
+        dists = []  # type: list
+        if is_regular_package(top) and not submodule:
+            dists = get_installed_index().distributions(top)
+        if dists:
+            raise ImportError(
+                "Cannot load {0}: installed ({1}) but not importable: {2}".format(
+                    name, ", ".join(dists), import_error
+                )
+            )
 
     # Module not found - try to install
     if install:
-        if install_package(name):
+        registry = registry or config.DEFAULT_REGISTRY
+        if registry == "auto":
+            registry = None
+            if not config.OFFLINE:
+                from .failover import RegistriesUnavailable, find_registry
+
+                from .names import resolve_distribution
+
+                try:
+                    registry = find_registry(resolve_distribution(name))
+                except RegistriesUnavailable as e:
+                    # Not falling back to pip: a same-named public package
+                    # must not win because a private registry is down.
+                    raise ImportError("Cannot load {0}: {1}".format(name, e))
+                if registry is None:
+                    raise ImportError(
+                        "Cannot load {0}: not found in any registry".format(name)
+                    )
+
+        if registry and registry != "pypi":
+            from .registry import LoadRegistry
+            from .index import split_spec
+            from .installed import import_name_for
+
+            installed = LoadRegistry.install_from_pypi(name, registry)
+            record = telemetry.last()
+            bare = name.split("/")[-1]
+            if not re.match(r"^[A-Za-z_][A-Za-z0-9_.]*$", bare):
+                bare = import_name_for(split_spec(bare)[0])
+            name = bare
+        else:
+            # Coalesced with other missing packages requested meanwhile
+            from .installqueue import get_install_queue
+
+            pending = get_install_queue().submit(name)
+            installed = pending.wait()
+            record = pending.record
+
+        if installed:
             try:
-                module = importlib.import_module(name)
+                with telemetry.phase("import", record):
+                    module = importlib.import_module(name)
                 _module_cache[cache_key] = module
+                record_module(module.__name__, registry)
                 if not silent:
                     smart_print(module, "{0} (installed)".format(cache_key))
                 return module
@@ -146,6 +211,8 @@ def load(
 def import_aliases(*names):
     """Import multiple modules and return them as a tuple.
 
+    Missing packages are installed first, together in one pip run.
+
     Args:
         *names: Module names to import. Can include aliases using 'alias=module_name' syntax.
 
@@ -159,6 +226,11 @@ def import_aliases(*names):
         # Import with aliases
         plt, sns = import_aliases('plt=matplotlib.pyplot', 'sns=seaborn')
     """
+    from .installqueue import prefetch
+
+    # Install whatever is missing in one batch
+    prefetch(*names)
+
     result = []
     for name in names:
         if "=" in name:
@@ -178,26 +250,54 @@ def import_aliases(*names):
     return tuple(result) if len(result) > 1 else result[0] if result else None
 
 
-def _load_local_file(file_path, cache_key, silent=False):
+def local_dir(path, pattern="*.py", reload=False, silent=False, workers=None):
+    """
+    Load every plugin file in a directory
+
+    Files are read and compiled in parallel, then executed in sorted
+    order. Returns ``{name: module}``.
+
+    Examples:
+        plugins = local_dir("./plugins")
+        plugins = local_dir("./plugins", "**/*_plugin.py", reload="auto")
+    """
+    modules = load_dir(path, pattern, reload, workers)
+    if not silent:
+        smart_print(modules, path)
+    return modules
+
+
+def _load_local_file(file_path, cache_key, silent=False, reload=False):
     """Load local Python file"""
     if not os.path.exists(file_path):
         raise ImportError("File {0} does not exist".format(file_path))
+    if reload not in (False, True, "auto"):
+        raise ValueError(
+            "reload must be False, True or 'auto', not {0!r}".format(reload)
+        )
 
     try:
-        module_name = os.path.splitext(os.path.basename(file_path))[0]
-        
-        # Use importlib to load the module
-        spec = importlib.util.spec_from_file_location(module_name, file_path)
-        if spec is None:
-            raise ImportError("Could not load spec for {0}".format(file_path))
-            
-        module = importlib.util.module_from_spec(spec)
-        sys.modules[module_name] = module
-        spec.loader.exec_module(module)
-        
+        module = load_file(file_path, reload)
         _module_cache[cache_key] = module
         if not silent:
             smart_print(module, cache_key)
         return module
     except Exception as e:
         raise ImportError("Cannot load {0}: {1}".format(file_path, str(e)))
+
+
+def _load_url_module(url, cache_key, silent=False, reload=False):
+    """Load a single-file module from a URL"""
+    if reload not in (False, True, "auto"):
+        raise ValueError(
+            "reload must be False, True or 'auto', not {0!r}".format(reload)
+        )
+
+    try:
+        module = load_url(url, reload)
+        _module_cache[cache_key] = module
+        if not silent:
+            smart_print(module, cache_key)
+        return module
+    except Exception as e:
+        raise ImportError("Cannot load {0}: {1}".format(url, str(e)))
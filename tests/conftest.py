@@ -0,0 +1,24 @@
+"""
+Shared test fixtures
+"""
+
+import os
+import sys
+
+# Add src to path
+src_dir = os.path.abspath(
+    os.path.join(os.path.dirname(__file__), '..', 'src')
+)
+sys.path.insert(0, src_dir)
+
+import pytest  # noqa: E402
+
+from load import config  # noqa: E402
+
+
+@pytest.fixture(autouse=True)
+def cache_dir(tmp_path, monkeypatch):
+    """Keep index pages, install locks and code objects out of ~/.cache/load"""
+    path = str(tmp_path / "load-cache")
+    monkeypatch.setattr(config, "CACHE_DIR", path)
+    return path
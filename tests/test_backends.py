@@ -0,0 +1,232 @@
+"""
+Tests for installer backends
+"""
+
+import base64
+import hashlib
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import zipfile
+
+# Add src to path
+src_dir = os.path.abspath(
+    os.path.join(os.path.dirname(__file__), '..', 'src')
+)
+sys.path.insert(0, src_dir)
+
+import pytest  # noqa: E402
+
+from load import backends, config  # noqa: E402
+from load.backends import (  # noqa: E402
+    WheelBackend,
+    get_backend,
+    register_backend,
+    set_backend,
+    split_pip_install,
+)
+from load.installer import run_install  # noqa: E402
+
+
+def make_wheel(directory, name="loadbenchpkg", version="1.0", requires=(),
+               entry_points=None):
+    """Build a minimal pure-Python wheel and return its path."""
+    dist_info = "{0}-{1}.dist-info".format(name, version)
+    files = {
+        "{0}/__init__.py".format(name): "VALUE = {0!r}\n\n\n"
+        "def main():\n    print(VALUE)\n".format(version),
+        "{0}/METADATA".format(dist_info): "Metadata-Version: 2.1\nName: {0}\n"
+        "Version: {1}\n{2}".format(
+            name, version, "".join("Requires-Dist: {0}\n".format(r) for r in requires)
+        ),
+        "{0}/WHEEL".format(dist_info): "Wheel-Version: 1.0\nGenerator: test\n"
+        "Root-Is-Purelib: true\nTag: py3-none-any\n",
+        "{0}-{1}.data/scripts/{0}-run".format(name, version): "#!python\nprint(1)\n",
+    }
+    if entry_points:
+        files["{0}/entry_points.txt".format(dist_info)] = entry_points
+    record = []
+    for path, text in files.items():
+        digest = hashlib.sha256(text.encode()).digest()
+        encoded = base64.urlsafe_b64encode(digest).rstrip(b"=").decode()
+        record.append("{0},sha256={1},{2}".format(path, encoded, len(text)))
+    record.append("{0}/RECORD,,".format(dist_info))
+    files["{0}/RECORD".format(dist_info)] = "\n".join(record) + "\n"
+
+    path = os.path.join(directory, "{0}-{1}-py3-none-any.whl".format(name, version))
+    with zipfile.ZipFile(path, "w") as archive:
+        for member, text in files.items():
+            archive.writestr(member, text)
+    return path
+
+
+class TestBackends:
+    def setup_method(self):
+        self.root = tempfile.mkdtemp()
+        self.target = os.path.join(self.root, "target")
+        self.saved = config.INSTALLER_BACKEND
+
+        self.calls = []
+
+        def mock_run(cmd, *args, **kwargs):
+            self.calls.append(cmd)
+            return type("MockResult", (object,), {"returncode": 0})()
+
+        self.original_run = subprocess.run
+        subprocess.run = mock_run
+
+    def teardown_method(self):
+        subprocess.run = self.original_run
+        config.INSTALLER_BACKEND = self.saved
+        backends._BACKENDS.pop("custom", None)
+        backends._instances.pop("custom", None)
+        shutil.rmtree(self.root, ignore_errors=True)
+        sys.path[:] = [p for p in sys.path if p != self.target]
+        sys.modules.pop("loadbenchpkg", None)
+
+    def test_split_pip_install(self):
+        prefix, options, specs = split_pip_install(
+            ["python", "-m", "pip", "install", "--log", "x.log", "--no-deps",
+             "--progress-bar=off", "requests>=2"]
+        )
+        assert prefix == ["python", "-m", "pip", "install"]
+        assert options == [("--log", "x.log"), ("--no-deps", None),
+                           ("--progress-bar", "off")]
+        assert specs == ["requests>=2"]
+
+    def test_default_backend_is_pip(self):
+        config.INSTALLER_BACKEND = "pip"
+        run_install([sys.executable, "-m", "pip", "install", "requests"])
+        assert self.calls[0][-1] == "requests"
+        assert "--disable-pip-version-check" not in self.calls[0]
+
+    def test_tuned_backend_adds_flags(self):
+        set_backend("pip-tuned")
+        run_install([sys.executable, "-m", "pip", "install", "requests"])
+        cmd = self.calls[0]
+        assert "--disable-pip-version-check" in cmd
+        assert cmd[cmd.index("--progress-bar") + 1] == "off"
+        assert cmd[-1] == "requests"
+
+    def test_unknown_backend(self):
+        with pytest.raises(ValueError):
+            set_backend("nope")
+
+    def test_register_backend(self):
+        seen = []
+
+        class Custom(backends.InstallerBackend):
+            name = "custom"
+
+            def run(self, cmd, env=None):
+                seen.append(cmd)
+                return backends.InstallResult(cmd, 0)
+
+        register_backend("custom", Custom)
+        set_backend("custom")
+        run_install([sys.executable, "-m", "pip", "install", "requests"])
+        assert seen and not self.calls
+
+    def test_wheel_backend_installs_in_process(self):
+        wheel = make_wheel(self.root)
+        report = os.path.join(self.root, "report.json")
+        result = WheelBackend().run(
+            [sys.executable, "-m", "pip", "install", "--target", self.target,
+             "--report", report, "--no-deps", wheel]
+        )
+        assert result.returncode == 0
+        assert not self.calls  # no subprocess
+
+        assert os.path.isfile(os.path.join(self.target, "loadbenchpkg", "__init__.py"))
+        assert os.access(os.path.join(self.target, "bin", "loadbenchpkg-run"), os.X_OK)
+        info = os.path.join(self.target, "loadbenchpkg-1.0.dist-info")
+        with open(os.path.join(info, "RECORD")) as f:
+            assert "loadbenchpkg/__init__.py,sha256=" in f.read()
+        with open(report) as f:
+            item = json.load(f)["install"][0]
+        assert item["metadata"] == {"name": "loadbenchpkg", "version": "1.0"}
+        assert item["download_info"]["url"].endswith(".whl")
+
+        sys.path.insert(0, self.target)
+        import loadbenchpkg
+
+        assert loadbenchpkg.VALUE == "1.0"
+
+    def test_wheel_backend_writes_entry_points(self):
+        wheel = make_wheel(
+            self.root,
+            entry_points="[console_scripts]\nloadbench-CLI = loadbenchpkg:main\n"
+            "[gui_scripts]\nloadbench-gui = loadbenchpkg:main [gui]\n",
+        )
+        result = WheelBackend().run(
+            [sys.executable, "-m", "pip", "install", "--target", self.target,
+             "--no-deps", wheel]
+        )
+        assert result.returncode == 0
+        script = os.path.join(self.target, "bin", "loadbench-CLI")
+        assert os.access(script, os.X_OK)
+        assert os.access(os.path.join(self.target, "bin", "loadbench-gui"), os.X_OK)
+        env = dict(os.environ, PYTHONPATH=self.target)
+        ran = self.original_run([script], capture_output=True, text=True, env=env)
+        assert (ran.returncode, ran.stdout) == (0, "1.0\n")
+
+        info = os.path.join(self.target, "loadbenchpkg-1.0.dist-info")
+        with open(os.path.join(info, "RECORD")) as f:
+            record = f.read()
+        assert "bin/loadbench-CLI,sha256=" in record
+        assert "direct_url.json" in record
+        with open(os.path.join(info, "direct_url.json")) as f:
+            direct = json.load(f)
+        assert direct["url"] == "file://" + wheel
+        assert direct["archive_info"]["hash"].startswith("sha256=")
+
+    def test_wheel_backend_rejects_bad_hash(self):
+        wheel = make_wheel(self.root)
+        with zipfile.ZipFile(wheel) as archive:
+            members = [(m, archive.read(m)) for m in archive.namelist()]
+        with zipfile.ZipFile(wheel, "w") as archive:
+            for member, data in members:
+                if member == "loadbenchpkg/__init__.py":
+                    data = b"VALUE = 'tampered'\n"
+                archive.writestr(member, data)
+        result = WheelBackend().run(
+            [sys.executable, "-m", "pip", "install", "--target", self.target,
+             "--no-deps", wheel]
+        )
+        assert result.returncode == 1
+        assert "Hash mismatch" in result.stderr
+
+    def test_wheel_backend_falls_back(self):
+        backend = WheelBackend()
+        backend.run([sys.executable, "-m", "pip", "install", "requests"])
+        wheel = make_wheel(self.root, requires=["surely-not-installed-dist"])
+        backend.run([sys.executable, "-m", "pip", "install", "--target",
+                     self.target, wheel])
+        assert len(self.calls) == 2
+        assert not os.path.isdir(self.target)
+
+    def test_wheel_backend_falls_back_on_malformed_requirement(self):
+        wheel = make_wheel(self.root, requires=["not a valid requirement!!"])
+        backend = WheelBackend()
+        result = backend.run([sys.executable, "-m", "pip", "install", "--target",
+                              self.target, wheel])
+        assert result.returncode == 0
+        assert len(self.calls) == 1
+        assert not os.path.isdir(self.target)
+
+    def test_uv_backend_translates_command(self, monkeypatch):
+        monkeypatch.setattr(backends.UvBackend, "executable",
+                            staticmethod(lambda: "/usr/bin/uv"))
+        get_backend("uv").run(
+            [sys.executable, "-m", "pip", "install", "--report", "r.json",
+             "--log", "x.log", "--no-deps", "requests"]
+        )
+        assert self.calls[0] == ["/usr/bin/uv", "pip", "install", "--python",
+                                 sys.executable, "--no-deps", "requests"]
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
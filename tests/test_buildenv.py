@@ -0,0 +1,172 @@
+"""
+Tests for reusable build environments
+"""
+
+import json
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+# Add src to path
+src_dir = os.path.abspath(
+    os.path.join(os.path.dirname(__file__), '..', 'src')
+)
+sys.path.insert(0, src_dir)
+
+import pytest  # noqa: E402
+
+from load import buildenv  # noqa: E402
+from load.buildenv import BuildEnvPool, read_build_requires  # noqa: E402
+
+
+def _fake_env(root, name, created, used=None):
+    """Create a ready-looking environment directory"""
+    path = os.path.join(root, name)
+    os.makedirs(os.path.join(path, "setuptools-69.0.0.dist-info"))
+    with open(os.path.join(path, "load-build-env.json"), "w") as f:
+        json.dump({"requires": ["setuptools"], "created": created}, f)
+    if used is not None:
+        os.utime(path, (used, used))
+    return path
+
+
+class TestBuildEnvPool:
+    def setup_method(self):
+        self.root = tempfile.mkdtemp()
+        self.calls = []
+
+        def mock_run(cmd, *args, **kwargs):
+            self.calls.append(cmd)
+            if "--target" in cmd:
+                target = cmd[cmd.index("--target") + 1]
+                os.makedirs(os.path.join(target, "wheel-0.42.0.dist-info"))
+            return type("MockResult", (object,), {"returncode": 0})()
+
+        self.original_run = buildenv.subprocess.run
+        buildenv.subprocess.run = mock_run
+
+    def teardown_method(self):
+        buildenv.subprocess.run = self.original_run
+        shutil.rmtree(self.root, ignore_errors=True)
+
+    def test_key_ignores_order_and_whitespace(self):
+        """Test that equivalent requirement lists share a key"""
+        assert BuildEnvPool.key(["wheel", "setuptools >= 40"]) == BuildEnvPool.key(
+            ["setuptools>=40", "Wheel"]
+        )
+        assert BuildEnvPool.key(["hatchling"]) != BuildEnvPool.key(["setuptools"])
+
+    def test_acquire_reuses_environment(self):
+        """Test that a second build with the same requirements skips pip"""
+        pool = BuildEnvPool(root=self.root)
+        first = pool.acquire(["setuptools", "wheel"])
+        second = pool.acquire(["wheel", "setuptools"])
+
+        assert first is not None
+        assert first == second
+        assert len(self.calls) == 1
+
+    def test_acquire_rejects_empty_environment(self):
+        """Test that an environment without distributions is not used"""
+        buildenv.subprocess.run = lambda cmd, *a, **kw: type(
+            "MockResult", (object,), {"returncode": 0}
+        )()
+        pool = BuildEnvPool(root=self.root)
+        assert pool.acquire(["setuptools"]) is None
+        assert os.listdir(self.root) == []
+
+    def test_evict_by_age_and_size(self):
+        """Test eviction of expired and least recently used environments"""
+        now = time.time()
+        pool = BuildEnvPool(root=self.root, max_size=2, max_age=3600)
+        _fake_env(self.root, "expired", now - 7200)
+        _fake_env(self.root, "oldest", now, used=now - 300)
+        _fake_env(self.root, "newer", now, used=now - 200)
+        _fake_env(self.root, "newest", now, used=now - 100)
+
+        assert pool.evict() == 2
+        assert sorted(os.listdir(self.root)) == ["newer", "newest"]
+
+    def test_read_build_requires(self):
+        """Test reading [build-system] requires"""
+        assert read_build_requires(self.root) == ["setuptools>=40.8.0", "wheel"]
+
+        with open(os.path.join(self.root, "pyproject.toml"), "w") as f:
+            f.write('[build-system]\nrequires = ["hatchling>=1.18"]\n')
+        assert read_build_requires(self.root) == ["hatchling>=1.18"]
+
+
+class TestGitSources:
+    def setup_method(self):
+        self.root = tempfile.mkdtemp()
+        self.saved = buildenv.config.CACHE_DIR, buildenv.subprocess.run
+        buildenv.config.CACHE_DIR = self.root
+        self.calls = []
+        self.backends = {"https://github.com/user/hatch-tool": "hatchling",
+                         "https://github.com/user/flit-tool": "flit_core",
+                         "https://github.com/user/other-hatch": "hatchling"}
+
+        def mock_run(cmd, *args, **kwargs):
+            self.calls.append(cmd)
+            if cmd[:2] == ["git", "clone"]:
+                dest = cmd[-1]
+                os.makedirs(dest)
+                with open(os.path.join(dest, "pyproject.toml"), "w") as f:
+                    f.write('[build-system]\nrequires = ["{0}"]\n'.format(
+                        self.backends[cmd[-2]]
+                    ))
+            elif "--target" in cmd:
+                target = cmd[cmd.index("--target") + 1]
+                os.makedirs(os.path.join(target, "x-1.0.dist-info"))
+            elif "wheel" in cmd:
+                wheel_dir = cmd[cmd.index("--wheel-dir") + 1]
+                for i, _ in enumerate(cmd[cmd.index("--wheel-dir") + 2:]):
+                    name = "w{0}-1.0-py3-none-any.whl".format(i)
+                    open(os.path.join(wheel_dir, name), "w").close()
+            return type("MockResult", (object,), {"returncode": 0})()
+
+        buildenv.subprocess.run = mock_run
+
+    def teardown_method(self):
+        buildenv.config.CACHE_DIR, buildenv.subprocess.run = self.saved
+        shutil.rmtree(self.root, ignore_errors=True)
+
+    def test_build_env_matches_project_backend(self):
+        import subprocess
+
+        original_run = subprocess.run
+        subprocess.run = buildenv.subprocess.run
+        try:
+            assert buildenv.install_git_with_build_env([
+                "git+https://github.com/user/hatch-tool@v1.0",
+                "git+https://github.com/user/flit-tool#egg=flit-tool",
+                "git+https://github.com/user/other-hatch",
+            ], registry="github")
+        finally:
+            subprocess.run = original_run
+
+        clones = [c for c in self.calls if c[:2] == ["git", "clone"]]
+        assert len(clones) == 3
+        assert clones[0][-4:-2] == ["--branch", "v1.0"]
+        targets = [c[-1] for c in self.calls if "--target" in c]
+        assert targets == ["hatchling", "flit_core"]
+        builds = [c for c in self.calls if "wheel" in c and "--no-build-isolation" in c]
+        assert len(builds) == 2  # the two hatchling projects share a run
+        assert not any(arg.startswith("git+") for c in builds for arg in c)
+        assert len(builds[0]) - builds[0].index("--wheel-dir") - 2 == 2
+
+    def test_failed_clone_leaves_source_to_pip(self):
+        def failing_run(cmd, *args, **kwargs):
+            self.calls.append(cmd)
+            returncode = 128 if cmd[0] == "git" else 0
+            return type("MockResult", (object,), {"returncode": returncode})()
+
+        buildenv.subprocess.run = failing_run
+        source = "git+https://github.com/user/hatch-tool"
+        assert buildenv.checkout(source, self.root + "/x") is None
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,76 @@
+"""
+Tests for the content-addressed code cache
+"""
+
+import os
+import sys
+
+# Add src to path
+src_dir = os.path.abspath(
+    os.path.join(os.path.dirname(__file__), '..', 'src')
+)
+sys.path.insert(0, src_dir)
+
+import pytest  # noqa: E402
+
+from load import codecache, config  # noqa: E402
+
+
+class TestCodeCache:
+    def setup_method(self):
+        self.saved = config.CODE_CACHE
+        config.CODE_CACHE = True  # CACHE_DIR is a temporary directory (conftest)
+
+    def teardown_method(self):
+        config.CODE_CACHE = self.saved
+
+    def run(self, code):
+        namespace = {}
+        exec(code, namespace)
+        return namespace
+
+    def test_second_compile_is_a_hit(self):
+        source = b"X = 6 * 7\n"
+        before = codecache.stats()
+        first = codecache.get_code(source, "/plugins/x.py")
+        second = codecache.get_code(source, "/plugins/x.py")
+        after = codecache.stats()
+        assert after["misses"] - before["misses"] == 1
+        assert after["hits"] - before["hits"] == 1
+        assert self.run(second)["X"] == 42
+        assert second.co_filename == first.co_filename == "/plugins/x.py"
+
+    def test_key_depends_on_source_name_and_magic(self):
+        key = codecache.code_key("ab" * 32, "/a.py")
+        assert key != codecache.code_key("cd" * 32, "/a.py")
+        assert key != codecache.code_key("ab" * 32, "/b.py")
+        saved = codecache.MAGIC
+        codecache.MAGIC = b"\x00\x00\r\n"
+        try:
+            assert key != codecache.code_key("ab" * 32, "/a.py")
+        finally:
+            codecache.MAGIC = saved
+
+    def test_corrupt_entry_is_recompiled(self):
+        source = b"Y = 1\n"
+        codecache.get_code(source, "/y.py")
+        digest = codecache.hashlib.sha256(source).hexdigest()
+        path = codecache._entry(codecache.code_key(digest, "/y.py"))
+        with open(path, "wb") as f:
+            f.write(codecache.MAGIC + b"garbage")
+        assert self.run(codecache.get_code(source, "/y.py"))["Y"] == 1
+        assert self.run(codecache.get_code(source, "/y.py"))["Y"] == 1
+
+    def test_disabled(self):
+        config.CODE_CACHE = False
+        codecache.get_code(b"Z = 1\n", "/z.py")
+        assert not os.path.exists(codecache.cache_dir())
+
+    def test_clear(self):
+        codecache.get_code(b"W = 1\n", "/w.py")
+        assert codecache.clear() == 1
+        assert codecache.clear() == 0
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,170 @@
+"""
+Tests for concurrent registry resolution and circuit breakers
+"""
+
+import os
+import sys
+import time
+
+# Add src to path
+src_dir = os.path.abspath(
+    os.path.join(os.path.dirname(__file__), '..', 'src')
+)
+sys.path.insert(0, src_dir)
+
+import pytest  # noqa: E402
+
+from load import config, failover  # noqa: E402
+from load.failover import (  # noqa: E402
+    CircuitBreaker,
+    RegistriesUnavailable,
+    find_registry,
+)
+from load.utils import load  # noqa: E402
+
+
+class FakeIndex(object):
+    def __init__(self, answer, delay=0.0):
+        self.answer = answer
+        self.delay = delay
+        self.calls = 0
+
+    def find_file(self, spec):
+        self.calls += 1
+        time.sleep(self.delay)
+        if isinstance(self.answer, Exception):
+            raise self.answer
+        return self.answer
+
+
+class TestFindRegistry:
+    def setup_method(self):
+        self.indexes = {}
+        self.original_get_index = failover.get_index
+        self.original_registry_indexes = failover.registry_indexes
+        failover.get_index = lambda url: self.indexes[url]
+        failover.registry_indexes = lambda: [
+            (name, name) for name in ("mirror", "company", "pypi")
+        ]
+        failover._breakers.clear()
+
+    def teardown_method(self):
+        failover.get_index = self.original_get_index
+        failover.registry_indexes = self.original_registry_indexes
+        failover._breakers.clear()
+
+    def test_priority_order(self):
+        """Test that the highest-priority positive answer wins"""
+        self.indexes["mirror"] = FakeIndex(None, delay=0.05)
+        self.indexes["company"] = FakeIndex({"filename": "x"}, delay=0.1)
+        self.indexes["pypi"] = FakeIndex({"filename": "x"})
+        assert find_registry("pkg", timeout=1) == "company"
+
+    def test_missing_everywhere(self):
+        """Test that None is returned when nobody has the spec"""
+        for name in ("mirror", "company", "pypi"):
+            self.indexes[name] = FakeIndex(None)
+        assert find_registry("pkg", timeout=1) is None
+
+    def test_slow_registry_does_not_stall(self):
+        """Test that a slow mirror fails fast after the timeout and is marked down"""
+        self.indexes["mirror"] = FakeIndex({"filename": "x"}, delay=0.3)
+        self.indexes["company"] = FakeIndex(None)
+        self.indexes["pypi"] = FakeIndex({"filename": "x"})
+
+        threshold = config.REGISTRY_FAILURE_THRESHOLD
+        for _ in range(threshold):
+            start = time.time()
+            with pytest.raises(RegistriesUnavailable) as exc:
+                find_registry("pkg", timeout=0.1)
+            assert exc.value.registries == ["mirror"]
+            assert time.time() - start < 0.25
+        time.sleep(0.3)  # let the slow answers arrive and be recorded
+
+        assert failover.registry_health()["mirror"] == "open"
+        calls = self.indexes["mirror"].calls
+        with pytest.raises(RegistriesUnavailable):
+            find_registry("pkg", timeout=0.1)
+        assert self.indexes["mirror"].calls == calls
+
+    def test_failing_registry_opens_breaker(self):
+        """Test that errors count against the registry"""
+        self.indexes["mirror"] = FakeIndex({"filename": "x"})
+        self.indexes["company"] = FakeIndex(None)
+        self.indexes["pypi"] = FakeIndex(IOError("down"))
+        for _ in range(config.REGISTRY_FAILURE_THRESHOLD):
+            assert find_registry("pkg", timeout=1) == "mirror"
+        time.sleep(0.05)  # the lower-ranked query finishes in the background
+        assert failover.registry_health()["pypi"] == "open"
+
+    def test_private_down_does_not_fall_back_to_public(self):
+        """Test that pypi never wins over a private registry without an answer"""
+        self.indexes["mirror"] = FakeIndex(None)
+        self.indexes["company"] = FakeIndex(IOError("down"))
+        self.indexes["pypi"] = FakeIndex({"filename": "x"})
+        with pytest.raises(RegistriesUnavailable) as exc:
+            find_registry("internal-pkg", timeout=1)
+        assert exc.value.registries == ["company"]
+
+        self.indexes["company"] = FakeIndex({"filename": "x"}, delay=0.3)
+        with pytest.raises(RegistriesUnavailable) as exc:
+            find_registry("internal-pkg", timeout=0.1)
+        assert exc.value.registries == ["company"]
+
+    def test_no_answer_is_not_missing(self):
+        """Test that unreachable registries are reported, not taken as missing"""
+        self.indexes["mirror"] = FakeIndex(IOError("down"))
+        self.indexes["company"] = FakeIndex(None, delay=0.3)
+        self.indexes["pypi"] = FakeIndex(None)
+        with pytest.raises(RegistriesUnavailable) as exc:
+            find_registry("pkg", timeout=0.1)
+        assert exc.value.registries == ["mirror", "company"]
+
+    def test_open_breaker_is_reported(self):
+        """Test that registries skipped by their breaker count as unanswered"""
+        for name in ("mirror", "company", "pypi"):
+            self.indexes[name] = FakeIndex(IOError("down"))
+        for _ in range(config.REGISTRY_FAILURE_THRESHOLD):
+            with pytest.raises(RegistriesUnavailable):
+                find_registry("pkg", timeout=1)
+        with pytest.raises(RegistriesUnavailable) as exc:
+            find_registry("pkg", timeout=1)
+        assert exc.value.registries == ["mirror", "company", "pypi"]
+        assert all(index.calls == config.REGISTRY_FAILURE_THRESHOLD
+                   for index in self.indexes.values())
+
+    def test_load_names_unhealthy_registries(self):
+        """Test that load(registry="auto") fails instead of installing blindly"""
+        self.indexes["mirror"] = FakeIndex(IOError("down"))
+        self.indexes["company"] = FakeIndex(None)
+        self.indexes["pypi"] = FakeIndex(None)
+        offline = config.OFFLINE
+        config.OFFLINE = False
+        try:
+            with pytest.raises(ImportError) as exc:
+                load("surely_missing_pkg_xyz", registry="auto", silent=True)
+        finally:
+            config.OFFLINE = offline
+        assert "mirror" in str(exc.value)
+        assert "company" not in str(exc.value)
+
+
+class TestCircuitBreaker:
+    def test_half_open_trial(self):
+        """Test the closed -> open -> half-open -> closed cycle"""
+        breaker = CircuitBreaker(failure_threshold=2, reset_timeout=0.05)
+        breaker.record_failure()
+        assert breaker.allow()
+        breaker.record_failure()
+        assert breaker.state == "open"
+        assert not breaker.allow()
+
+        time.sleep(0.06)
+        assert breaker.allow()  # single trial call
+        assert not breaker.allow()
+        breaker.record_success()
+        assert breaker.state == "closed"
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
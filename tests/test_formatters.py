@@ -0,0 +1,123 @@
+"""
+Tests for type-dispatched auto-print formatters
+"""
+
+import os
+import sys
+import types
+
+# Add src to path
+src_dir = os.path.abspath(
+    os.path.join(os.path.dirname(__file__), '..', 'src')
+)
+sys.path.insert(0, src_dir)
+
+import pytest  # noqa: E402
+
+import load  # noqa: E402
+from load import formatters  # noqa: E402
+from load.formatters import format_lines, get_formatter  # noqa: E402
+
+
+class Table(object):
+    def __init__(self, rows):
+        self.rows = rows
+
+
+class BigTable(Table):
+    pass
+
+
+class TestFormatters:
+    def teardown_method(self):
+        formatters._unregister(Table)
+        formatters._unregister(__name__ + ".Table")
+
+    def test_module_is_not_probed(self):
+        probed = []
+        module = types.ModuleType("lazy_demo")
+
+        def __getattr__(attr):
+            probed.append(attr)
+            raise AttributeError(attr)
+
+        module.__getattr__ = __getattr__
+        assert format_lines(module, "lazy_demo", 100) == [" lazy_demo: module"]
+        assert probed == []
+
+    def test_builtin_types(self):
+        assert format_lines(3, "n", 100) == [" n: 3"]
+        assert format_lines(True, "b", 100) == [" b: True"]  # via int in the MRO
+        assert format_lines("x" * 20, "s", 5) == [" s: xxxxx..."]
+        assert format_lines(list(range(20)), "l", 100) == [
+            " l: 20 items", "First 5: [0, 1, 2, 3, 4]..."
+        ]
+
+    def test_user_formatter_and_mro_cache(self):
+        @load.register_formatter(Table)
+        def show(obj, name, limit):
+            return [" {0}: {1} rows".format(name, obj.rows)]
+
+        assert format_lines(BigTable(7), "t", 100) == [" t: 7 rows"]
+        assert formatters._resolved[BigTable] is show
+        assert get_formatter(BigTable) is show
+
+    def test_register_by_name(self):
+        formatters.register_formatter(
+            __name__ + ".Table", lambda obj, name, limit: ["named"]
+        )
+        assert format_lines(BigTable(1), "t", 100) == ["named"]
+
+    def test_fallback_probes(self):
+        assert format_lines(Table(1), "t", 100) == [" t: Table"]
+        assert format_lines(None, "x", 100) == [" x: NoneType loaded"]
+
+
+class LazyArray(object):
+    """dask-like array: any data access would compute."""
+
+    shape = (10 ** 9, 4)
+    dtype = "float64"
+    nbytes = 32 * 10 ** 9
+
+    def compute(self):
+        raise AssertionError("computed")
+
+    def __getitem__(self, key):
+        raise AssertionError("indexed")
+
+    def __str__(self):
+        raise AssertionError("stringified")
+
+
+class TestArraySummaries:
+    def test_lazy_array_is_not_computed(self):
+        lines = format_lines(LazyArray(), "x", 100)
+        assert lines == [
+            " x: LazyArray shape (1000000000, 4), dtype float64, 32.0 GB",
+            "   lazy: data not computed",
+        ]
+
+    def test_numpy_sample_is_bounded(self):
+        numpy = pytest.importorskip("numpy")
+
+        values = numpy.arange(1000000, dtype=float).reshape(-1, 4)
+        values[0, 0] = numpy.nan
+        lines = format_lines(values, "v", 200)
+        assert lines[0] == " v: ndarray shape (250000, 4), dtype float64, 8.0 MB"
+        assert lines[1] == (
+            "   first 2500 of 250000 rows, nulls 1, min 1, max 9999, mean 5000"
+        )
+
+    def test_dataframe_summary(self):
+        pandas = pytest.importorskip("pandas")
+
+        frame = pandas.DataFrame({"a": range(100), "b": ["x"] * 100})
+        lines = format_lines(frame, "df", 500)
+        assert lines[0].startswith(" df: DataFrame shape (100, 2), dtypes int64(1)")
+        assert lines[1] == "   all rows, nulls 0"
+        assert lines[2] == "   a: min 0, max 99, mean 49.5"
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,112 @@
+"""
+Tests for the pooled HTTP client
+"""
+
+import os
+import shutil
+import sys
+import tempfile
+import threading
+
+# Add src to path
+src_dir = os.path.abspath(
+    os.path.join(os.path.dirname(__file__), '..', 'src')
+)
+sys.path.insert(0, src_dir)
+
+import pytest  # noqa: E402
+
+from load.httpclient import HTTPError, HTTPPool  # noqa: E402
+
+try:
+    from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+except ImportError:  # pragma: no cover
+    ThreadingHTTPServer = None
+
+
+@pytest.mark.skipif(ThreadingHTTPServer is None, reason="needs Python 3.7+")
+class TestHTTPPool:
+    def setup_method(self):
+        self.root = tempfile.mkdtemp()
+        with open(os.path.join(self.root, "hello.txt"), "wb") as f:
+            f.write(b"hello" * 1000)
+
+        root = self.root
+
+        class Handler(SimpleHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def __init__(self, *args, **kwargs):
+                kwargs["directory"] = root
+                SimpleHTTPRequestHandler.__init__(self, *args, **kwargs)
+
+            def log_message(self, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.thread = threading.Thread(target=self.server.serve_forever)
+        self.thread.daemon = True
+        self.thread.start()
+        self.base = "http://127.0.0.1:{0}/".format(self.server.server_address[1])
+
+    def teardown_method(self):
+        self.server.shutdown()
+        self.server.server_close()
+        shutil.rmtree(self.root, ignore_errors=True)
+
+    def test_connection_reuse(self):
+        """Test that sequential requests reuse one keep-alive connection"""
+        pool = HTTPPool()
+        for _ in range(3):
+            response = pool.get(self.base + "hello.txt")
+            assert response.status == 200
+            assert response.data == b"hello" * 1000
+
+        stats = pool.stats()
+        assert stats["requests"] == 3
+        assert stats["misses"] == 1
+        assert stats["hits"] == 2
+        assert stats["hit_rate"] == pytest.approx(2.0 / 3)
+        pool.close()
+
+    def test_dropped_connection_retries_on_fresh_one(self):
+        """Test that a dropped keep-alive request is retried on a new connection"""
+
+        class Stale(object):
+            def request(self, *args, **kwargs):
+                raise ConnectionResetError("dropped")
+
+            def close(self):
+                pass
+
+        pool = HTTPPool()
+        key = ("http", "127.0.0.1", self.server.server_address[1])
+        pool._idle[key] = [Stale(), Stale()]
+        response = pool.get(self.base + "hello.txt")
+        assert response.status == 200
+        stats = pool.stats()
+        assert (stats["hits"], stats["misses"], stats["errors"]) == (1, 0, 0)
+        pool.close()
+
+    def test_download(self):
+        """Test streaming a download to disk"""
+        pool = HTTPPool()
+        target = os.path.join(self.root, "copy.txt")
+        pool.download(self.base + "hello.txt", target)
+        with open(target, "rb") as f:
+            assert f.read() == b"hello" * 1000
+
+        with pytest.raises(HTTPError) as excinfo:
+            pool.download(self.base + "missing.txt", target)
+        assert excinfo.value.status == 404
+        pool.close()
+
+    def test_file_url(self):
+        """Test non-HTTP schemes fall back to urllib"""
+        pool = HTTPPool()
+        url = "file://" + os.path.join(self.root, "hello.txt")
+        assert pool.get(url).data == b"hello" * 1000
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
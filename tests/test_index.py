@@ -0,0 +1,221 @@
+"""
+Tests for the simple-index metadata cache
+"""
+
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import threading
+
+# Add src to path
+src_dir = os.path.abspath(
+    os.path.join(os.path.dirname(__file__), '..', 'src')
+)
+sys.path.insert(0, src_dir)
+
+import pytest  # noqa: E402
+
+from load import config, index as index_module  # noqa: E402
+from load.index import (  # noqa: E402
+    SimpleIndex,
+    is_exact,
+    parse_project_page,
+    select_file,
+    split_spec,
+)
+from load.registry import LoadRegistry, PRIVATE_REGISTRIES  # noqa: E402
+
+try:
+    from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+except ImportError:  # pragma: no cover
+    ThreadingHTTPServer = None
+
+PROJECT_PAGE = """<!DOCTYPE html>
+<html><body>
+<a href="../../files/demo_pkg-1.0.tar.gz#sha256=aaa">demo_pkg-1.0.tar.gz</a>
+<a href="../../files/demo_pkg-1.1.tar.gz#sha256=bbb">demo_pkg-1.1.tar.gz</a>
+<a href="../../files/demo_pkg-1.1-py3-none-any.whl#sha256=ccc"
+   >demo_pkg-1.1-py3-none-any.whl</a>
+<a href="../../files/demo_pkg-2.0-cp27-cp27m-win32.whl"
+   >demo_pkg-2.0-cp27-cp27m-win32.whl</a>
+<a href="../../files/demo_pkg-3.0.tar.gz" data-yanked="">demo_pkg-3.0.tar.gz</a>
+</body></html>
+"""
+
+
+@pytest.mark.skipif(ThreadingHTTPServer is None, reason="needs Python 3.7+")
+class TestSimpleIndex:
+    def setup_method(self):
+        self.root = tempfile.mkdtemp()
+        self.cache = tempfile.mkdtemp()
+        self.saved_cache_dir = config.CACHE_DIR
+        config.CACHE_DIR = self.cache  # get_index() caches pages under it
+        project_dir = os.path.join(self.root, "simple", "demo-pkg")
+        os.makedirs(project_dir)
+        with open(os.path.join(project_dir, "index.html"), "w") as f:
+            f.write(PROJECT_PAGE)
+
+        root = self.root
+        self.statuses = statuses = []
+
+        class Handler(SimpleHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def __init__(self, *args, **kwargs):
+                kwargs["directory"] = root
+                SimpleHTTPRequestHandler.__init__(self, *args, **kwargs)
+
+            def log_request(self, code="-", size="-"):
+                statuses.append(int(code))
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.thread = threading.Thread(target=self.server.serve_forever)
+        self.thread.daemon = True
+        self.thread.start()
+        self.index_url = "http://127.0.0.1:{0}/simple/".format(
+            self.server.server_address[1]
+        )
+
+    def teardown_method(self):
+        self.server.shutdown()
+        self.server.server_close()
+        shutil.rmtree(self.root, ignore_errors=True)
+        config.CACHE_DIR = self.saved_cache_dir
+        shutil.rmtree(self.cache, ignore_errors=True)
+        PRIVATE_REGISTRIES.pop("local_test", None)
+
+    def test_find_file_prefers_compatible_wheel(self):
+        """Test choosing the newest installable file"""
+        index = SimpleIndex(self.index_url, cache_dir=self.cache, ttl=0)
+        found = index.find_file("Demo_Pkg")
+        assert found["filename"] == "demo_pkg-1.1-py3-none-any.whl"
+        assert found["hashes"] == {"sha256": "ccc"}
+
+        assert index.find_file("demo-pkg==1.0")["filename"] == "demo_pkg-1.0.tar.gz"
+        assert index.find_file("demo-pkg==9.9") is None
+        assert index.find_file("missing-pkg") is None
+
+    def test_conditional_revalidation(self):
+        """Test that a cached page is revalidated with If-Modified-Since"""
+        index = SimpleIndex(self.index_url, cache_dir=self.cache, ttl=0)
+        first = index.get_files("demo-pkg")
+        second = index.get_files("demo-pkg")
+
+        assert first == second
+        assert self.statuses == [200, 304]
+
+    def test_ttl_skips_request(self):
+        """Test that a fresh cache entry is used without a request"""
+        index = SimpleIndex(self.index_url, cache_dir=self.cache, ttl=60)
+        index.get_files("demo-pkg")
+        index.get_files("demo-pkg")
+        assert self.statuses == [200]
+
+    def test_install_fails_fast_on_missing_package(self):
+        """Test that a private-registry install never runs pip for a missing package"""
+        PRIVATE_REGISTRIES["local_test"] = {
+            "index_url": self.index_url,
+            "install_cmd": [sys.executable, "-m", "pip", "install", "--index-url"],
+        }
+        calls = []
+
+        def mock_run(cmd, *args, **kwargs):
+            calls.append(cmd)
+            return type("MockResult", (object,), {"returncode": 0})()
+
+        original_run = subprocess.run
+        subprocess.run = mock_run
+        try:
+            assert LoadRegistry.install_from_pypi("missing-pkg", "local_test") is False
+            assert calls == []
+
+            assert LoadRegistry.install_from_pypi("demo-pkg", "local_test") is True
+            wheel = "/files/demo_pkg-1.1-py3-none-any.whl#sha256=ccc"
+            assert calls[0][-1].endswith(wheel)
+
+            # Extras and ranges reach pip as written, not as a bare file URL
+            for spec in ("demo-pkg[extra]", "demo-pkg<1.1"):
+                assert LoadRegistry.install_from_pypi(spec, "local_test") is True
+                assert calls[-1][-1] == spec
+            assert LoadRegistry.install_from_pypi("demo-pkg>5", "local_test") is False
+        finally:
+            subprocess.run = original_run
+
+
+class TestParsing:
+    def test_parse_json_page(self):
+        """Test PEP 691 JSON project pages"""
+        body = (
+            b'{"meta": {"api-version": "1.0"}, "name": "demo", "files": ['
+            b'{"filename": "demo-1.0-py3-none-any.whl",'
+            b' "url": "demo-1.0-py3-none-any.whl", "hashes": {"sha256": "abc"}}]}'
+        )
+        base = "https://example.org/simple/demo/"
+        files = parse_project_page(body, "application/vnd.pypi.simple.v1+json", base)
+        assert files[0]["url"] == base + "demo-1.0-py3-none-any.whl"
+        assert files[0]["hashes"] == {"sha256": "abc"}
+
+    def test_split_spec(self):
+        """Test splitting requirement specs"""
+        assert split_spec("requests") == ("requests", None)
+        assert split_spec("requests[socks]==2.31.0") == ("requests", "2.31.0")
+        assert split_spec("requests>=2") == ("requests", None)
+
+
+def entry(filename, requires_python=None):
+    return {"filename": filename, "url": "https://files.example/" + filename,
+            "hashes": {}, "requires-python": requires_python, "yanked": False}
+
+
+FILES = [
+    entry("pkg-1.0.tar.gz"),
+    entry("pkg-1.5-py3-none-any.whl"),
+    entry("pkg-2.0.tar.gz"),
+    entry("pkg-3.0-py3-none-any.whl"),
+    entry("pkg-4.0rc1-py3-none-any.whl"),
+]
+
+
+class TestSelectFile:
+    def pick(self, spec, files=FILES):
+        found = select_file(files, spec)
+        return found and found["filename"]
+
+    def test_upper_bound(self):
+        assert self.pick("pkg<2") == "pkg-1.5-py3-none-any.whl"
+
+    def test_range(self):
+        assert self.pick("pkg>=1.5,<3") == "pkg-2.0.tar.gz"
+        assert self.pick("pkg~=1.0") == "pkg-1.5-py3-none-any.whl"
+        assert self.pick("pkg>5") is None
+
+    def test_extras(self):
+        assert self.pick("pkg[fast]<2") == "pkg-1.5-py3-none-any.whl"
+        assert is_exact("pkg") and is_exact("pkg==1.5")
+        assert not is_exact("pkg[fast]") and not is_exact("pkg[fast]==1.5")
+        assert not is_exact("pkg<2") and not is_exact("pkg==1.5; python_version<'3'")
+
+    def test_prereleases_only_when_asked(self):
+        assert self.pick("pkg") == "pkg-3.0-py3-none-any.whl"
+        assert self.pick("pkg>=4.0rc1") == "pkg-4.0rc1-py3-none-any.whl"
+        assert self.pick("pkg==4.0rc1") == "pkg-4.0rc1-py3-none-any.whl"
+
+    def test_requires_python(self):
+        files = FILES[:2] + [entry("pkg-2.5-py3-none-any.whl", ">=99")]
+        assert self.pick("pkg", files) == "pkg-1.5-py3-none-any.whl"
+        files = FILES[:2] + [entry("pkg-2.5-py3-none-any.whl", ">=3")]
+        assert self.pick("pkg", files) == "pkg-2.5-py3-none-any.whl"
+
+    def test_platform_wheels_without_packaging(self, monkeypatch):
+        monkeypatch.setattr(index_module, "_packaging", lambda: None)
+        monkeypatch.setattr(index_module, "_supported_tags", None)
+        files = [entry("pkg-1.0-cp311-cp311-manylinux_2_17_x86_64.whl")]
+        assert select_file(files, "pkg") == ""  # unknown: pip decides
+        assert self.pick("pkg==1.5") == "pkg-1.5-py3-none-any.whl"
+        assert select_file(files, "pkg==9.9") is None
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,151 @@
+"""
+Tests for the installed-distribution index
+"""
+
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+
+# Add src to path
+src_dir = os.path.abspath(
+    os.path.join(os.path.dirname(__file__), '..', 'src')
+)
+sys.path.insert(0, src_dir)
+
+import pytest  # noqa: E402
+
+from load import config  # noqa: E402
+from load.installed import InstalledIndex, is_regular_package  # noqa: E402
+from load.installqueue import _missing  # noqa: E402
+from load.names import register_distribution  # noqa: E402
+from load.utils import load  # noqa: E402
+
+
+def make_dist(site, name, version, top_level=None, record=None):
+    info = os.path.join(
+        site, "{0}-{1}.dist-info".format(name.replace("-", "_"), version)
+    )
+    os.makedirs(info)
+    with open(os.path.join(info, "METADATA"), "w") as f:
+        f.write(
+            "Metadata-Version: 2.1\nName: {0}\nVersion: {1}\n".format(name, version)
+        )
+    if top_level is not None:
+        with open(os.path.join(info, "top_level.txt"), "w") as f:
+            f.write("\n".join(top_level) + "\n")
+    if record is not None:
+        with open(os.path.join(info, "RECORD"), "w") as f:
+            f.write("".join("{0},,\n".format(path) for path in record))
+    # Make sure the directory mtime moves even on coarse filesystems
+    stat = os.stat(site)
+    os.utime(site, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1000000))
+
+
+class TestInstalledIndex:
+    def setup_method(self):
+        self.site = tempfile.mkdtemp()
+        sys.path.insert(0, self.site)
+        self.index = InstalledIndex()
+
+    def teardown_method(self):
+        sys.path.remove(self.site)
+        for name in list(sys.modules):
+            if name.split(".")[0] in ("broken_demo_mod", "nsdemo"):
+                del sys.modules[name]
+        shutil.rmtree(self.site, ignore_errors=True)
+
+    def test_maps_import_names_both_ways(self):
+        make_dist(self.site, "opencv-demo", "4.0", top_level=["cv2_demo"])
+        make_dist(self.site, "record-demo", "1.0", record=[
+            "record_pkg/__init__.py",
+            "record_single.py",
+            "record_ext.cpython-311-x86_64-linux-gnu.so",
+            "record_demo-1.0.dist-info/METADATA",
+            "../../bin/tool",
+        ])
+        assert self.index.distributions("cv2_demo") == ["opencv-demo"]
+        assert self.index.distributions("cv2_demo.sub") == ["opencv-demo"]
+        assert self.index.import_names("Opencv_Demo") == ["cv2_demo"]
+        assert self.index.import_names("record-demo") == [
+            "record_ext", "record_pkg", "record_single",
+        ]
+        assert self.index.is_installed("not_there_demo") is False
+
+    def test_rescans_only_changed_directories(self):
+        self.index.refresh()
+        scans = self.index.scans
+        self.index.refresh()
+        assert self.index.scans == scans
+
+        make_dist(self.site, "late-demo", "1.0", top_level=["late_demo"])
+        assert self.index.distributions("late_demo") == ["late-demo"]
+        assert self.index.scans == scans + 1
+
+    def test_installed_but_not_importable_skips_pip(self):
+        make_dist(self.site, "broken-demo", "1.0", top_level=["broken_demo_mod"])
+        with open(os.path.join(self.site, "broken_demo_mod.py"), "w") as f:
+            f.write("import missing_dependency_of_broken_demo\n")
+
+        calls = []
+
+        def mock_run(cmd, *args, **kwargs):
+            calls.append(cmd)
+            return type("MockResult", (object,), {"returncode": 0})()
+
+        original_run = subprocess.run
+        subprocess.run = mock_run
+        try:
+            with pytest.raises(ImportError) as excinfo:
+                load("broken_demo_mod", silent=True)
+        finally:
+            subprocess.run = original_run
+        assert "installed (broken-demo) but not importable" in str(excinfo.value)
+        assert "missing_dependency_of_broken_demo" in str(excinfo.value)
+        assert calls == []
+
+    def make_namespace(self):
+        # Like protobuf providing the "google" namespace
+        os.makedirs(os.path.join(self.site, "nsdemo", "proto"))
+        with open(os.path.join(self.site, "nsdemo", "proto", "__init__.py"), "w") as f:
+            f.write("")
+        make_dist(self.site, "nsdemo-proto", "1.0", top_level=["nsdemo"])
+        register_distribution("nsdemo.cloud.storage", "nsdemo-cloud-storage")
+
+    def test_namespace_submodule_is_installed(self):
+        self.make_namespace()
+        calls = []
+
+        def mock_run(cmd, *args, **kwargs):
+            calls.append(cmd)
+            return type("MockResult", (object,), {"returncode": 0})()
+
+        saved = config.CACHE_DIR
+        config.CACHE_DIR = os.path.join(self.site, "cache")
+        original_run = subprocess.run
+        subprocess.run = mock_run
+        try:
+            with pytest.raises(ImportError) as excinfo:
+                load("nsdemo.cloud.storage", silent=True)
+        finally:
+            subprocess.run = original_run
+            config.CACHE_DIR = saved
+            register_distribution("nsdemo.cloud.storage", None)
+        assert "but not importable" not in str(excinfo.value)
+        assert any("nsdemo-cloud-storage" in cmd for cmd in calls)
+
+    def test_missing_under_namespace(self):
+        self.make_namespace()
+        try:
+            assert not is_regular_package("nsdemo")
+            assert _missing("nsdemo.cloud.storage")
+            assert not _missing("nsdemo.proto")
+            assert not _missing("nsdemo")
+            assert not _missing("os.path")
+        finally:
+            register_distribution("nsdemo.cloud.storage", None)
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,109 @@
+"""
+Tests for coalesced installs
+"""
+
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import threading
+
+# Add src to path
+src_dir = os.path.abspath(
+    os.path.join(os.path.dirname(__file__), '..', 'src')
+)
+sys.path.insert(0, src_dir)
+
+import pytest  # noqa: E402
+
+from load import config  # noqa: E402
+from load.installqueue import InstallQueue, prefetch  # noqa: E402
+
+
+def pip_specs(cmd):
+    """Specs of a mocked pip command (after the injected options)."""
+    return [arg for arg in cmd if arg.startswith("queue-demo")]
+
+
+class TestInstallQueue:
+    def setup_method(self):
+        self.cache = tempfile.mkdtemp()
+        self.saved = config.CACHE_DIR, config.INSTALLER_BACKEND
+        config.CACHE_DIR = self.cache
+        config.INSTALLER_BACKEND = "pip"
+        self.failing = set()
+
+        self.calls = []
+
+        def mock_run(cmd, *args, **kwargs):
+            self.calls.append(cmd)
+            failed = self.failing.intersection(pip_specs(cmd))
+            return type("MockResult", (object,), {"returncode": 1 if failed else 0})()
+
+        self.original_run = subprocess.run
+        subprocess.run = mock_run
+
+    def teardown_method(self):
+        subprocess.run = self.original_run
+        config.CACHE_DIR, config.INSTALLER_BACKEND = self.saved
+        shutil.rmtree(self.cache, ignore_errors=True)
+
+    def test_concurrent_requests_share_one_pip_run(self):
+        queue = InstallQueue(window=0.3)
+        names = ["queue-demo-a", "queue-demo-b", "queue-demo-c"]
+        results = {}
+
+        def worker(name):
+            results[name] = queue.submit(name).wait()
+
+        threads = [threading.Thread(target=worker, args=(n,)) for n in names]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert results == dict((n, True) for n in names)
+        assert len(self.calls) == 1
+        assert sorted(pip_specs(self.calls[0])) == names
+        assert queue.batches == 1
+
+    def test_duplicate_submit_returns_same_request(self):
+        queue = InstallQueue(window=0)
+        assert queue.submit("queue-demo-a") is queue.submit("queue-demo-a")
+        assert len(queue) == 1
+
+    def test_flush_skips_window(self):
+        queue = InstallQueue(window=60)
+        first = queue.submit("queue-demo-a")
+        second = queue.submit("queue-demo-b")
+        queue.flush()
+        assert first.done and second.done
+        assert first.wait() and second.wait()
+        assert len(self.calls) == 1
+        assert first.record is second.record
+        assert first.record.success is True
+
+    def test_failed_batch_is_retried_per_spec(self):
+        self.failing.add("queue-demo-bad")
+        queue = InstallQueue(window=0)
+        good = queue.submit("queue-demo-good")
+        bad = queue.submit("queue-demo-bad")
+        queue.flush()
+        assert good.success is True
+        assert bad.success is False
+        assert [pip_specs(c) for c in self.calls] == [
+            ["queue-demo-good", "queue-demo-bad"],
+            ["queue-demo-good"],
+            ["queue-demo-bad"],
+        ]
+
+    def test_prefetch_skips_importable(self):
+        requests = prefetch("json", "j=json", "queue-demo-a", "queue-demo-b", "./x.py")
+        assert [r.spec for r in requests] == ["queue-demo-a", "queue-demo-b"]
+        assert all(r.success for r in requests)
+        assert len(self.calls) == 1
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
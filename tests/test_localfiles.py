@@ -0,0 +1,309 @@
+"""
+Tests for local file modules and change-detecting reloads
+"""
+
+import os
+import shutil
+import sys
+import tempfile
+import threading
+import time
+
+# Add src to path
+src_dir = os.path.abspath(
+    os.path.join(os.path.dirname(__file__), '..', 'src')
+)
+sys.path.insert(0, src_dir)
+
+import pytest  # noqa: E402
+
+from load import codecache, localfiles  # noqa: E402
+from load.config import _module_cache  # noqa: E402
+from load.output import BufferedSink, set_output  # noqa: E402
+from load.utils import load, local_dir  # noqa: E402
+
+
+class TestLocalFiles:
+    def setup_method(self):
+        self.tmp = tempfile.mkdtemp()
+        self.path = os.path.join(self.tmp, "plugin_mod.py")
+        self.write("COUNT = globals().get('COUNT', 0) + 1\nVALUE = 1\n")
+        self.saved_records = dict(localfiles._records)
+        self.saved_cache = dict(_module_cache)
+
+    def teardown_method(self):
+        localfiles._records.clear()
+        localfiles._records.update(self.saved_records)
+        _module_cache.clear()
+        _module_cache.update(self.saved_cache)
+        for name in [n for n in sys.modules if n.startswith(("plugin_mod_", "utils_"))]:
+            del sys.modules[name]
+        shutil.rmtree(self.tmp)
+
+    def write(self, text, bump=1):
+        with open(self.path, "w") as f:
+            f.write(text)
+        # mtime resolution may be coarse: move it forward explicitly
+        stamp = time.time() + bump * 10
+        os.utime(self.path, (stamp, stamp))
+
+    def test_auto_reload_only_when_changed(self):
+        module = load(self.path, silent=True)
+        assert module.COUNT == 1
+
+        assert load(self.path, silent=True, reload="auto") is module
+        assert module.COUNT == 1
+
+        self.write("COUNT = globals().get('COUNT', 0) + 1\nVALUE = 2\n", bump=2)
+        assert load(self.path, silent=True, reload="auto") is module
+        assert (module.COUNT, module.VALUE) == (2, 2)
+
+    def test_touch_without_edit_is_not_reloaded(self):
+        load(self.path, silent=True)
+        record = localfiles.get_record(self.path)
+        stamp = time.time() + 100
+        os.utime(self.path, (stamp, stamp))
+        assert load(self.path, silent=True, reload="auto").COUNT == 1
+        assert record.executions == 1
+        assert record.mtime_ns == localfiles.file_state(self.path)[0]
+
+    def test_write_during_refresh_is_not_lost(self):
+        module = load(self.path, silent=True)
+        record = localfiles.get_record(self.path)
+        self.write("COUNT = 0\nVALUE = 2\n", bump=2)
+        read = record.read
+
+        def racing_read():
+            result = read()
+            self.write("COUNT = 0\nVALUE = 3\n", bump=3)  # lands after the read
+            return result
+
+        record.read = racing_read
+        assert record.refresh()
+        del record.read
+        assert module.VALUE == 2
+        assert record.refresh()
+        assert module.VALUE == 3
+
+    def test_reload_true_and_force_always_execute(self):
+        module = load(self.path, silent=True)
+        load(self.path, silent=True, reload=True)
+        load(self.path, silent=True, force=True)
+        assert module.COUNT == 3
+        assert load(self.path, silent=True).COUNT == 3
+
+    def test_invalid_reload(self):
+        with pytest.raises(ValueError):
+            load(self.path, silent=True, reload="sometimes")
+
+    def test_check_reports_failures_once(self):
+        module = load(self.path, silent=True)
+        sink = BufferedSink(size=1000, interval=60)
+        set_output(sink)
+        try:
+            self.write("raise RuntimeError('broken')\n", bump=2)
+            assert localfiles.check() == []
+            assert localfiles.check() == []
+            assert len(sink._lines) == 1
+            assert "broken" in sink._lines[0][1]
+
+            self.write("COUNT = 0\nVALUE = 3\n", bump=3)
+            assert localfiles.check() == [module]
+            assert module.VALUE == 3
+        finally:
+            sink._lines = []
+            set_output("stdout")
+
+    def test_every_spelling_is_one_module(self):
+        sub = os.path.join(self.tmp, "sub")
+        os.mkdir(sub)
+        spellings = [
+            self.path,
+            os.path.join(sub, "..", "plugin_mod.py"),
+            os.path.join(self.tmp, ".", "plugin_mod.py"),
+        ]
+        if hasattr(os, "symlink"):
+            link = os.path.join(sub, "linked.py")
+            os.symlink(self.path, link)
+            spellings.append(link)
+        modules = [load(p, silent=True) for p in spellings]
+        assert all(m is modules[0] for m in modules)
+        assert modules[0].COUNT == 1
+        assert len([r for r in localfiles.records() if r.module is modules[0]]) == 1
+
+    def test_same_stem_does_not_collide(self):
+        paths = []
+        for i, folder in enumerate(("one", "two")):
+            os.mkdir(os.path.join(self.tmp, folder))
+            paths.append(os.path.join(self.tmp, folder, "utils.py"))
+            with open(paths[-1], "w") as f:
+                f.write("WHICH = {0}\n".format(i))
+        first, second = [load(p, silent=True) for p in paths]
+        assert (first.WHICH, second.WHICH) == (0, 1)
+        assert first.__name__ != second.__name__
+        assert sys.modules[first.__name__] is first
+        assert sys.modules[second.__name__] is second
+        assert "utils" not in sys.modules or sys.modules["utils"] not in (first, second)
+
+    def test_module_name_is_stable(self):
+        path = localfiles.canonical_path(self.path)
+        name = localfiles.module_name(path)
+        assert name.startswith("plugin_mod_") and len(name) == len("plugin_mod_") + 12
+        assert localfiles.module_name(path) == name
+        assert load(self.path, silent=True).__name__ == name
+
+    def test_restart_skips_compilation(self):
+        load(self.path, silent=True)
+        localfiles._records.clear()  # as in a new process
+        _module_cache.clear()
+        before = codecache.stats()
+        assert load(self.path, silent=True).VALUE == 1
+        after = codecache.stats()
+        assert after["hits"] - before["hits"] == 1
+        assert after["misses"] == before["misses"]
+
+    def test_url_module_runs_in_memory(self):
+        url = "file://" + self.path.replace(os.sep, "/")
+        module = load(url, silent=True)
+        assert (module.COUNT, module.VALUE) == (1, 1)
+        assert module.__file__ == url
+        assert sys.modules[module.__name__] is module
+        path = localfiles.canonical_path(self.path)
+        assert module.__name__ != localfiles.module_name(path)
+
+        assert load(url, silent=True) is module
+        assert load(url, silent=True, reload="auto").COUNT == 1
+        self.write("COUNT = globals().get('COUNT', 0) + 1\nVALUE = 7\n", bump=2)
+        assert load(url, silent=True).VALUE == 1
+        assert load(url, silent=True, reload="auto") is module
+        assert (module.COUNT, module.VALUE) == (2, 7)
+        localfiles._urls.pop(url)
+        sys.modules.pop(module.__name__)
+
+    def test_slow_url_does_not_block_local_loads(self):
+        url = "https://example.invalid/slow_mod.py"
+        started, release = threading.Event(), threading.Event()
+
+        def slow_fetch(requested):
+            started.set()
+            release.wait(5)
+            return b"SLOW = True\n"
+
+        saved = localfiles._fetch
+        localfiles._fetch = slow_fetch
+        result = []
+        thread = threading.Thread(
+            target=lambda: result.append(localfiles.load_url(url))
+        )
+        thread.start()
+        try:
+            assert started.wait(5)
+            # not stuck behind the download
+            assert load(self.path, silent=True).VALUE == 1
+        finally:
+            release.set()
+            thread.join(5)
+            localfiles._fetch = saved
+        assert result[0].SLOW is True
+        sys.modules.pop(localfiles._urls.pop(url).module.__name__)
+
+    def test_plain_http_url_is_refused(self):
+        fetched = []
+        saved = localfiles._fetch
+        localfiles._fetch = lambda url: fetched.append(url) or b"X = 1\n"
+        try:
+            with pytest.raises(ImportError) as exc:
+                load("http://example.invalid/tool.py", silent=True)
+        finally:
+            localfiles._fetch = saved
+        assert "https://" in str(exc.value)
+        assert fetched == []
+
+    def test_url_module_failure(self):
+        with pytest.raises(ImportError):
+            load("file://" + os.path.join(self.tmp, "missing.py"), silent=True)
+
+    def test_watcher(self):
+        module = load(self.path, silent=True)
+        watcher = localfiles.watch(0.01)
+        try:
+            self.write("COUNT = 0\nVALUE = 5\n", bump=2)
+            deadline = time.time() + 5
+            while module.VALUE != 5 and time.time() < deadline:
+                time.sleep(0.01)
+            assert module.VALUE == 5
+        finally:
+            watcher.stop()
+        assert not watcher.running
+
+
+class TestLocalDir:
+    def setup_method(self):
+        self.tmp = tempfile.mkdtemp()
+        self.plugins = os.path.join(self.tmp, "plugins")
+        os.makedirs(os.path.join(self.plugins, "nested"))
+        self.saved_records = dict(localfiles._records)
+        sys.ORDER = []
+        for name in ("b_plugin", "a_plugin", "c_plugin", "__init__"):
+            self.write(name + ".py", "import sys\nsys.ORDER.append(__file__)\n"
+                       "NAME = {0!r}\n".format(name))
+        self.write("nested/d_plugin.py", "NAME = 'd_plugin'\n")
+
+    def teardown_method(self):
+        for record in localfiles.records():
+            if record.path not in self.saved_records:
+                sys.modules.pop(record.module.__name__, None)
+        localfiles._records.clear()
+        localfiles._records.update(self.saved_records)
+        del sys.ORDER
+        shutil.rmtree(self.tmp)
+
+    def write(self, name, text):
+        with open(os.path.join(self.plugins, name), "w") as f:
+            f.write(text)
+
+    def test_deterministic_order(self):
+        modules = local_dir(self.plugins, silent=True, workers=4)
+        assert list(modules) == ["a_plugin", "b_plugin", "c_plugin"]
+        assert [m.NAME for m in modules.values()] == list(modules)
+        assert [os.path.basename(p) for p in sys.ORDER] == [
+            "a_plugin.py", "b_plugin.py", "c_plugin.py"
+        ]
+
+    def test_recursive_pattern(self):
+        modules = local_dir(self.plugins, "**/*_plugin.py", silent=True)
+        assert list(modules) == ["a_plugin", "b_plugin", "c_plugin", "nested/d_plugin"]
+
+    def test_loaded_files_are_not_run_again(self):
+        first = load(os.path.join(self.plugins, "a_plugin.py"), silent=True)
+        modules = local_dir(self.plugins, silent=True)
+        assert modules["a_plugin"] is first
+        assert len(sys.ORDER) == 3
+        local_dir(self.plugins, silent=True)
+        assert len(sys.ORDER) == 3
+        local_dir(self.plugins, silent=True, reload=True)
+        assert len(sys.ORDER) == 6
+
+    def test_unchanged_files_skip_compilation(self):
+        local_dir(self.plugins, silent=True)
+        localfiles._records.clear()
+        before = codecache.stats()
+        local_dir(self.plugins, silent=True)
+        after = codecache.stats()
+        assert after["hits"] - before["hits"] == 3
+        assert after["misses"] == before["misses"]
+
+    def test_failure_names_the_file(self):
+        self.write("e_plugin.py", "def broken(:\n")
+        with pytest.raises(ImportError) as exc:
+            local_dir(self.plugins, silent=True)
+        assert "e_plugin.py" in str(exc.value)
+        assert len(sys.ORDER) == 3
+
+    def test_missing_directory(self):
+        with pytest.raises(ImportError):
+            local_dir(os.path.join(self.tmp, "nope"), silent=True)
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,136 @@
+"""
+Tests for lockfile capture and replay
+"""
+
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+
+# Add src to path
+src_dir = os.path.abspath(
+    os.path.join(os.path.dirname(__file__), '..', 'src')
+)
+sys.path.insert(0, src_dir)
+
+import pytest  # noqa: E402
+
+from load import lockfile  # noqa: E402
+from load.lockfile import from_lock, lock, record_module, record_report  # noqa: E402
+
+REPORT = {
+    "version": "1",
+    "install": [
+        {
+            "requested": True,
+            "metadata": {"name": "Demo-Pkg", "version": "1.2.0"},
+            "download_info": {
+                "url": "https://files.example.org/demo_pkg-1.2.0-py3-none-any.whl",
+                "archive_info": {"hashes": {"sha256": "abc123"}},
+            },
+        },
+        {
+            "requested": False,
+            "metadata": {"name": "dep", "version": "0.1"},
+            "download_info": {
+                "url": "https://files.example.org/dep-0.1-py3-none-any.whl",
+                "archive_info": {"hash": "sha256=def456"},
+            },
+        },
+    ],
+}
+
+
+class TestLockfile:
+    def setup_method(self):
+        lockfile._resolved.clear()
+        del lockfile._pending_modules[:]
+        self.tmp = tempfile.mkdtemp()
+        self.calls = []
+
+        def mock_run(cmd, *args, **kwargs):
+            requirements = cmd[cmd.index("-r") + 1] if "-r" in cmd else None
+            with open(requirements) as f:
+                self.calls.append((cmd, f.read()))
+            return type("MockResult", (object,), {"returncode": 0})()
+
+        self.original_run = subprocess.run
+        subprocess.run = mock_run
+
+    def teardown_method(self):
+        subprocess.run = self.original_run
+        lockfile._resolved.clear()
+        shutil.rmtree(self.tmp, ignore_errors=True)
+
+    def _report(self, data):
+        path = os.path.join(self.tmp, "report.json")
+        with open(path, "w") as f:
+            json.dump(data, f)
+        return path
+
+    def test_lock_records_installs(self):
+        """Test that installed artifacts are pinned with URL and hash"""
+        record_report(self._report(REPORT), "company")
+        path = os.path.join(self.tmp, "load.lock")
+        packages = lock(path)
+
+        with open(path) as f:
+            assert json.load(f)["packages"] == packages
+        demo, dep = packages
+        assert demo["name"] == "Demo-Pkg"
+        assert demo["version"] == "1.2.0"
+        assert demo["registry"] == "company"
+        assert demo["url"].endswith("demo_pkg-1.2.0-py3-none-any.whl")
+        assert demo["hashes"] == {"sha256": "abc123"}
+        assert dep["hashes"] == {"sha256": "def456"}
+
+    def test_lock_records_loaded_modules(self):
+        """Test that already-installed modules are pinned with their dependencies"""
+        record_module("pytest")
+        names = [p["name"].lower() for p in lock(os.path.join(self.tmp, "load.lock"))]
+        assert "pytest" in names
+        assert "pluggy" in names
+
+    def test_from_lock_single_pass(self):
+        """Test replay with one --no-deps run and hash pins"""
+        record_report(self._report(REPORT), "pypi")
+        path = os.path.join(self.tmp, "load.lock")
+        lock(path)
+
+        assert from_lock(path) is True
+        assert len(self.calls) == 1
+        cmd, requirements = self.calls[0]
+        assert "--no-deps" in cmd
+        assert (
+            "Demo-Pkg @ https://files.example.org/demo_pkg-1.2.0-py3-none-any.whl"
+            " --hash=sha256:abc123"
+        ) in requirements
+        assert (
+            "dep @ https://files.example.org/dep-0.1-py3-none-any.whl"
+        ) in requirements
+
+    def test_from_lock_wheel_store(self):
+        """Test replay from a local wheel store"""
+        record_report(self._report(REPORT), "pypi")
+        path = os.path.join(self.tmp, "load.lock")
+        lock(path)
+
+        assert from_lock(path, wheel_store=self.tmp) is True
+        cmd, requirements = self.calls[0]
+        assert cmd[cmd.index("--find-links") + 1] == self.tmp
+        assert "--no-index" in cmd
+        assert "Demo-Pkg==1.2.0" in requirements
+
+    def test_from_lock_nothing_to_do(self):
+        """Test that an already satisfied lockfile spawns nothing"""
+        record_module("pytest")
+        path = os.path.join(self.tmp, "load.lock")
+        lock(path)
+        assert from_lock(path) is True
+        assert self.calls == []
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,118 @@
+"""
+Tests for cross-process install locks
+"""
+
+import os
+import shutil
+import sys
+import tempfile
+import threading
+import time
+
+# Add src to path
+src_dir = os.path.abspath(
+    os.path.join(os.path.dirname(__file__), '..', 'src')
+)
+sys.path.insert(0, src_dir)
+
+import pytest  # noqa: E402
+
+from load import config  # noqa: E402
+from load.locks import (  # noqa: E402
+    FileLock,
+    LockTimeout,
+    distribution_key,
+    install_lock,
+    serialized_install,
+)
+
+
+class TestLocks:
+    def setup_method(self):
+        self.cache = tempfile.mkdtemp()
+        self.site = tempfile.mkdtemp()
+        self.saved = config.CACHE_DIR
+        config.CACHE_DIR = self.cache
+        sys.path.insert(0, self.site)
+
+    def teardown_method(self):
+        config.CACHE_DIR = self.saved
+        sys.path.remove(self.site)
+        sys.modules.pop("lock_demo_pkg", None)
+        shutil.rmtree(self.cache, ignore_errors=True)
+        shutil.rmtree(self.site, ignore_errors=True)
+
+    def test_distribution_key(self):
+        assert distribution_key("Requests>=2") == "requests"
+        assert distribution_key("company/requests") == "requests"
+        assert distribution_key("https://github.com/psf/requests.git") == "requests"
+        url = "https://host/demo_pkg-1.0-py3-none-any.whl"
+        assert distribution_key(url) == "demo-pkg"
+
+    def test_exclusive(self):
+        path = os.path.join(self.cache, "x.lock")
+        with FileLock(path):
+            other = FileLock(path, timeout=0.2)
+            assert other.acquire(blocking=False) is False
+            with pytest.raises(LockTimeout):
+                other.acquire()
+        assert other.acquire(blocking=False) is True
+        other.release()
+
+    def test_waiter_skips_install_done_by_holder(self):
+        calls = []
+        results = []
+        holder = install_lock("lock-demo-pkg")
+        holder.acquire()
+
+        def waiter():
+            results.append(
+                serialized_install("lock-demo-pkg", lambda: calls.append(1) or True)
+            )
+
+        thread = threading.Thread(target=waiter)
+        thread.start()
+        time.sleep(0.3)
+        assert thread.is_alive()  # blocked on the lock
+
+        # The holder "installs" the package, then releases
+        with open(os.path.join(self.site, "lock_demo_pkg.py"), "w") as f:
+            f.write("VALUE = 1\n")
+        holder.release()
+        thread.join(5)
+
+        assert results == [True]
+        assert calls == []
+
+    def test_uncontended_install_always_runs(self):
+        with open(os.path.join(self.site, "lock_demo_pkg.py"), "w") as f:
+            f.write("VALUE = 1\n")
+        calls = []
+        assert serialized_install("lock-demo-pkg", lambda: calls.append(1) or True)
+        assert calls == [1]
+
+    def test_direct_sources_install_after_waiting(self):
+        with open(os.path.join(self.site, "lock_demo_pkg.py"), "w") as f:
+            f.write("VALUE = 1\n")
+        for spec in ("https://host/lock_demo_pkg-2.0.tar.gz",
+                     "https://github.com/fork/lock-demo-pkg"):
+            calls = []
+            holder = install_lock(spec)
+            holder.acquire()
+            thread = threading.Thread(
+                target=serialized_install, args=(spec, lambda: calls.append(1) or True)
+            )
+            thread.start()
+            time.sleep(0.2)
+            holder.release()
+            thread.join(5)
+            assert calls == [1], spec
+
+    def test_install_runs_when_missing(self):
+        calls = []
+        assert serialized_install("lock-missing-pkg", lambda: calls.append(1) or True)
+        assert calls == [1]
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
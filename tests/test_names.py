@@ -0,0 +1,101 @@
+"""
+Tests for import name -> distribution resolution
+"""
+
+import os
+import subprocess
+import sys
+import tempfile
+
+# Add src to path
+src_dir = os.path.abspath(
+    os.path.join(os.path.dirname(__file__), '..', 'src')
+)
+sys.path.insert(0, src_dir)
+
+import pytest  # noqa: E402
+
+from load.names import (  # noqa: E402
+    DATA_FILE,
+    SortedTable,
+    lookup,
+    register_distribution,
+    resolve_distribution,
+)
+from load.utils import install_package  # noqa: E402
+
+
+class TestNames:
+    def teardown_method(self):
+        register_distribution("cv2", None)
+
+    def test_bundled_table_is_sorted_and_unique(self):
+        with open(DATA_FILE, "rb") as f:
+            keys = [line.split(b"\t")[0] for line in f.read().splitlines()]
+        assert keys == sorted(set(keys))
+
+    def test_every_entry_is_found(self):
+        table = SortedTable(DATA_FILE)
+        with open(DATA_FILE) as f:
+            for line in f:
+                key, value = line.rstrip("\n").split("\t")
+                assert table.get(key) == value
+        assert table.get("aaa_not_there") is None
+        assert table.get("zzz_not_there") is None
+
+    def test_small_tables(self):
+        path = tempfile.mktemp()
+        with open(path, "w") as f:
+            f.write("b\tB\n")
+        try:
+            table = SortedTable(path)
+            assert table.get("b") == "B"
+            assert table.get("a") is None
+            assert table.get("c") is None
+        finally:
+            os.remove(path)
+        assert SortedTable(path + ".missing").get("b") is None
+
+    def test_resolve(self):
+        assert resolve_distribution("cv2") == "opencv-python"
+        assert resolve_distribution("sklearn") == "scikit-learn"
+        assert resolve_distribution("yaml") == "PyYAML"
+        blob = "google.cloud.storage.blob"
+        assert resolve_distribution(blob) == "google-cloud-storage"
+        assert resolve_distribution("matplotlib.pyplot") == "matplotlib"
+        assert resolve_distribution("requests>=2") == "requests>=2"
+        assert resolve_distribution("company/pkg") == "company/pkg"
+        assert lookup("requests") is None
+
+    def test_exported(self):
+        import load
+
+        assert load.resolve_distribution("sklearn") == "scikit-learn"
+        assert "resolve_distribution" in load.__all__
+
+    def test_user_override(self):
+        register_distribution("cv2", "opencv-python-headless")
+        assert resolve_distribution("cv2") == "opencv-python-headless"
+        register_distribution("cv2", None)
+        assert resolve_distribution("cv2") == "opencv-python"
+
+    def test_install_uses_distribution_name(self):
+        calls = []
+
+        def mock_run(cmd, *args, **kwargs):
+            calls.append(cmd)
+            return type("MockResult", (object,), {"returncode": 0})()
+
+        register_distribution("names_demo_mod", "names-demo-dist")
+        original_run = subprocess.run
+        subprocess.run = mock_run
+        try:
+            assert install_package("names_demo_mod") is True
+        finally:
+            subprocess.run = original_run
+            register_distribution("names_demo_mod", None)
+        assert calls[0][-1] == "names-demo-dist"
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,88 @@
+"""
+Tests for offline mode
+"""
+
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+# Add src to path
+src_dir = os.path.abspath(
+    os.path.join(os.path.dirname(__file__), '..', 'src')
+)
+sys.path.insert(0, src_dir)
+
+import pytest  # noqa: E402
+
+from load import config  # noqa: E402
+from load.offline import find_local, set_offline  # noqa: E402
+from load.registry import LoadRegistry  # noqa: E402
+from load.utils import install_package  # noqa: E402
+
+
+class TestOffline:
+    def setup_method(self):
+        self.index = tempfile.mkdtemp()
+        open(os.path.join(self.index, "demo_pkg-1.0-py3-none-any.whl"), "w").close()
+        os.makedirs(os.path.join(self.index, "other-pkg"))
+        open(os.path.join(self.index, "other-pkg", "other_pkg-2.0.tar.gz"), "w").close()
+
+        self.saved = (config.OFFLINE, config.OFFLINE_INDEX)
+        set_offline(True, "file://" + self.index)
+
+        self.calls = []
+
+        def mock_run(cmd, *args, **kwargs):
+            self.calls.append(cmd)
+            return type("MockResult", (object,), {"returncode": 0})()
+
+        self.original_run = subprocess.run
+        subprocess.run = mock_run
+
+    def teardown_method(self):
+        subprocess.run = self.original_run
+        config.OFFLINE, config.OFFLINE_INDEX = self.saved
+        shutil.rmtree(self.index, ignore_errors=True)
+
+    def test_find_local(self):
+        """Test resolving files from flat and PEP 503 layouts"""
+        assert find_local("Demo-Pkg").endswith("demo_pkg-1.0-py3-none-any.whl")
+        assert find_local("other_pkg==2.0").endswith("other_pkg-2.0.tar.gz")
+        assert find_local("demo-pkg==2.0") is None
+        assert find_local("missing") is None
+
+    def test_missing_package_fails_fast(self):
+        """Test that nothing is spawned for packages missing offline"""
+        start = time.time()
+        assert install_package("definitely-missing-package") is False
+        assert LoadRegistry.install_from_pypi("definitely-missing-package") is False
+        assert LoadRegistry.install_from_github("user/repo") is False
+        assert LoadRegistry.install_from_gitlab("user/repo") is False
+        url = "https://files.example.org/x.whl"
+        assert LoadRegistry().install_from_url(url) is False
+        assert time.time() - start < 1
+        assert self.calls == []
+
+    def test_install_uses_local_index_only(self):
+        """Test that pip is pointed at the local directory without an index"""
+        assert LoadRegistry.install_from_pypi("demo-pkg") is True
+        cmd = self.calls[0]
+        assert "--no-index" in cmd
+        assert cmd[cmd.index("--find-links") + 1] == self.index
+        assert cmd[-1] == "demo-pkg"
+
+    def test_local_wheel_url_stays_offline(self):
+        """Test that a file: wheel URL does not send pip to the network"""
+        wheel = os.path.join(self.index, "demo_pkg-1.0-py3-none-any.whl")
+        assert LoadRegistry().install_from_url("file://" + wheel) is True
+        cmd = self.calls[0]
+        assert "--no-index" in cmd
+        assert cmd[cmd.index("--find-links") + 1] == self.index
+        assert cmd[-1].endswith("demo_pkg-1.0-py3-none-any.whl")
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,119 @@
+"""
+Tests for output sinks
+"""
+
+import io
+import json
+import logging
+import os
+import sys
+
+# Add src to path
+src_dir = os.path.abspath(
+    os.path.join(os.path.dirname(__file__), '..', 'src')
+)
+sys.path.insert(0, src_dir)
+
+import pytest  # noqa: E402
+
+from load import config, output  # noqa: E402
+from load.output import (  # noqa: E402
+    BufferedSink,
+    JsonLinesSink,
+    LoggingSink,
+    NullSink,
+    emit,
+    set_output,
+)
+from load.utils import smart_print  # noqa: E402
+
+
+class Unformattable(object):
+    def __format__(self, spec):
+        raise AssertionError("formatted")
+
+
+class TestOutput:
+    def setup_method(self):
+        self.saved = config.OUTPUT_RATE
+
+    def teardown_method(self):
+        set_output("stdout", rate=self.saved)
+
+    def test_null_sink_builds_nothing(self):
+        set_output(NullSink())
+        emit("install", "📦 Installing {0}...", Unformattable())
+        emit("install", lambda: pytest.fail("message built"))
+
+    def test_smart_print_skips_formatting(self, monkeypatch):
+        monkeypatch.setattr(sys.modules["load.utils"], "format_lines",
+                            lambda *args: pytest.fail("formatted"))
+        set_output("null")
+        smart_print({"a": 1}, "d")
+
+    def test_stream_sink_routes_errors(self, capsys):
+        emit("install", "📦 Installing {0}...", "x")
+        emit("install", "❌ {0}", "boom", level="error")
+        captured = capsys.readouterr()
+        assert captured.out == "📦 Installing x...\n"
+        assert captured.err == "❌ boom\n"
+
+    def test_buffered_sink_writes_in_batches(self):
+        stream = io.StringIO()
+        set_output(BufferedSink(stream=stream, size=3, interval=60))
+        emit("print", "one")
+        emit("print", "two")
+        assert stream.getvalue() == ""
+        emit("print", "three")
+        assert stream.getvalue() == "one\ntwo\nthree\n"
+        emit("print", "four")
+        output.flush()
+        assert stream.getvalue().endswith("four\n")
+
+    def test_buffered_sink_flushes_once_at_exit(self, monkeypatch):
+        registered = []
+        monkeypatch.setattr(output.atexit, "register", registered.append)
+        old, stream = io.StringIO(), io.StringIO()
+        set_output(BufferedSink(stream=old, size=100, interval=60))
+        emit("print", "old")
+        set_output(BufferedSink(stream=stream, size=100, interval=60))
+        emit("print", "pending")
+        assert registered == []  # no exit handler (and buffer) kept per sink
+        assert old.getvalue() == "old\n"
+        output._flush_at_exit()
+        assert stream.getvalue() == "pending\n"
+
+    def test_json_lines(self):
+        stream = io.StringIO()
+        set_output(JsonLinesSink(stream=stream))
+        emit("install", "📦 Installing {0}...", "requests", spec="requests")
+        record = json.loads(stream.getvalue())
+        assert record["kind"] == "install"
+        assert record["level"] == "info"
+        assert record["message"] == "📦 Installing requests..."
+        assert record["spec"] == "requests"
+
+    def test_logging_sink(self, caplog):
+        set_output(LoggingSink())
+        with caplog.at_level(logging.WARNING, logger="load"):
+            emit("install", "hidden {0}", Unformattable())  # INFO is disabled
+            emit("install", "❌ {0}", "failed", level="warning")
+        assert [r.getMessage() for r in caplog.records] == ["❌ failed"]
+        assert caplog.records[0].load_kind == "install"
+
+    def test_rate_limit(self):
+        stream = io.StringIO()
+        set_output(JsonLinesSink(stream=stream), rate=2)
+        for i in range(10):
+            emit("print", "line {0}", i)
+        emit("install", "❌ {0}", "kept", level="error")
+        output._limiter._tokens = 1  # a second later
+        emit("print", "after")
+        lines = stream.getvalue().splitlines()
+        messages = [json.loads(line)["message"] for line in lines]
+        assert messages == ["line 0", "line 1", "❌ kept",
+                            "… 8 line(s) suppressed", "after"]
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
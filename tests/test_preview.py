@@ -0,0 +1,218 @@
+"""
+Tests for bounded auto-print previews
+"""
+
+import collections
+import os
+import sys
+
+# Add src to path
+src_dir = os.path.abspath(
+    os.path.join(os.path.dirname(__file__), '..', 'src')
+)
+sys.path.insert(0, src_dir)
+
+import pytest  # noqa: E402
+
+from load.preview import (  # noqa: E402
+    bounded_repr,
+    head,
+    is_one_shot,
+    json_preview,
+    response_preview,
+)
+from load.utils import smart_print  # noqa: E402
+
+
+class CountingSequence(object):
+    """Huge sequence that records which indexes were read."""
+
+    def __init__(self, size):
+        self.size = size
+        self.read = []
+
+    def __len__(self):
+        return self.size
+
+    def __getitem__(self, index):
+        if index >= self.size:
+            raise IndexError(index)
+        self.read.append(index)
+        return index * 2
+
+    def __iter__(self):
+        raise AssertionError("the whole sequence must not be iterated")
+
+
+class SizedIterator(object):
+    """One-shot iterator that also reports a length."""
+
+    def __init__(self, items):
+        self.items = list(items)
+
+    def __len__(self):
+        return len(self.items)
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        if not self.items:
+            raise StopIteration
+        return self.items.pop(0)
+
+
+class TestPreview:
+    def test_head_reads_only_preview(self):
+        seq = CountingSequence(10 ** 9)
+        assert head(seq, 5) == [0, 2, 4, 6, 8]
+        assert seq.read == [0, 1, 2, 3, 4]
+
+    def test_head_of_mappings_and_sets(self):
+        data = dict((i, str(i)) for i in range(100))
+        assert head(data, 3) == [0, 1, 2]
+        assert len(head(set(range(100)), 3)) == 3
+        assert head(range(10 ** 12), 2) == [0, 1]
+
+    def test_head_never_consumes_iterators(self):
+        gen = (i for i in range(20))
+        assert is_one_shot(gen)
+        assert head(gen) is None
+        assert next(gen) == 0
+
+        sized = SizedIterator(range(20))
+        assert head(sized) is None
+        assert len(sized) == 20
+
+    def test_smart_print_keeps_iterator(self, capsys):
+        sized = SizedIterator(range(20))
+        smart_print(sized, "it")
+        assert "20 items" in capsys.readouterr().out
+        assert list(sized) == list(range(20))
+
+    def test_smart_print_huge_sequence(self, capsys):
+        seq = CountingSequence(10 ** 9)
+        smart_print(seq, "seq")
+        out = capsys.readouterr().out
+        assert "1000000000 items" in out
+        assert "[0, 2, 4, 6, 8]" in out
+        assert len(seq.read) == 5
+
+
+class FakeResponse(object):
+    """requests-like response with the body already read."""
+
+    def __init__(self, body, content_type="application/json"):
+        self.status_code = 200
+        self.url = "https://api.example.com/items"
+        self.headers = {"content-type": content_type}
+        self.encoding = "utf-8"
+        self._content = body
+
+    def json(self):
+        raise AssertionError("the whole body must not be parsed")
+
+
+class StreamingResponse(FakeResponse):
+    """Response whose body has not been read (``stream=True``)."""
+
+    def __init__(self):
+        super(StreamingResponse, self).__init__(False)
+
+    @property
+    def content(self):
+        raise AssertionError("the stream must not be read")
+
+
+class TestResponsePreview:
+    def test_json_preview_is_bounded(self):
+        text = '{"items": [' + ", ".join(str(i) for i in range(10000)) + "]}"
+        rendered = json_preview(text, 40)
+        assert rendered.startswith('{"items": [0, 1, 2')
+        assert rendered.endswith("...")
+        assert len(rendered) <= 43
+
+    def test_json_preview_of_prefix(self):
+        rendered = json_preview('{"a": [1, 2], "b": "long te', 100, complete=False)
+        assert rendered == '{"a": [1, 2], "b": "long te...'
+        assert json_preview('{"a": 1}', 100) == '{"a": 1}'
+        assert json_preview("plain text", 100) is None
+
+    def test_large_body_is_not_parsed(self):
+        items = ", ".join('{"id": %d}' % i for i in range(200000))
+        body = ('{"data": [' + items + "]}").encode()
+        kind, rendered = response_preview(FakeResponse(body), 100)
+        assert kind == "JSON"
+        assert rendered.startswith('{"data": [{"id": 0}, {"id": 1}')
+        assert len(rendered) <= 103
+
+    def test_split_multibyte_character(self):
+        body = ("x" * 9 + "\u00e9" * 10).encode("utf-8")
+        kind, rendered = response_preview(FakeResponse(body, "text/plain"), 10)
+        assert kind == "Text"
+        assert rendered == "x" * 9 + "..."
+
+    def test_unread_stream_is_left_alone(self):
+        assert response_preview(StreamingResponse(), 100) is None
+
+    def test_smart_print_response(self, capsys):
+        smart_print(FakeResponse(b'{"ok": true}'), "resp")
+        out = capsys.readouterr().out
+        assert "resp: 200 - https://api.example.com/items" in out
+        assert 'JSON: {"ok": true}' in out
+
+
+class TestBoundedRepr:
+    def test_matches_repr_when_short(self):
+        value = [1, (2,), {3: "a"}, set(), frozenset([1]), None, 1.5, b"x", "q'"]
+        assert bounded_repr(value, 1000) == (repr(value), False)
+
+    def test_stops_at_limit(self):
+        class Exploding(object):
+            def __repr__(self):
+                raise AssertionError("rendered past the limit")
+
+        value = {"a": list(range(100)), "b": Exploding()}
+        text, truncated = bounded_repr(value, 30)
+        assert truncated
+        assert text == repr({"a": list(range(100))})[:30]
+
+    def test_long_strings_and_ints(self):
+        text, truncated = bounded_repr(["x" * 10 ** 6], 10)
+        assert (text, truncated) == ("['xxxxxxxx", True)
+        assert bounded_repr("y" * 50, 5, as_str=True) == ("yyyyy", True)
+        assert bounded_repr(10 ** 5000, 100)[0].startswith("<int of")
+
+    def test_collection_subclasses_are_walked(self):
+        class Exploding(object):
+            def __repr__(self):
+                raise AssertionError("rendered past the limit")
+
+        counts = collections.Counter(range(10 ** 5))
+        counts[Exploding()] = 0  # last key, past the limit
+        text, truncated = bounded_repr(counts, 20)
+        assert (text, truncated) == ("Counter({0: 1, 1: 1,", True)
+
+        ordered = collections.OrderedDict([("a", 1)])
+        assert bounded_repr(ordered, 100) == ("OrderedDict({'a': 1})", False)
+        assert bounded_repr(collections.deque([1, 2]), 100) == ("deque([1, 2])", False)
+        assert bounded_repr(collections.Counter(), 100) == ("Counter()", False)
+        point = collections.namedtuple("Point", "x y")(1, 2)
+        assert bounded_repr(point, 100) == ("Point(x=1, y=2)", False)
+        assert bounded_repr(range(3), 100) == ("range(0, 3)", False)
+
+    def test_recursive(self):
+        value = [1]
+        value.append(value)
+        assert bounded_repr(value, 100) == ("[1, [...]]", False)
+
+    def test_smart_print_large_dict(self, capsys):
+        small = {"k": "v" * 10 ** 6}
+        smart_print(small, "d")
+        out = capsys.readouterr().out
+        assert out.startswith(" d: {'k': 'vvv")
+        assert len(out) < 1100
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -112,10 +112,18 @@ class TestRegistry:
         def mock_run(cmd, *args, **kwargs):
             return type("MockResult", (object,), {"returncode": 0})()
 
+        class FakeIndex(object):
+            def find_file(self, spec):
+                return {"filename": "package-1.0.tar.gz", "url": "x", "hashes": {}}
+
         import subprocess
 
+        from load import registry as registry_module
+
         original_run = subprocess.run
+        original_get_index = registry_module.get_index
         subprocess.run = mock_run
+        registry_module.get_index = lambda url: FakeIndex()
 
         try:
             # Test public PyPI
@@ -126,6 +134,7 @@ class TestRegistry:
 
         finally:
             subprocess.run = original_run
+            registry_module.get_index = original_get_index
 
     def test_install_from_github(self):
         """Test GitHub installation (mocked)"""
@@ -0,0 +1,132 @@
+"""
+Tests for bulk requirements ingestion
+"""
+
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+
+# Add src to path
+src_dir = os.path.abspath(
+    os.path.join(os.path.dirname(__file__), '..', 'src')
+)
+sys.path.insert(0, src_dir)
+
+import pytest  # noqa: E402
+
+from load.requirements import (  # noqa: E402
+    group_requirements,
+    load_requirements,
+    parse_requirements,
+)
+
+REQUIREMENTS = """
+# Core
+pytest>=1.0
+packaging ; python_version >= "3"
+legacy-only ; python_version < "3"
+user/repo
+company/internal-lib==1.2
+git+https://github.com/user/tool.git#egg=tool
+--index-url https://example.org/simple/
+definitely-missing-a
+definitely-missing-b[extra]>=2
+"""
+
+
+class TestRequirements:
+    def setup_method(self):
+        self.calls = []
+
+        def mock_run(cmd, *args, **kwargs):
+            self.calls.append(cmd)
+            return type("MockResult", (object,), {"returncode": 0})()
+
+        self.original_run = subprocess.run
+        subprocess.run = mock_run
+        self.tmp = tempfile.mkdtemp()
+
+    def teardown_method(self):
+        subprocess.run = self.original_run
+        shutil.rmtree(self.tmp, ignore_errors=True)
+
+    def test_parse_and_group(self):
+        """Test markers, options and registry classification"""
+        requirements = parse_requirements(REQUIREMENTS)
+        names = [req.name for req in requirements]
+        assert "legacy-only" not in names
+        assert names == [
+            "pytest", "packaging", "repo", "internal-lib", "tool",
+            "definitely-missing-a", "definitely-missing-b",
+        ]
+
+        groups = group_requirements(requirements)
+        assert [r.name for r in groups["pypi"]] == [
+            "pytest", "packaging", "definitely-missing-a", "definitely-missing-b",
+        ]
+        assert [r.spec for r in groups["github"]] == ["user/repo"]
+        assert [r.spec for r in groups["company"]] == ["company/internal-lib==1.2"]
+        assert len(groups["url"]) == 1
+
+    def test_includes_and_pyproject(self):
+        """Test -r includes and pyproject dependency arrays"""
+        with open(os.path.join(self.tmp, "base.txt"), "w") as f:
+            f.write("pytest\n")
+        with open(os.path.join(self.tmp, "requirements.txt"), "w") as f:
+            f.write("-r base.txt\npackaging\n")
+        assert [r.name for r in parse_requirements(
+            os.path.join(self.tmp, "requirements.txt")
+        )] == ["pytest", "packaging"]
+
+        pyproject = (
+            '[project]\nname = "demo"\ndependencies = [\n  "pytest>=1",\n]\n'
+            '[project.optional-dependencies]\ndev = ["packaging"]\n'
+        )
+        assert [r.name for r in parse_requirements(pyproject)] == ["pytest"]
+        assert [r.name for r in parse_requirements(pyproject, extras=["dev"])] == [
+            "pytest", "packaging",
+        ]
+
+    def test_installed_requirements_skip_pip(self):
+        """Test that satisfied requirements never spawn pip"""
+        modules = load_requirements("pytest>=1.0\npackaging\n", silent=True)
+        assert self.calls == []
+        assert modules["pytest"] is pytest
+
+    def test_one_install_per_registry(self):
+        """Test batching: one pip run per registry group"""
+        with pytest.raises(ImportError) as excinfo:
+            load_requirements(
+                "pytest\ndefinitely-missing-a\ndefinitely-missing-b\nuser/repo\n",
+                silent=True,
+            )
+        assert "definitely-missing-a" in str(excinfo.value)
+
+        pypi_runs = [c for c in self.calls if "definitely-missing-a" in c]
+        assert len(pypi_runs) == 1
+        assert "definitely-missing-b" in pypi_runs[0]
+        assert "pytest" not in pypi_runs[0]
+        github_runs = [c for c in self.calls if "git+https://github.com/user/repo" in c]
+        assert github_runs and len(self.calls) <= 4
+
+    def test_editable_lines_stay_editable(self):
+        """Test that -e requirements reach pip as editable installs"""
+        tool = "git+https://github.com/user/tool.git#egg=tool"
+        with pytest.raises(ImportError):
+            load_requirements("-e ./localpkg\n--editable " + tool, silent=True)
+        args = [arg for cmd in self.calls for arg in cmd]
+        assert args[args.index("./localpkg") - 1] == "-e"
+        assert args[args.index(tool) - 1] == "-e"
+
+    def test_silent_install_prints_nothing(self, capsys):
+        """Test that silent=True also silences the install messages"""
+        with pytest.raises(ImportError):
+            load_requirements("definitely-missing-a\n", silent=True)
+        assert self.calls
+        assert capsys.readouterr().out == ""
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
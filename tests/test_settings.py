@@ -0,0 +1,87 @@
+"""
+Tests for runtime settings
+"""
+
+import asyncio
+import os
+import sys
+import threading
+
+# Add src to path
+src_dir = os.path.abspath(
+    os.path.join(os.path.dirname(__file__), '..', 'src')
+)
+sys.path.insert(0, src_dir)
+
+import pytest  # noqa: E402
+
+import load  # noqa: E402
+from load.output import emit  # noqa: E402
+from load.runtime import configure, get_settings, settings  # noqa: E402
+from load.utils import smart_print  # noqa: E402
+
+
+class TestSettings:
+    def setup_method(self):
+        self.saved = get_settings().as_dict()
+
+    def teardown_method(self):
+        configure(**self.saved)
+
+    def test_global_toggles_reach_smart_print(self, capsys):
+        load.disable_auto_print()
+        capsys.readouterr()
+        smart_print([1, 2], "xs")
+        assert capsys.readouterr().out == ""
+
+        load.enable_auto_print()
+        load.set_print_limit(3)
+        capsys.readouterr()
+        smart_print("abcdef", "s")
+        assert capsys.readouterr().out == " s: abc...\n"
+        assert load.info()["print_limit"] == 3
+
+    def test_scoped_override(self, capsys):
+        with load.settings(silent=True) as current:
+            assert current.silent and get_settings() is current
+            smart_print("hidden", "s")
+            emit("install", "📦 Installing {0}...", "x")
+            emit("install", "❌ {0}", "shown", level="error")
+        smart_print("visible", "s")
+        captured = capsys.readouterr()
+        assert captured.out == " s: visible\n"
+        assert captured.err == "❌ shown\n"
+        assert get_settings().silent is False
+
+    def test_unknown_setting(self):
+        with pytest.raises(TypeError):
+            with settings(colour=True):
+                pass
+
+    def test_override_is_thread_local(self):
+        seen = []
+        with settings(print_limit=5):
+            thread = threading.Thread(
+                target=lambda: seen.append(get_settings().print_limit)
+            )
+            thread.start()
+            thread.join()
+            assert get_settings().print_limit == 5
+        assert seen == [self.saved["print_limit"]]
+
+    def test_override_is_task_local(self):
+        async def task(limit, results):
+            with settings(print_limit=limit):
+                await asyncio.sleep(0.01)
+                results.append(get_settings().print_limit)
+
+        async def main():
+            results = []
+            await asyncio.gather(task(10, results), task(20, results))
+            return sorted(results)
+
+        assert asyncio.run(main()) == [10, 20]
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,91 @@
+"""
+Tests for target directory installs
+"""
+
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+
+# Add src to path
+src_dir = os.path.abspath(
+    os.path.join(os.path.dirname(__file__), '..', 'src')
+)
+sys.path.insert(0, src_dir)
+
+import pytest  # noqa: E402
+
+from load import config  # noqa: E402
+from load.config import _module_cache  # noqa: E402
+from load.installer import run_install  # noqa: E402
+from load.target import get_target_dir, set_target_dir  # noqa: E402
+
+
+class TestTargetDir:
+    def setup_method(self):
+        self.root = tempfile.mkdtemp()
+        self.first = os.path.join(self.root, "first")
+        self.second = os.path.join(self.root, "second")
+        self.saved = config.TARGET_DIR
+
+        self.calls = []
+
+        def mock_run(cmd, *args, **kwargs):
+            self.calls.append(cmd)
+            return type("MockResult", (object,), {"returncode": 0})()
+
+        self.original_run = subprocess.run
+        subprocess.run = mock_run
+
+    def teardown_method(self):
+        subprocess.run = self.original_run
+        set_target_dir(self.saved)
+        sys.modules.pop("target_demo", None)
+        _module_cache.pop("target_demo", None)
+        shutil.rmtree(self.root, ignore_errors=True)
+
+    def test_path_inserted_once(self):
+        set_target_dir(self.first)
+        set_target_dir(self.first)
+        assert get_target_dir() == self.first
+        assert os.path.isdir(self.first)
+        assert sys.path.count(self.first) == 1
+        assert sys.path[0] == self.first
+
+    def test_run_install_adds_target(self):
+        set_target_dir(self.first)
+        run_install([sys.executable, "-m", "pip", "install", "demo"])
+        cmd = self.calls[0]
+        assert cmd[cmd.index("--target") + 1] == self.first
+        assert cmd[-1] == "demo"
+
+    def test_explicit_target_kept(self):
+        set_target_dir(self.first)
+        run_install([sys.executable, "-m", "pip", "install", "--target", "x", "demo"])
+        assert self.calls[0].count("--target") == 1
+
+    def test_no_target_by_default(self):
+        set_target_dir(None)
+        run_install([sys.executable, "-m", "pip", "install", "demo"])
+        assert "--target" not in self.calls[0]
+
+    def test_switch_evicts_old_modules(self):
+        set_target_dir(self.first)
+        with open(os.path.join(self.first, "target_demo.py"), "w") as f:
+            f.write("VALUE = 1\n")
+        import target_demo
+
+        _module_cache["target_demo"] = target_demo
+        assert target_demo.VALUE == 1
+
+        set_target_dir(self.second)
+        assert "target_demo" not in sys.modules
+        assert "target_demo" not in _module_cache
+        assert self.first not in sys.path
+        with pytest.raises(ImportError):
+            import target_demo  # noqa: F401,F811
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
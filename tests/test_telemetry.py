@@ -0,0 +1,96 @@
+"""
+Tests for install telemetry
+"""
+
+import os
+import subprocess
+import sys
+
+# Add src to path
+src_dir = os.path.abspath(
+    os.path.join(os.path.dirname(__file__), '..', 'src')
+)
+sys.path.insert(0, src_dir)
+
+import pytest  # noqa: E402
+
+from load import telemetry  # noqa: E402
+from load.telemetry import add_install_listener, parse_pip_log  # noqa: E402
+from load.utils import install_package  # noqa: E402
+
+PIP_LOG = """\
+2024-05-01T10:00:00,000 Using pip 24.0 from /usr/lib/python3/site-packages/pip
+2024-05-01T10:00:00,500 Collecting demo-tel-pkg
+2024-05-01T10:00:01,000   Downloading demo_tel_pkg-1.0.tar.gz (2.5 kB)
+2024-05-01T10:00:01,250   Preparing metadata (pyproject.toml): started
+2024-05-01T10:00:02,000 Collecting dep-pkg (from demo-tel-pkg)
+2024-05-01T10:00:02,100   Using cached dep_pkg-2.0-py3-none-any.whl (1 MB)
+2024-05-01T10:00:02,200 Building wheels for collected packages: demo-tel-pkg
+2024-05-01T10:00:03,000   Created wheel for demo-tel-pkg: \
+filename=demo_tel_pkg-1.0-py3-none-any.whl size=1093
+2024-05-01T10:00:03,200 Installing collected packages: dep-pkg, demo-tel-pkg
+2024-05-01T10:00:03,700 Successfully installed dep-pkg-2.0 demo-tel-pkg-1.0
+2024-05-01T10:00:03,800 Removed build tracker
+"""
+
+
+class TestTelemetry:
+    def setup_method(self):
+        def mock_run(cmd, *args, **kwargs):
+            with open(cmd[cmd.index("--log") + 1], "w") as f:
+                f.write(PIP_LOG)
+            return type("MockResult", (object,), {"returncode": 0})()
+
+        self.original_run = subprocess.run
+        subprocess.run = mock_run
+        self.events = []
+        add_install_listener(self.events.append)
+
+    def teardown_method(self):
+        subprocess.run = self.original_run
+        telemetry.remove_install_listener(self.events.append)
+
+    def test_parse_pip_log(self):
+        parsed = parse_pip_log(PIP_LOG)
+        phases = parsed["phases"]
+        assert phases["startup"] == pytest.approx(0.5)
+        assert phases["index"] == pytest.approx(0.6)
+        assert phases["download"] == pytest.approx(0.35)
+        assert phases["build"] == pytest.approx(1.75)
+        assert phases["unpack"] == pytest.approx(0.5)
+        assert parsed["bytes"] == {"downloaded": 2500, "cached": 1000000, "built": 1093}
+        assert parsed["artifact"] == "demo_tel_pkg-1.0.tar.gz"
+
+    def test_install_records_phases_and_events(self):
+        assert install_package("demo-tel-pkg") is True
+
+        record = telemetry.last()
+        assert record.success is True
+        assert record.registry == "pypi"
+        assert "classify" in record.phases
+        assert record.phases["unpack"] == pytest.approx(0.5)
+        assert record.bytes["downloaded"] == 2500
+
+        kinds = [event["event"] for event in self.events]
+        assert kinds[0] == "install_started"
+        assert kinds[-1] == "install_finished"
+        assert "phase" in kinds
+        assert self.events[-1]["record"]["spec"] == "demo-tel-pkg"
+
+        import load
+
+        assert load.info()["installs"]["count"] >= 1
+
+    def test_listener_errors_are_contained(self):
+        def broken(event):
+            raise RuntimeError("boom")
+
+        add_install_listener(broken)
+        try:
+            assert install_package("demo-tel-pkg") is True
+        finally:
+            telemetry.remove_install_listener(broken)
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])